@@ -0,0 +1,63 @@
+"""
+benchmarks/bench_migration.py
+
+Time Stolt and Kirchhoff migration on synthetic B-scans.
+
+Usage:
+    python -m benchmarks.bench_migration
+"""
+
+import time
+
+import numpy as np
+
+from physics.constants import C0
+from signal_processing.depth_estimation import LayeredVelocityModel
+from signal_processing.migration import kirchhoff_migration, stolt_migration
+
+
+def synthetic_bscan(n_positions, nt, dx=0.01, dt=5e-11, epsilon_r=4.0):
+    """B-scan with a row of point diffractors."""
+    v = C0 / np.sqrt(epsilon_r)
+    x = np.arange(n_positions) * dx
+    radargram = np.zeros((n_positions, nt))
+
+    for x0 in x[::max(n_positions // 8, 1)]:
+        arrival = np.rint(2 * np.hypot(0.5, x - x0) / v / dt).astype(int)
+        keep = arrival < nt
+        radargram[np.flatnonzero(keep), arrival[keep]] += 1.0
+
+    return radargram
+
+
+def bench(n_positions=1000, nt=512, dx=0.01, dt=5e-11, aperture=1.0):
+    """
+    Returns
+    -------
+    dict
+        Traces per second for each migration path
+    """
+    radargram = synthetic_bscan(n_positions, nt, dx, dt)
+    model = LayeredVelocityModel([0.2, np.inf], [4.0, 6.0])
+
+    start = time.perf_counter()
+    stolt_migration(radargram, dt, dx, epsilon_r=4.0)
+    stolt_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kirchhoff_migration(radargram, dt, dx, model=model, aperture=aperture)
+    kirchhoff_time = time.perf_counter() - start
+
+    return {
+        "stolt_traces_per_s": n_positions / stolt_time,
+        "kirchhoff_traces_per_s": n_positions / kirchhoff_time,
+    }
+
+
+if __name__ == "__main__":
+    for n in (500, 2000, 5000):
+        result = bench(n_positions=n)
+        print(
+            f"{n:6d} traces | stolt {result['stolt_traces_per_s']:9.0f} tr/s"
+            f" | kirchhoff {result['kirchhoff_traces_per_s']:9.0f} tr/s"
+        )
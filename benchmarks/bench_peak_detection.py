@@ -0,0 +1,80 @@
+"""
+benchmarks/bench_peak_detection.py
+
+Compare vectorized peak detection against the original
+per-sample Python loop.
+
+Usage:
+    python -m benchmarks.bench_peak_detection
+"""
+
+import time
+
+import numpy as np
+
+from signal_processing.peak_detection import detect_peaks_with_distance
+
+
+# -------------------------------------------------------
+# Reference (loop) Implementation
+# -------------------------------------------------------
+
+def loop_detect_peaks_with_distance(signal, threshold_ratio=0.2,
+                                    min_distance=10):
+    """Original first-come implementation, kept for comparison."""
+
+    threshold = threshold_ratio * np.max(np.abs(signal))
+    peaks = []
+
+    for i in range(1, len(signal) - 1):
+        if (
+            abs(signal[i]) > threshold
+            and abs(signal[i]) > abs(signal[i - 1])
+            and abs(signal[i]) > abs(signal[i + 1])
+        ):
+            if not peaks or i - peaks[-1] >= min_distance:
+                peaks.append(i)
+
+    return peaks
+
+
+# -------------------------------------------------------
+# Benchmark
+# -------------------------------------------------------
+
+def bench(n_traces=1000, nt=800, seed=0):
+    """
+    Time both implementations on a random radargram.
+
+    Returns
+    -------
+    dict
+        Traces per second for each implementation
+    """
+
+    traces = np.random.default_rng(seed).normal(size=(n_traces, nt))
+
+    start = time.perf_counter()
+    for trace in traces:
+        loop_detect_peaks_with_distance(trace)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    detect_peaks_with_distance(traces)
+    vector_time = time.perf_counter() - start
+
+    return {
+        "loop_traces_per_s": n_traces / loop_time,
+        "vectorized_traces_per_s": n_traces / vector_time,
+        "speedup": loop_time / vector_time,
+    }
+
+
+if __name__ == "__main__":
+    for n in (100, 1000, 10000):
+        result = bench(n_traces=n)
+        print(
+            f"{n:6d} traces | loop {result['loop_traces_per_s']:10.0f} tr/s"
+            f" | vectorized {result['vectorized_traces_per_s']:10.0f} tr/s"
+            f" | x{result['speedup']:.1f}"
+        )
@@ -0,0 +1,520 @@
+"""
+benchmarks/run_benchmarks.py
+
+Benchmark suite for the solver, physics and signal-processing hot
+paths.
+
+Every case reports a throughput (cells/s for the solver and
+coefficient kernels, traces/s for signal processing).  Results are
+written as JSON and can be compared against a stored baseline; any
+case slower than the baseline by more than the tolerance is flagged
+and the run exits with status 1.
+
+Usage:
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --baseline baseline.json
+    python -m benchmarks.run_benchmarks --quick --filter fdtd
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from config.simulation_config import GRID_PRESETS, LAYER_PROFILES
+from core import backends
+from core.fdtd_solver import BatchFDTDSolver1D
+from core.instrumentation import SolverProfiler
+from core.scenario import Scenario
+from core.simulation import build_grid, create_solver, ricker_source
+from physics.wave_equations import compute_update_coefficients
+from signal_processing.depth_estimation import (
+    LayeredVelocityModel,
+    estimate_depths_layered,
+    estimate_multiple_depths
+)
+from signal_processing.noise_model import (
+    add_impulse_noise,
+    apply_realistic_noise
+)
+from signal_processing.peak_detection import detect_peaks
+from sweep.scenarios import expand_sweep
+
+
+# -------------------------------------------------------
+# Timing
+# -------------------------------------------------------
+
+def time_call(fn, setup=None, repeat=5, min_time=0.02):
+    """
+    Best wall time of fn(state) over several repeats.
+
+    Without setup, fast calls are looped (like timeit) until one
+    measurement lasts at least min_time, and the per-call time is
+    reported.
+
+    Parameters
+    ----------
+    fn : callable
+        Timed function; receives the value returned by setup
+    setup : callable (optional)
+        Untimed preparation run before every call
+    repeat : int
+    min_time : float
+        Minimum duration of one measurement (s)
+
+    Returns
+    -------
+    float
+        Seconds per call
+    """
+    number = 1
+    if setup is None:
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn(None)
+            if time.perf_counter() - start >= min_time:
+                break
+            number *= 10
+
+    best = float("inf")
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(state)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _selected(name, name_filter):
+    return not name_filter or name_filter in name
+
+
+def _record(name, seconds, work, unit, **params):
+    return {
+        "name": name,
+        "seconds": seconds,
+        "throughput": work / seconds,
+        "unit": unit,
+        "params": params,
+    }
+
+
+# -------------------------------------------------------
+# Cases
+# -------------------------------------------------------
+
+def bench_fdtd(repeat=5, quick=False, name_filter=None):
+    """
+    FDTDSolver1D.run for every grid preset.
+
+    The timed runs are uninstrumented; one extra sampled run per preset
+    adds the per-phase breakdown under "profile".
+    """
+    records = []
+
+    for name, preset in GRID_PRESETS.items():
+        if not _selected(f"fdtd_run[{name}]", name_filter):
+            continue
+
+        nx, nt, dx = preset["nx"], preset["nt"], preset["dx"]
+        if quick:
+            nt = min(nt, 200)
+
+        grid = build_grid(nx, dx, LAYER_PROFILES["Air-Soil"])
+        dt = create_solver(grid, nt).dt
+        source = ricker_source(dt, nt, 10e9)
+
+        seconds = time_call(
+            lambda solver: solver.run(source),
+            setup=lambda: create_solver(grid, nt),
+            repeat=repeat
+        )
+        record = _record(f"fdtd_run[{name}]", seconds, nx * nt,
+                         "cells/s", nx=nx, nt=nt)
+
+        profiler = SolverProfiler(sample_every=16)
+        create_solver(grid, nt).run(source, profiler=profiler)
+        record["profile"] = profiler.last.to_dict()
+
+        records.append(record)
+
+    return records
+
+
+def _thread_counts():
+    cores = os.cpu_count() or 1
+    counts = [1 << i for i in range(cores.bit_length()) if 1 << i <= cores]
+    return counts + ([cores] if cores not in counts else [])
+
+
+def bench_batch_threads(repeat=5, quick=False, name_filter=None):
+    """
+    BatchFDTDSolver1D.run sharded over 1 .. cpu_count threads.
+
+    Each record carries its speedup over the single-thread run.
+    """
+    records = []
+    counts = [threads for threads in _thread_counts()
+              if _selected(f"batch_fdtd[threads={threads}]", name_filter)]
+    if not counts:
+        return records
+
+    # The single-thread run is the speedup reference
+    counts = sorted(set(counts) | {1})
+
+    batch, nx, nt = (16, 400, 200) if quick else (64, 400, 800)
+    grid = build_grid(nx, 1e-3, LAYER_PROFILES["Air-Soil"])
+    dt = create_solver(grid, nt).dt
+    source = ricker_source(dt, nt, 10e9)
+
+    rng = np.random.default_rng(4)
+    epsilon_r = grid.epsilon_r * rng.uniform(0.8, 1.2, (batch, 1))
+
+    def setup():
+        return BatchFDTDSolver1D(epsilon_r, grid.sigma, grid.dx, dt,
+                                 (nt + 0.5) * dt, 20)
+
+    single = None
+    for threads in counts:
+        seconds = time_call(
+            lambda solver: solver.run(source, n_threads=threads),
+            setup=setup,
+            repeat=repeat
+        )
+        single = single or seconds
+
+        name = f"batch_fdtd[threads={threads}]"
+        if not _selected(name, name_filter):
+            continue
+
+        record = _record(name, seconds, batch * nx * nt, "cells/s",
+                         batch=batch, nx=nx, nt=nt, threads=threads)
+        record["speedup"] = single / seconds
+        records.append(record)
+
+    return records
+
+
+def bench_update_coefficients(repeat=5, quick=False, name_filter=None):
+    """compute_update_coefficients on growing material arrays."""
+    records = []
+    rng = np.random.default_rng(0)
+
+    for n in ((1000, 100000) if quick else (1000, 100000, 1000000)):
+        if not _selected(f"update_coefficients[{n}]", name_filter):
+            continue
+
+        epsilon_r = rng.uniform(1, 80, n)
+        sigma = rng.uniform(0, 0.1, n)
+
+        seconds = time_call(
+            lambda _: compute_update_coefficients(epsilon_r, sigma,
+                                                  1e-12, 1e-3),
+            repeat=repeat
+        )
+        records.append(_record(f"update_coefficients[{n}]", seconds, n,
+                               "cells/s", n=n))
+
+    return records
+
+
+def _radargram(n_traces, nt=800, seed=0):
+    rng = np.random.default_rng(seed)
+    traces = rng.normal(0, 0.05, (n_traces, nt))
+    traces[:, 200] += 1.0
+    traces[:, 500] -= 0.6
+    return traces
+
+
+def _sizes(quick):
+    return (100, 1000) if quick else (100, 1000, 10000)
+
+
+def bench_detect_peaks(repeat=5, quick=False, name_filter=None):
+    """Batched detect_peaks on (n_traces, 800) radargrams."""
+    records = []
+
+    for n in _sizes(quick):
+        if not _selected(f"detect_peaks[{n}]", name_filter):
+            continue
+
+        traces = _radargram(n)
+        seconds = time_call(lambda _: detect_peaks(traces), repeat=repeat)
+        records.append(_record(f"detect_peaks[{n}]", seconds, n,
+                               "traces/s", n_traces=n, nt=800))
+
+    return records
+
+
+def bench_noise(repeat=5, quick=False, name_filter=None):
+    """apply_realistic_noise on (n_traces, 800) radargrams."""
+    records = []
+
+    for n in _sizes(quick):
+        if not _selected(f"realistic_noise[{n}]", name_filter):
+            continue
+
+        traces = _radargram(n)
+        rng = np.random.default_rng(1)
+        seconds = time_call(
+            lambda _: apply_realistic_noise(traces, rng=rng),
+            repeat=repeat
+        )
+        records.append(_record(f"realistic_noise[{n}]", seconds, n,
+                               "traces/s", n_traces=n, nt=800))
+
+    return records
+
+
+def bench_depth_estimation(repeat=5, quick=False, name_filter=None):
+    """Constant-velocity and layered depth conversion of pick arrays."""
+    records = []
+    rng = np.random.default_rng(2)
+    model = LayeredVelocityModel.from_layer_profile(
+        LAYER_PROFILES["Road Structure"], 1e-3, reference_index=20)
+
+    for n in _sizes(quick):
+        picks = rng.integers(0, 800, (n, 8))
+
+        if _selected(f"depth_constant[{n}]", name_filter):
+            seconds = time_call(
+                lambda _: estimate_multiple_depths(picks.ravel(), 1e-12,
+                                                   4.0),
+                repeat=repeat
+            )
+            records.append(_record(f"depth_constant[{n}]", seconds, n,
+                                   "traces/s", n_traces=n, n_peaks=8))
+
+        if _selected(f"depth_layered[{n}]", name_filter):
+            seconds = time_call(
+                lambda _: estimate_depths_layered(picks, 1e-12, model),
+                repeat=repeat
+            )
+            records.append(_record(f"depth_layered[{n}]", seconds, n,
+                                   "traces/s", n_traces=n, n_peaks=8))
+
+    return records
+
+
+def bench_scenarios(repeat=5, quick=False, name_filter=None):
+    """Parsing, validation and hashing of decoded JSON sweep scenarios."""
+    n = 1000 if quick else 10000
+    if not _selected(f"scenario_parse[{n}]", name_filter):
+        return []
+
+    # 48 scenarios (presets x profiles x objects) per frequency
+    frequencies = np.linspace(1e9, 20e9, n // 48 + 1).tolist()
+    sweep = expand_sweep(None, None, [None, "Steel", "Concrete", "Brick"],
+                         frequencies)[:n]
+    data = json.loads(json.dumps([scenario.to_dict() for scenario in sweep]))
+
+    seconds = time_call(
+        lambda _: [Scenario.from_dict(item).hash for item in data],
+        repeat=repeat
+    )
+    return [_record(f"scenario_parse[{n}]", seconds, n, "scenarios/s",
+                    n_scenarios=n)]
+
+
+def bench_backends(repeat=5, quick=False, name_filter=None):
+    """
+    Every available backend of the registered kernels.
+
+    Compiled kernels are warmed up first, so compilation (or loading
+    from the disk cache) is not timed.
+    """
+    records = []
+    backends.warmup()
+
+    presets = ["Small Test"] if quick else ["Small Test", "Standard GPR"]
+    traces = _radargram(1000)
+
+    for name in backends.available_backends("fdtd_steps"):
+        for preset_name in presets:
+            if not _selected(f"fdtd_run[{preset_name}|{name}]", name_filter):
+                continue
+
+            preset = GRID_PRESETS[preset_name]
+            nx, nt = preset["nx"], preset["nt"]
+
+            grid = build_grid(nx, preset["dx"], LAYER_PROFILES["Air-Soil"])
+            source = ricker_source(create_solver(grid, nt).dt, nt, 10e9)
+
+            seconds = time_call(
+                lambda solver: solver.run(source),
+                setup=lambda: create_solver(grid, nt, backend=name),
+                repeat=repeat
+            )
+            records.append(_record(f"fdtd_run[{preset_name}|{name}]",
+                                   seconds, nx * nt, "cells/s",
+                                   nx=nx, nt=nt, backend=name))
+
+    for name in backends.available_backends("local_maxima"):
+        if not _selected(f"detect_peaks[1000|{name}]", name_filter):
+            continue
+
+        seconds = time_call(
+            lambda _: detect_peaks(traces, backend=name), repeat=repeat)
+        records.append(_record(f"detect_peaks[1000|{name}]", seconds,
+                               1000, "traces/s", n_traces=1000, nt=800,
+                               backend=name))
+
+    for name in backends.available_backends("impulse_noise"):
+        if not _selected(f"impulse_noise[1000|{name}]", name_filter):
+            continue
+
+        rng = np.random.default_rng(3)
+        seconds = time_call(
+            lambda _: add_impulse_noise(traces, 0.005, rng=rng,
+                                        backend=name),
+            repeat=repeat
+        )
+        records.append(_record(f"impulse_noise[1000|{name}]", seconds,
+                               1000, "traces/s", n_traces=1000, nt=800,
+                               backend=name))
+
+    return records
+
+
+BENCHMARKS = [
+    bench_fdtd,
+    bench_batch_threads,
+    bench_update_coefficients,
+    bench_detect_peaks,
+    bench_noise,
+    bench_depth_estimation,
+    bench_scenarios,
+    bench_backends,
+]
+
+
+# -------------------------------------------------------
+# Runner
+# -------------------------------------------------------
+
+def run_suite(repeat=5, quick=False, name_filter=None):
+    """
+    Run all benchmark cases, or those whose name contains name_filter.
+
+    Cases that do not match are skipped before they are set up.
+
+    Returns
+    -------
+    dict
+        {"meta": {...}, "results": {name: record}}
+    """
+    results = {}
+    for bench in BENCHMARKS:
+        for record in bench(repeat=repeat, quick=quick,
+                            name_filter=name_filter):
+            results[record["name"]] = record
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "repeat": repeat,
+            "numba": backends.NUMBA_AVAILABLE,
+        },
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, tolerance=0.2):
+    """
+    Compare throughputs against a baseline.
+
+    Parameters
+    ----------
+    current, baseline : dict
+        Outputs of run_suite()
+    tolerance : float
+        Allowed relative slowdown before a case is flagged
+
+    Returns
+    -------
+    list of dict
+        One entry per case present in both with identical parameters:
+        "name", "ratio" (current / baseline throughput), "regression"
+    """
+    rows = []
+    for name, record in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None or reference["params"] != record["params"]:
+            continue
+
+        ratio = record["throughput"] / reference["throughput"]
+        rows.append({
+            "name": name,
+            "ratio": ratio,
+            "regression": ratio < 1.0 - tolerance,
+        })
+
+    return rows
+
+
+def format_results(suite, comparison=None):
+    ratios = {row["name"]: row for row in comparison or []}
+    lines = []
+
+    for name, record in suite["results"].items():
+        line = (f"{name:36s} {record['throughput']:14.4g} "
+                f"{record['unit']:8s} {record['seconds'] * 1e3:10.3f} ms")
+
+        if name in ratios:
+            row = ratios[name]
+            flag = "  REGRESSION" if row["regression"] else ""
+            line += f"   x{row['ratio']:.2f} vs baseline{flag}"
+
+        lines.append(line)
+
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EMScope benchmarks")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown (default 0.2)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true",
+                        help="Smaller sizes for a fast smoke run")
+    parser.add_argument("--filter", help="Only cases containing this text")
+    args = parser.parse_args(argv)
+
+    suite = run_suite(args.repeat, args.quick, args.filter)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare_results(suite, json.load(f),
+                                         args.tolerance)
+
+    print(format_results(suite, comparison))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(suite, f, indent=2)
+
+    if comparison and any(row["regression"] for row in comparison):
+        print("Performance regressions detected.")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
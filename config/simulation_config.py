@@ -42,6 +42,12 @@ RADAR_FREQUENCIES = {
 
 CFL_SAFETY_FACTOR = 0.99
 
+# --------------------------------------------------
+# Source / Receiver Placement (cell index)
+# --------------------------------------------------
+
+DEFAULT_SOURCE_POSITION = 20
+
 # --------------------------------------------------
 # Predefined Layered Profiles
 # --------------------------------------------------
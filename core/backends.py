@@ -0,0 +1,188 @@
+"""
+core/backends.py
+
+Registry of compute backends for the hot kernels.
+
+Every registered kernel has a NumPy implementation ("numpy"); kernels
+with a compiled implementation also register it under "numba".  Numba
+is an optional dependency detected at import: without it only the
+NumPy implementations are registered and callers fall back to them
+automatically.
+
+Compiled kernels are built with cache=True, so their machine code is
+written to disk (the module's __pycache__, or NUMBA_CACHE_DIR) and
+reloaded by later processes instead of being recompiled.  warmup()
+compiles or loads them eagerly, e.g. in a worker pool initializer.
+
+The backend is chosen per call (backend="numpy" / "numba" / "auto"),
+falling back to the process default set with set_default_backend()
+or the EMSCOPE_BACKEND environment variable.
+
+Typical use::
+
+    kernel = get_kernel("fdtd_steps")             # best available
+    kernel = get_kernel("fdtd_steps", "numpy")    # explicit
+"""
+
+import importlib
+import os
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# Preference order used by "auto"
+BACKENDS = ("numba", "numpy")
+
+NUMBA_AVAILABLE = numba is not None
+
+# Modules that register kernels on import
+KERNEL_MODULES = (
+    "core.kernels",
+    "signal_processing.peak_detection",
+    "signal_processing.noise_model",
+)
+
+_kernels = {}
+_warmups = {}
+_default_backend = os.environ.get("EMSCOPE_BACKEND", "auto")
+
+
+# -------------------------------------------------------
+# Registration
+# -------------------------------------------------------
+
+def jit(function):
+    """
+    Compile a function with Numba (disk-cached).
+
+    Returns None when Numba is not installed, so the result can be
+    passed straight to register().
+    """
+    if numba is None:
+        return None
+    return numba.njit(cache=True)(function)
+
+
+def register(kernel, backend, function, warmup=None):
+    """
+    Register an implementation of a kernel.
+
+    Parameters
+    ----------
+    kernel : str
+        Kernel name, e.g. "fdtd_steps"
+    backend : str
+        One of BACKENDS
+    function : callable or None
+        Implementation; None (an unavailable compiled kernel) is
+        ignored
+    warmup : callable (optional)
+        Calls the implementation once on tiny inputs
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    if function is None:
+        return
+
+    _kernels.setdefault(kernel, {})[backend] = function
+    if warmup is not None:
+        _warmups[(kernel, backend)] = warmup
+
+
+def load_kernels():
+    """Import every module in KERNEL_MODULES (registering its kernels)."""
+    for module in KERNEL_MODULES:
+        importlib.import_module(module)
+
+
+# -------------------------------------------------------
+# Selection
+# -------------------------------------------------------
+
+def available_backends(kernel):
+    """Registered backends of a kernel, in preference order."""
+    if kernel not in _kernels:
+        load_kernels()
+
+    implementations = _kernels.get(kernel, {})
+    return [name for name in BACKENDS if name in implementations]
+
+
+def set_default_backend(backend):
+    """
+    Set the process-wide backend used when a call passes none.
+
+    Parameters
+    ----------
+    backend : str
+        "auto" or one of BACKENDS
+    """
+    global _default_backend
+
+    if backend != "auto" and backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    _default_backend = backend
+
+
+def get_default_backend():
+    return _default_backend
+
+
+def resolve_backend(kernel, backend=None):
+    """
+    Name of the backend that runs a kernel.
+
+    An explicitly requested backend must be available; the default
+    backend falls back to the best available one.
+    """
+    if kernel not in _kernels:
+        load_kernels()
+    if kernel not in _kernels:
+        raise ValueError(f"Unknown kernel: {kernel}")
+
+    available = available_backends(kernel)
+
+    if backend is None:
+        backend = _default_backend
+        if backend not in available:
+            backend = "auto"
+
+    if backend == "auto":
+        return available[0]
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    if backend not in available:
+        raise ValueError(f"Backend '{backend}' is not available "
+                         f"for {kernel}.")
+
+    return backend
+
+
+def get_kernel(kernel, backend=None):
+    """Implementation of a kernel for the given (or default) backend."""
+    backend = resolve_backend(kernel, backend)
+    return _kernels[kernel][backend]
+
+
+def warmup(backend="numba"):
+    """
+    Compile (or load from the disk cache) all kernels of a backend.
+
+    Returns
+    -------
+    list of str
+        Kernels warmed up
+    """
+    load_kernels()
+
+    done = []
+    for (kernel, name), function in _warmups.items():
+        if name == backend:
+            function()
+            done.append(kernel)
+
+    return done
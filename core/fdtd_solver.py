@@ -5,7 +5,12 @@ core/fdtd_solver.py
 Implements Yee algorithm for Ez-Hy fields.
 """
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+from core.backends import get_kernel
+from physics.constants import EPSILON_0
 from physics.wave_equations import (
     compute_update_coefficients,
     compute_magnetic_coefficient
@@ -15,9 +20,14 @@ from physics.wave_equations import (
 class FDTDSolver1D:
     """
     1D FDTD solver (Ez-Hy mode).
+
+    The time loop runs in the "fdtd_steps" kernel of core/backends.py;
+    backend selects its implementation ("numpy", "numba" or "auto",
+    default: the process default backend).
     """
 
-    def __init__(self, grid, dt, total_time, source_position):
+    def __init__(self, grid, dt, total_time, source_position,
+                 backend=None):
         if source_position < 0 or source_position >= grid.nx:
             raise ValueError("Invalid source position index.")
 
@@ -45,39 +55,519 @@ class FDTDSolver1D:
 
         self.Chye = compute_magnetic_coefficient(dt, grid.dx)
 
-    def run(self, source_signal):
+        # Stepping state
+        self.n = 0
+        self.source_signal = None
+        self.backend = backend
+
+        # Scratch buffers reused by every step (no per-step allocation)
+        self.dE = np.empty(grid.nx - 1)
+        self.dH = np.empty(grid.nx - 2)
+
+    def set_source(self, source_signal):
+        """
+        Set the source signal and rewind the step counter to 0.
+
+        Parameters:
+            source_signal (ndarray): Time-domain source array (nt,)
+        """
+        source_signal = np.asarray(source_signal, dtype=float)
+        if len(source_signal) != self.nt:
+            raise ValueError("Source signal length mismatch.")
+
+        self.source_signal = source_signal
+        self.n = 0
+
+    def step(self, k=1, backend=None):
+        """
+        Advance k time steps in one kernel call.
+
+        Source injection, boundaries and recording are applied at
+        every step inside the block; fewer than k steps run if the
+        simulation ends first.
+
+        Parameters:
+            k (int): Steps to advance
+            backend (str): Kernel backend for this call (default: the
+                solver's backend)
+
+        Returns:
+            ndarray: Recorded samples of the advanced steps
+        """
+        if self.source_signal is None:
+            raise ValueError("No source signal; call set_source first.")
+        if k <= 0:
+            raise ValueError("k must be positive.")
+
+        n0 = self.n
+        k = min(int(k), self.nt - n0)
+
+        if k > 0:
+            kernel = get_kernel("fdtd_steps", backend or self.backend)
+            kernel(self.Ez, self.Hy, self.Ceze, self.Cezh, self.Chye,
+                   self.source_position, self.source_signal,
+                   self.reflected_signal, n0, k, self.dE, self.dH)
+            self.n = n0 + k
+
+        return self.reflected_signal[n0:self.n]
+
+    def run(self, source_signal, callback=None, callback_interval=100,
+            profiler=None, backend=None):
         """
         Run FDTD simulation.
 
+        Steps between callbacks (and profiler samples) are advanced as
+        one fused block with step().
+
         Parameters:
             source_signal (ndarray): Time-domain source array
+            callback (callable): Optional callback(step, solver) called
+                every callback_interval steps and after the last step;
+                returning False stops the run early
+            callback_interval (int): Steps between callbacks
+            profiler (SolverProfiler): Optional sampling profiler
+                (core/instrumentation.py); the RunProfile is stored in
+                profiler.last
+            backend (str): Kernel backend for this run (default: the
+                solver's backend)
         """
-        if len(source_signal) != self.nt:
+        if callback_interval <= 0:
+            raise ValueError("callback_interval must be positive.")
+
+        self.set_source(source_signal)
+        sample_every = profiler.sample_every if profiler is not None else 0
+
+        if profiler is not None:
+            profiler.begin("FDTDSolver1D", self.grid.nx)
+
+        while self.n < self.nt:
+            n = self.n
+
+            if sample_every and n % sample_every == 0:
+                self._profiled_step(n, self.source_signal[n], profiler)
+                self.n = n + 1
+
+            else:
+                # Fuse all steps up to the next callback or sample
+                stop = self.nt
+                if callback is not None:
+                    stop = min(stop, (n // callback_interval + 1)
+                               * callback_interval)
+                if sample_every:
+                    stop = min(stop, (n // sample_every + 1) * sample_every)
+
+                self.step(stop - n, backend)
+
+            # --- Progress Callback ---
+            if callback is not None and (
+                    self.n % callback_interval == 0 or self.n == self.nt):
+                if callback(self.n, self) is False:
+                    break
+
+        if profiler is not None:
+            profiler.end(self.n)
+
+        return self.reflected_signal
+
+    def _profiled_step(self, n, source_value, profiler):
+        """One time step of run(), split into timed phases."""
+        src = self.source_position
+        clock = time.perf_counter
+
+        t0 = clock()
+        self.Hy += self.Chye * (self.Ez[1:] - self.Ez[:-1])
+        t1 = clock()
+        self.Ez[1:-1] = (
+            self.Ceze[1:-1] * self.Ez[1:-1]
+            + self.Cezh[1:-1] * (self.Hy[1:] - self.Hy[:-1])
+        )
+        t2 = clock()
+        self.Ez[src] += source_value
+        t3 = clock()
+        self.Ez[0] = self.Ez[1]
+        self.Ez[-1] = self.Ez[-2]
+        t4 = clock()
+        self.reflected_signal[n] = self.Ez[src]
+        t5 = clock()
+
+        profiler.add_sample((t0, t1, t2, t3, t4, t5))
+
+    # --------------------------------------------------
+    # Adjoint-State Gradient
+    # --------------------------------------------------
+
+    def _forward_step(self, Ez, Hy, source_value):
+        """One time step on the given field arrays (in place)."""
+        src = self.source_position
+
+        Hy += self.Chye * (Ez[1:] - Ez[:-1])
+        Ez[1:-1] = (
+            self.Ceze[1:-1] * Ez[1:-1]
+            + self.Cezh[1:-1] * (Hy[1:] - Hy[:-1])
+        )
+        Ez[src] += source_value
+        Ez[0] = Ez[1]
+        Ez[-1] = Ez[-2]
+
+        return Ez[src]
+
+    def misfit_gradient(self, source_signal, observed,
+                        checkpoint_interval=None):
+        """
+        Gradient of a trace misfit by the adjoint-state method.
+
+        The misfit is J = 0.5 * sum((trace - observed)^2) for the trace
+        recorded at the source position, starting from zero fields.
+        The forward run stores the fields only every
+        checkpoint_interval steps; during the reverse sweep each
+        segment is recomputed from its checkpoint, so memory is
+        O((nt / k + k) * nx) instead of O(nt * nx).
+
+        Parameters:
+            source_signal (ndarray): Time-domain source array
+            observed (ndarray): Observed trace (nt,)
+            checkpoint_interval (int): Steps between checkpoints
+                (default ~sqrt(nt))
+
+        Returns:
+            misfit (float), grad_epsilon_r (ndarray), grad_sigma (ndarray)
+        """
+        if len(source_signal) != self.nt or len(observed) != self.nt:
+            raise ValueError("Source signal length mismatch.")
+
+        nt = self.nt
+        nx = self.grid.nx
+        src = self.source_position
+
+        k = checkpoint_interval or max(int(np.sqrt(nt)), 1)
+
+        # --- Forward sweep with checkpoints ---
+        Ez = np.zeros(nx)
+        Hy = np.zeros(nx - 1)
+        trace = np.zeros(nt)
+        checkpoints = []
+
+        for n in range(nt):
+            if n % k == 0:
+                checkpoints.append((Ez.copy(), Hy.copy()))
+            trace[n] = self._forward_step(Ez, Hy, source_signal[n])
+
+        residual = trace - observed
+        misfit = 0.5 * float(np.sum(residual ** 2))
+
+        # --- Reverse sweep ---
+        lam_E = np.zeros(nx)
+        lam_H = np.zeros(nx - 1)
+        grad_Ceze = np.zeros(nx)
+        grad_Cezh = np.zeros(nx)
+
+        Ceze = self.Ceze[1:-1]
+        Cezh = self.Cezh[1:-1]
+
+        for segment in reversed(range(len(checkpoints))):
+            start = segment * k
+            stop = min(start + k, nt)
+
+            # Recompute E^n and H^(n+1) inside the segment
+            Ez, Hy = (a.copy() for a in checkpoints[segment])
+            E_hist = np.empty((stop - start, nx))
+            H_hist = np.empty((stop - start, nx - 1))
+
+            for n in range(start, stop):
+                E_hist[n - start] = Ez
+                self._forward_step(Ez, Hy, source_signal[n])
+                H_hist[n - start] = Hy
+
+            for n in reversed(range(start, stop)):
+                E_n = E_hist[n - start]
+                H_next = H_hist[n - start]
+
+                # Recording r_n = E^(n+1)[src]
+                lam_E[src] += residual[n]
+
+                # Boundary copies E[0] = E~[1], E[-1] = E~[-2]
+                lam_t = lam_E.copy()
+                lam_t[1] += lam_E[0]
+                lam_t[-2] += lam_E[-1]
+                lam_t[0] = 0.0
+                lam_t[-1] = 0.0
+
+                # E-field update (source injection is additive)
+                curl_H = H_next[1:] - H_next[:-1]
+                grad_Ceze[1:-1] += lam_t[1:-1] * E_n[1:-1]
+                grad_Cezh[1:-1] += lam_t[1:-1] * curl_H
+
+                q = Cezh * lam_t[1:-1]
+                lam_H[1:] += q
+                lam_H[:-1] -= q
+
+                lam_E = np.zeros(nx)
+                lam_E[1:-1] = Ceze * lam_t[1:-1]
+
+                # H-field update H^(n+1) = H^n + Chye * (E[1:] - E[:-1])
+                lam_E[1:] += self.Chye * lam_H
+                lam_E[:-1] -= self.Chye * lam_H
+
+        # --- Chain rule to material parameters ---
+        eps = EPSILON_0 * self.grid.epsilon_r
+        sigma = self.grid.sigma
+        dt, dx = self.dt, self.grid.dx
+
+        denom = eps + sigma * dt / 2
+        # Ceze = (eps - sigma dt / 2) / denom,  Cezh = dt / (dx * denom)
+        dCeze_deps = sigma * dt / denom ** 2
+        dCeze_dsigma = -eps * dt / denom ** 2
+        dCezh_deps = -dt / (dx * denom ** 2)
+        dCezh_dsigma = -dt ** 2 / (2 * dx * denom ** 2)
+
+        grad_epsilon_r = EPSILON_0 * (
+            grad_Ceze * dCeze_deps + grad_Cezh * dCezh_deps)
+        grad_sigma = grad_Ceze * dCeze_dsigma + grad_Cezh * dCezh_dsigma
+
+        return misfit, grad_epsilon_r, grad_sigma
+
+
+class BatchFDTDSolver1D:
+    """
+    1D FDTD solver (Ez-Hy mode) for a batch of media.
+
+    All scenarios share grid spacing, time step, duration and source
+    position; each row of epsilon_r / sigma is one scenario, and all
+    rows are advanced together with whole-array updates.
+
+    Parameters
+    ----------
+    epsilon_r : ndarray (batch, nx)
+        Relative permittivity per scenario
+    sigma : ndarray (batch, nx)
+        Conductivity per scenario (S/m)
+    dx : float
+        Spatial step (m)
+    dt : float
+        Time step (s)
+    total_time : float
+        Simulated time (s)
+    source_position : int
+        Source / receiver cell
+    """
+
+    def __init__(self, epsilon_r, sigma, dx, dt, total_time,
+                 source_position):
+        epsilon_r = np.atleast_2d(np.asarray(epsilon_r, dtype=float))
+        sigma = np.broadcast_to(np.asarray(sigma, dtype=float),
+                                epsilon_r.shape)
+
+        self.batch, self.nx = epsilon_r.shape
+
+        if source_position < 0 or source_position >= self.nx:
+            raise ValueError("Invalid source position index.")
+
+        self.dx = dx
+        self.dt = dt
+        self.total_time = total_time
+        self.source_position = source_position
+
+        self.nt = int(total_time / dt)
+
+        # Field arrays; Hy is stored with one unused padding cell per
+        # row so that a block of rows can be updated as one flat array
+        self.Ez = np.zeros((self.batch, self.nx))
+        self._Hy = np.zeros((self.batch, self.nx))
+        self.Hy = self._Hy[:, :-1]
+
+        # Reflection recording (at source location)
+        self.reflected_signal = np.zeros((self.batch, self.nt))
+
+        # Precompute update coefficients
+        self.Ceze, self.Cezh = compute_update_coefficients(
+            epsilon_r,
+            sigma,
+            dt,
+            dx
+        )
+
+        self.Chye = compute_magnetic_coefficient(dt, dx)
+
+    @classmethod
+    def from_grids(cls, grids, dt, total_time, source_position):
+        """
+        Build a batch from Grid1D objects of identical nx and dx.
+        """
+        if len({(g.nx, g.dx) for g in grids}) != 1:
+            raise ValueError("Grids must share nx and dx.")
+
+        return cls(
+            np.stack([g.epsilon_r for g in grids]),
+            np.stack([g.sigma for g in grids]),
+            grids[0].dx,
+            dt,
+            total_time,
+            source_position
+        )
+
+    def run(self, source_signal, profiler=None, n_threads=1,
+            block_steps=None):
+        """
+        Run FDTD simulation for all scenarios.
+
+        With n_threads > 1 the scenario axis is split into contiguous
+        shards advanced concurrently on a thread pool; shards share
+        the field and coefficient arrays (no copies) and are
+        synchronized at the end of every block of steps.
+
+        Parameters:
+            source_signal (ndarray): (nt,) shared source or
+                (batch, nt) per-scenario sources
+            profiler (SolverProfiler): Optional sampling profiler
+                (core/instrumentation.py)
+            n_threads (int): Number of shards / worker threads
+            block_steps (int): Steps between synchronizations
+                (default: only at profiler samples and the end)
+
+        Returns:
+            ndarray: (batch, nt) reflected signals
+        """
+        source_signal = np.asarray(source_signal, dtype=float)
+        if source_signal.shape[-1] != self.nt:
             raise ValueError("Source signal length mismatch.")
+        if n_threads <= 0:
+            raise ValueError("n_threads must be positive.")
+        if block_steps is not None and block_steps <= 0:
+            raise ValueError("block_steps must be positive.")
+
+        source = np.broadcast_to(source_signal, (self.batch, self.nt)).T
+
+        Ceze = self.Ceze[:, 1:-1]
+        Cezh = self.Cezh[:, 1:-1]
+        sample_every = profiler.sample_every if profiler is not None else 0
+
+        shards = self._shards(n_threads)
+        executor = ThreadPoolExecutor(len(shards)) if len(shards) > 1 \
+            else None
+
+        if profiler is not None:
+            profiler.begin("BatchFDTDSolver1D", self.batch * self.nx)
+
+        try:
+            n = 0
+            while n < self.nt:
+
+                if sample_every and n % sample_every == 0:
+                    self._profiled_step(n, source[n], Ceze, Cezh, profiler)
+                    n += 1
+                    continue
+
+                stop = self.nt
+                if block_steps is not None:
+                    stop = min(stop, n + block_steps)
+                if sample_every:
+                    stop = min(stop, (n // sample_every + 1) * sample_every)
+
+                if executor is None:
+                    self._advance_shard(shards[0], source, n, stop - n)
+                else:
+                    futures = [
+                        executor.submit(self._advance_shard, shard, source,
+                                        n, stop - n)
+                        for shard in shards
+                    ]
+                    for future in futures:
+                        future.result()
 
-        for n in range(self.nt):
+                n = stop
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if profiler is not None:
+            profiler.end(self.nt)
+
+        return self.reflected_signal
+
+    def _shards(self, n_threads):
+        """Contiguous row ranges with their scratch buffers."""
+        bounds = np.linspace(0, self.batch,
+                             min(n_threads, self.batch) + 1).astype(int)
+
+        return [
+            (slice(a, b),
+             np.empty((b - a) * self.nx - 1),
+             np.empty((b - a) * self.nx - 2))
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def _advance_shard(self, shard, source, n0, k):
+        """
+        Advance the rows of one shard by k steps.
+
+        The shard's rows are updated as one flat 1D array: interior
+        cells see exactly their own row's neighbours, while the cells
+        next to row seams (the boundary cells and the Hy padding)
+        receive values that the boundary copies overwrite or that are
+        never read.  Every update is a ufunc writing into a view or a
+        preallocated scratch buffer (out=), so the loop allocates no
+        arrays, needs no iterator buffering, and NumPy releases the
+        GIL for the whole of each update.
+        """
+        rows, dE, dH = shard
+        src = self.source_position
+        Chye = self.Chye
+
+        Ez = self.Ez[rows].reshape(-1)
+        Hy = self._Hy[rows].reshape(-1)
+        Ez_right, Ez_left, Ez_inner = Ez[1:], Ez[:-1], Ez[1:-1]
+        Hy_head, Hy_right, Hy_left = Hy[:-1], Hy[1:-1], Hy[:-2]
+
+        Ceze = self.Ceze[rows].reshape(-1)[1:-1]
+        Cezh = self.Cezh[rows].reshape(-1)[1:-1]
+
+        Ez_rows = self.Ez[rows]
+        Ez_src = Ez_rows[:, src]
+        source = source[:, rows]
+        record = self.reflected_signal[rows]
+
+        for n in range(n0, n0 + k):
 
             # --- Update Magnetic Field ---
-            for i in range(self.grid.nx - 1):
-                self.Hy[i] += self.Chye * (
-                    self.Ez[i + 1] - self.Ez[i]
-                )
+            np.subtract(Ez_right, Ez_left, out=dE)
+            np.multiply(dE, Chye, out=dE)
+            np.add(Hy_head, dE, out=Hy_head)
 
             # --- Update Electric Field ---
-            for i in range(1, self.grid.nx - 1):
-                self.Ez[i] = (
-                    self.Ceze[i] * self.Ez[i]
-                    + self.Cezh[i] * (self.Hy[i] - self.Hy[i - 1])
-                )
+            np.subtract(Hy_right, Hy_left, out=dH)
+            np.multiply(dH, Cezh, out=dH)
+            np.multiply(Ez_inner, Ceze, out=Ez_inner)
+            np.add(Ez_inner, dH, out=Ez_inner)
 
             # --- Source Injection (Soft Source) ---
-            self.Ez[self.source_position] += source_signal[n]
+            np.add(Ez_src, source[n], out=Ez_src)
 
             # --- Simple Absorbing Boundary (1st order ABC) ---
-            self.Ez[0] = self.Ez[1]
-            self.Ez[-1] = self.Ez[-2]
+            Ez_rows[:, 0] = Ez_rows[:, 1]
+            Ez_rows[:, -1] = Ez_rows[:, -2]
 
             # --- Record Reflection ---
-            self.reflected_signal[n] = self.Ez[self.source_position]
+            record[:, n] = Ez_src
 
-        return self.reflected_signal
+    def _profiled_step(self, n, source_value, Ceze, Cezh, profiler):
+        """One time step of run(), split into timed phases."""
+        src = self.source_position
+        clock = time.perf_counter
+
+        t0 = clock()
+        self.Hy += self.Chye * (self.Ez[:, 1:] - self.Ez[:, :-1])
+        t1 = clock()
+        self.Ez[:, 1:-1] = (
+            Ceze * self.Ez[:, 1:-1]
+            + Cezh * (self.Hy[:, 1:] - self.Hy[:, :-1])
+        )
+        t2 = clock()
+        self.Ez[:, src] += source_value
+        t3 = clock()
+        self.Ez[:, 0] = self.Ez[:, 1]
+        self.Ez[:, -1] = self.Ez[:, -2]
+        t4 = clock()
+        self.reflected_signal[:, n] = self.Ez[:, src]
+        t5 = clock()
+
+        profiler.add_sample((t0, t1, t2, t3, t4, t5))
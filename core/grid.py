@@ -75,6 +75,28 @@ class Grid1D:
         self.epsilon_r[indices] = material.epsilon_r
         self.sigma[indices] = material.sigma
 
+    def assign_cells(self, start, end, material):
+        """
+        Assign a material to a range of cells.
+
+        Parameters
+        ----------
+        start : int
+            First cell index
+        end : int
+            End cell index (exclusive), as in LAYER_PROFILES
+        material : Material
+            Material object
+        """
+        if not isinstance(material, Material):
+            raise TypeError("material must be a Material object.")
+
+        if start < 0 or end > self.nx or start >= end:
+            raise ValueError("Invalid layer boundaries.")
+
+        self.epsilon_r[start:end] = material.epsilon_r
+        self.sigma[start:end] = material.sigma
+
     # --------------------------------------------------
     # Object Embedding
     # --------------------------------------------------
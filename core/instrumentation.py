@@ -0,0 +1,195 @@
+"""
+core/instrumentation.py
+
+Sampling profiler for the FDTD engines.
+
+Timing every phase of every time step would cost more than the
+steps themselves on small grids.  Instead the run as a whole is timed
+once, and only every `sample_every`-th step is split into phases (H
+update, E update, source injection, boundary, recording).  Per-phase
+costs are extrapolated from the sampled steps; the remainder of the
+wall time is reported as loop overhead.  Unsampled steps run the
+normal, untimed code path.
+"""
+
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+PHASES = ("h_update", "e_update", "source", "boundary", "record")
+
+
+def peak_memory_bytes():
+    """
+    Process memory high-water mark (bytes), or None if unavailable.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# -------------------------------------------------------
+# Run Profile
+# -------------------------------------------------------
+
+class RunProfile:
+    """
+    Measurements of one solver run.
+
+    Attributes
+    ----------
+    engine : str
+    n_cells : int
+        Cells updated per step (nx, or batch * nx)
+    steps : int
+        Time steps executed
+    wall_time : float
+        Total run time (s)
+    phase_seconds : dict
+        Estimated time per phase (s), plus "overhead"
+    sampled_steps : int
+    peak_memory_bytes : int or None
+    """
+
+    def __init__(self, engine, n_cells, steps, wall_time, phase_seconds,
+                 sampled_steps, peak_memory):
+        self.engine = engine
+        self.n_cells = n_cells
+        self.steps = steps
+        self.wall_time = wall_time
+        self.phase_seconds = phase_seconds
+        self.sampled_steps = sampled_steps
+        self.peak_memory_bytes = peak_memory
+
+    @property
+    def mcells_per_s(self):
+        """Cell updates per second, in millions."""
+        if self.wall_time <= 0:
+            return 0.0
+        return self.n_cells * self.steps / self.wall_time / 1e6
+
+    @property
+    def phase_fractions(self):
+        if self.wall_time <= 0:
+            return {name: 0.0 for name in self.phase_seconds}
+        return {
+            name: seconds / self.wall_time
+            for name, seconds in self.phase_seconds.items()
+        }
+
+    def to_dict(self):
+        return {
+            "engine": self.engine,
+            "n_cells": self.n_cells,
+            "steps": self.steps,
+            "wall_time": self.wall_time,
+            "mcells_per_s": self.mcells_per_s,
+            "phase_seconds": dict(self.phase_seconds),
+            "phase_fractions": self.phase_fractions,
+            "sampled_steps": self.sampled_steps,
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
+
+    def __repr__(self):
+        phases = ", ".join(
+            f"{name}={fraction:.0%}"
+            for name, fraction in self.phase_fractions.items()
+        )
+        return (f"RunProfile({self.engine}, {self.steps} steps, "
+                f"{self.mcells_per_s:.1f} Mcells/s, {phases})")
+
+
+# -------------------------------------------------------
+# Profiler
+# -------------------------------------------------------
+
+class SolverProfiler:
+    """
+    Sampling profiler passed to an engine's run(profiler=...).
+
+    Parameters
+    ----------
+    sample_every : int
+        Split every n-th step into phases (others run untimed)
+    callback : callable (optional)
+        Called with the RunProfile at the end of each run, e.g. to
+        forward it to a metrics pipeline
+    """
+
+    def __init__(self, sample_every=64, callback=None):
+        if sample_every <= 0:
+            raise ValueError("sample_every must be positive.")
+
+        self.sample_every = int(sample_every)
+        self.callback = callback
+        self.profiles = []
+        self._reset()
+
+    def _reset(self):
+        self._sums = [0.0] * len(PHASES)
+        self._samples = 0
+        self._start = None
+
+    @property
+    def last(self):
+        """Most recent RunProfile (None before the first run)."""
+        return self.profiles[-1] if self.profiles else None
+
+    def begin(self, engine, n_cells):
+        self._reset()
+        self._engine = engine
+        self._n_cells = n_cells
+        self._start = time.perf_counter()
+
+    def add_sample(self, stamps):
+        """
+        Record one sampled step.
+
+        Parameters
+        ----------
+        stamps : sequence of float
+            perf_counter() values before the first phase and after
+            each phase (len(PHASES) + 1 entries)
+        """
+        for i in range(len(PHASES)):
+            self._sums[i] += stamps[i + 1] - stamps[i]
+        self._samples += 1
+
+    def end(self, steps):
+        """
+        Close the run and build its RunProfile.
+        """
+        wall_time = time.perf_counter() - self._start
+
+        estimated = sum(self._sums) * steps / max(self._samples, 1)
+
+        # Timer calls inflate the sampled steps slightly; never let the
+        # extrapolated phases exceed the measured wall time
+        scale = steps / max(self._samples, 1)
+        if estimated > wall_time:
+            scale *= wall_time / estimated
+
+        phase_seconds = {
+            name: total * scale for name, total in zip(PHASES, self._sums)
+        }
+        phase_seconds["overhead"] = max(
+            wall_time - sum(phase_seconds.values()), 0.0)
+
+        profile = RunProfile(self._engine, self._n_cells, steps, wall_time,
+                             phase_seconds, self._samples,
+                             peak_memory_bytes())
+        self.profiles.append(profile)
+
+        if self.callback is not None:
+            self.callback(profile)
+
+        return profile
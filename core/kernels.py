@@ -0,0 +1,126 @@
+"""
+core/kernels.py
+
+Multi-step FDTD kernels.
+
+Each kernel advances the 1D Yee fields by k time steps in a single
+call, including the soft source injection, the first-order boundary
+copies and the recording at the source cell, so the caller pays the
+Python dispatch cost once per block instead of once per step.
+
+Both implementations are registered as the "fdtd_steps" kernel of
+core/backends.py: "numba" runs the block as one compiled loop
+(`jit_steps`, available when Numba is installed), "numpy" advances it
+with whole-array updates on views sliced once per block.  Both have
+the signature
+
+    kernel(Ez, Hy, Ceze, Cezh, Chye, src, source, record, n0, k,
+           dE, dH)
+
+and update Ez, Hy and record[n0:n0 + k] in place.  dE (nx - 1,) and
+dH (nx - 2,) are scratch buffers owned by the caller, so the NumPy
+time loop writes every intermediate into preallocated memory and
+performs no array allocations.
+"""
+
+import numpy as np
+
+from core.backends import jit, register
+
+
+# -------------------------------------------------------
+# NumPy Kernel
+# -------------------------------------------------------
+
+def numpy_steps(Ez, Hy, Ceze, Cezh, Chye, src, source, record, n0, k,
+                dE, dH):
+    """
+    Advance k steps with in-place ufunc chains.
+
+    Parameters
+    ----------
+    Ez : ndarray (nx,)
+    Hy : ndarray (nx - 1,)
+    Ceze, Cezh : ndarray (nx,)
+        Electric field update coefficients
+    Chye : float
+        Magnetic field update coefficient
+    src : int
+        Source / receiver cell
+    source : ndarray (nt,)
+        Source signal
+    record : ndarray (nt,)
+        Recorded Ez[src] per step
+    n0 : int
+        Index of the first step of the block
+    k : int
+        Steps to advance
+    dE, dH : ndarray (nx - 1,), (nx - 2,)
+        Scratch buffers for the field differences
+    """
+    # Views are created once per block, not once per step
+    Ez_right, Ez_left, Ez_inner = Ez[1:], Ez[:-1], Ez[1:-1]
+    Hy_right, Hy_left = Hy[1:], Hy[:-1]
+    Ceze_inner, Cezh_inner = Ceze[1:-1], Cezh[1:-1]
+
+    for n in range(n0, n0 + k):
+
+        # --- Update Magnetic Field ---
+        np.subtract(Ez_right, Ez_left, out=dE)
+        np.multiply(dE, Chye, out=dE)
+        np.add(Hy, dE, out=Hy)
+
+        # --- Update Electric Field ---
+        np.subtract(Hy_right, Hy_left, out=dH)
+        np.multiply(dH, Cezh_inner, out=dH)
+        np.multiply(Ez_inner, Ceze_inner, out=Ez_inner)
+        np.add(Ez_inner, dH, out=Ez_inner)
+
+        # --- Source Injection (Soft Source) ---
+        Ez[src] += source[n]
+
+        # --- Simple Absorbing Boundary (1st order ABC) ---
+        Ez[0] = Ez[1]
+        Ez[-1] = Ez[-2]
+
+        # --- Record Reflection ---
+        record[n] = Ez[src]
+
+
+# -------------------------------------------------------
+# Compiled Kernel
+# -------------------------------------------------------
+
+def _loop_steps(Ez, Hy, Ceze, Cezh, Chye, src, source, record, n0, k,
+                dE, dH):
+    # Scalar loops need no scratch; dE / dH keep the shared signature
+    nx = Ez.shape[0]
+
+    for n in range(n0, n0 + k):
+        for i in range(nx - 1):
+            Hy[i] += Chye * (Ez[i + 1] - Ez[i])
+
+        # Ez[i] depends only on itself and Hy, so in-place is exact
+        for i in range(1, nx - 1):
+            Ez[i] = Ceze[i] * Ez[i] + Cezh[i] * (Hy[i] - Hy[i - 1])
+
+        Ez[src] += source[n]
+
+        Ez[0] = Ez[1]
+        Ez[nx - 1] = Ez[nx - 2]
+
+        record[n] = Ez[src]
+
+
+jit_steps = jit(_loop_steps)
+
+
+def _warmup_steps():
+    Ez, Hy = np.zeros(4), np.zeros(3)
+    coefficients = np.ones(4)
+    jit_steps(Ez, Hy, coefficients, coefficients, 0.5, 1, np.zeros(2),
+              np.zeros(2), 0, 2, np.empty(3), np.empty(2))
+
+
+register("fdtd_steps", "numpy", numpy_steps)
+register("fdtd_steps", "numba", jit_steps, warmup=_warmup_steps)
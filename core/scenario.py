@@ -0,0 +1,591 @@
+"""
+core/scenario.py
+
+Declarative, validated scenario descriptions.
+
+A Scenario holds everything that determines a simulation: grid size,
+cell size, number of steps, Courant factor, background, layers and
+objects (in cells), source frequency and position.  Scenarios are
+built from plain dicts (JSON / TOML files, the sweep queue, the
+service, the GUI) or from the configuration presets.  They are
+validated once on construction and are immutable afterwards.
+
+Materials may be MATERIAL_DATABASE names or inline properties and are
+stored resolved.  The canonical JSON form, and the sha256 hash that
+result stores and sweep runners key on, therefore change whenever the
+physics does, including edits to the database.  The label is not part
+of either.
+
+Dict form::
+
+    {"nx": 200, "dx": 1e-3, "nt": 400, "frequency": 10e9,
+     "layers": [[0, 150, "Air"], [150, 200, "Dry Soil"]],
+     "objects": [{"start": 120, "end": 130,
+                  "material": {"name": "Target", "epsilon_r": 6.0}}]}
+
+or the preset shorthand {"preset": "Small Test", "profile": "Air-Soil",
+"object_material": "Steel"} (see Scenario.from_presets).
+
+Files hold one scenario, a list, or {"defaults": {...}, "scenarios":
+[...]} (TOML: a [defaults] table and [[scenarios]] tables); defaults
+are merged into every scenario.
+"""
+
+import hashlib
+import json
+import math
+import numbers
+import operator
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+from config.material_database import MATERIAL_DATABASE
+from config.simulation_config import (
+    CFL_SAFETY_FACTOR,
+    DEFAULT_SOURCE_POSITION,
+    GRID_PRESETS,
+    LAYER_PROFILES
+)
+from core.material import Material
+from physics.wave_equations import compute_time_step
+
+
+class ScenarioError(ValueError):
+    """
+    Invalid scenario; `problems` lists every failed check.
+    """
+
+    def __init__(self, problems):
+        if isinstance(problems, str):
+            problems = [problems]
+        super().__init__("; ".join(problems))
+        self.problems = list(problems)
+
+
+# -------------------------------------------------------
+# Materials and Regions
+# -------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class MaterialSpec:
+    """
+    Resolved material properties.
+
+    Parameters
+    ----------
+    name : str
+    epsilon_r : float
+        Relative permittivity
+    mu_r : float
+        Relative permeability
+    sigma : float
+        Conductivity (S/m)
+    """
+
+    name: str
+    epsilon_r: float
+    mu_r: float = 1.0
+    sigma: float = 0.0
+
+    def __post_init__(self):
+        for key in ("epsilon_r", "mu_r", "sigma"):
+            try:
+                object.__setattr__(self, key, float(getattr(self, key)))
+            except (TypeError, ValueError):
+                raise ScenarioError(
+                    f"material {self.name}: {key} must be a number") \
+                    from None
+            if not math.isfinite(getattr(self, key)):
+                raise ScenarioError(
+                    f"material {self.name}: {key} must be finite")
+
+        if self.epsilon_r <= 0 or self.mu_r <= 0:
+            raise ScenarioError(
+                f"material {self.name}: epsilon_r and mu_r must be positive")
+        if self.sigma < 0:
+            raise ScenarioError(
+                f"material {self.name}: sigma cannot be negative")
+
+    @classmethod
+    def from_value(cls, value):
+        """MaterialSpec from a database name, a dict or a MaterialSpec."""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            return _database_material(value)
+        if isinstance(value, Material):
+            return cls(value.name, value.epsilon_r, value.mu_r, value.sigma)
+        if isinstance(value, dict):
+            unknown = set(value) - {"name", "epsilon_r", "mu_r", "sigma"}
+            if unknown or "epsilon_r" not in value:
+                raise ScenarioError(
+                    f"invalid material keys: {sorted(value)}")
+            try:
+                return _material(value.get("name", "Custom"),
+                                 value["epsilon_r"], value.get("mu_r", 1.0),
+                                 value.get("sigma", 0.0))
+            except TypeError:
+                raise ScenarioError(f"invalid material: {value!r}") \
+                    from None
+
+        raise ScenarioError(f"invalid material: {value!r}")
+
+    def to_dict(self):
+        return {"name": self.name, "epsilon_r": self.epsilon_r,
+                "mu_r": self.mu_r, "sigma": self.sigma}
+
+    def to_material(self):
+        return Material(self.name, self.epsilon_r, self.mu_r, self.sigma)
+
+
+# Sweeps repeat the same few materials and regions thousands of times;
+# these caches hand out one shared (immutable) instance for each
+
+@lru_cache(maxsize=None)
+def _database_material(name):
+    if name not in MATERIAL_DATABASE:
+        raise ScenarioError(f"unknown material: {name}")
+
+    props = MATERIAL_DATABASE[name]
+    return _material(name, props["epsilon_r"], props["mu_r"],
+                     props["sigma"])
+
+
+@lru_cache(maxsize=4096)
+def _material(name, epsilon_r, mu_r, sigma):
+    return MaterialSpec(name, epsilon_r, mu_r, sigma)
+
+
+@dataclass(frozen=True, slots=True)
+class Region:
+    """
+    Cells [start, end) filled with a material.
+    """
+
+    start: int
+    end: int
+    material: MaterialSpec
+
+    @classmethod
+    def from_value(cls, value):
+        """Region from [start, end, material], a dict or a Region."""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            try:
+                value = (value["start"], value["end"], value["material"])
+            except KeyError as error:
+                raise ScenarioError(
+                    f"region is missing '{error.args[0]}'") from None
+
+        try:
+            start, end, material = value
+        except (TypeError, ValueError):
+            raise ScenarioError(f"invalid region: {value!r}") from None
+
+        return _region(_to_int(start, "region start"),
+                       _to_int(end, "region end"),
+                       MaterialSpec.from_value(material))
+
+    def to_list(self):
+        return [self.start, self.end, self.material.to_dict()]
+
+
+@lru_cache(maxsize=4096)
+def _region(start, end, material):
+    return Region(start, end, material)
+
+
+def _to_int(value, name):
+    # numbers.Integral covers NumPy integers; bool is not a size
+    if isinstance(value, numbers.Integral) and not isinstance(value, bool):
+        return operator.index(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ScenarioError(f"{name} must be an integer")
+
+
+def _to_float(value, name):
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        raise ScenarioError(f"{name} must be a number")
+    if not math.isfinite(value):
+        raise ScenarioError(f"{name} must be finite")
+    return float(value)
+
+
+def clip_regions(regions, nx):
+    """Regions clipped to nx cells; those entirely outside are dropped."""
+    clipped = []
+    for start, end, material in regions:
+        end = min(end, nx)
+        if start < end:
+            clipped.append((start, end, material))
+    return clipped
+
+
+# -------------------------------------------------------
+# Scenario
+# -------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    """
+    Complete, validated description of one simulation.
+
+    Parameters
+    ----------
+    nx : int
+        Number of cells
+    dx : float
+        Cell size (m)
+    nt : int
+        Number of time steps
+    frequency : float
+        Ricker center frequency (Hz)
+    source_position : int
+        Source / receiver cell
+    courant_factor : float
+        dt = courant_factor * dx / c0
+    background : MaterialSpec
+        Medium outside all layers (name, dict or MaterialSpec)
+    layers : tuple of Region
+        Non-overlapping layers ([start, end, material] or dicts)
+    objects : tuple of Region
+        Non-overlapping objects, applied over the layers
+    label : str
+        Free-form name; not part of the hash or of equality
+
+    Raises
+    ------
+    ScenarioError
+        Listing every failed check (types, grid bounds, layer and
+        object overlap, materials, Courant and sampling limits)
+    """
+
+    nx: int
+    dx: float
+    nt: int
+    frequency: float
+    source_position: int = DEFAULT_SOURCE_POSITION
+    courant_factor: float = CFL_SAFETY_FACTOR
+    background: MaterialSpec = "Air"
+    layers: tuple = ()
+    objects: tuple = ()
+    label: str = field(default="", compare=False)
+    _digest: str = field(default=None, init=False, repr=False,
+                         compare=False)
+
+    def __post_init__(self):
+        problems = []
+
+        def convert(key, function, *args):
+            try:
+                object.__setattr__(self, key,
+                                   function(getattr(self, key), *args))
+            except ScenarioError as error:
+                problems.extend(error.problems)
+                return False
+            return True
+
+        valid = all([
+            convert("nx", _to_int, "nx"),
+            convert("nt", _to_int, "nt"),
+            convert("source_position", _to_int, "source_position"),
+            convert("dx", _to_float, "dx"),
+            convert("frequency", _to_float, "frequency"),
+            convert("courant_factor", _to_float, "courant_factor"),
+            convert("background", MaterialSpec.from_value),
+            convert("layers", _to_regions, "layer"),
+            convert("objects", _to_regions, "object"),
+        ])
+        object.__setattr__(self, "label", str(self.label))
+
+        if valid:
+            problems.extend(self._check())
+        if problems:
+            raise ScenarioError(problems)
+
+    def _check(self):
+        problems = []
+
+        if self.nx < 3:
+            problems.append("nx must be at least 3")
+        if self.nt < 1:
+            problems.append("nt must be positive")
+        if self.dx <= 0:
+            problems.append("dx must be positive")
+        if self.frequency <= 0:
+            problems.append("frequency must be positive")
+        if not 0 < self.source_position < self.nx - 1:
+            problems.append(f"source_position {self.source_position} "
+                            f"outside the grid interior (1..{self.nx - 2})")
+
+        for kind, regions in (("layer", self.layers),
+                              ("object", self.objects)):
+            for i, region in enumerate(regions):
+                if not 0 <= region.start < region.end <= self.nx:
+                    problems.append(
+                        f"{kind} {i} [{region.start}, {region.end}) "
+                        f"outside the grid [0, {self.nx}) or empty")
+
+            ordered = sorted(range(len(regions)),
+                             key=lambda i: regions[i].start)
+            for a, b in zip(ordered[:-1], ordered[1:]):
+                if regions[b].start < regions[a].end:
+                    problems.append(f"{kind}s {a} and {b} overlap")
+
+        # Courant limit in the fastest medium (the solver treats all
+        # media as non-magnetic)
+        if not 0 < self.courant_factor <= 1:
+            problems.append("courant_factor must be in (0, 1]")
+        else:
+            eps_min = min([self.background.epsilon_r]
+                          + [r.material.epsilon_r for r in self.layers]
+                          + [r.material.epsilon_r for r in self.objects])
+            if self.courant_factor > eps_min ** 0.5:
+                problems.append(
+                    f"Courant condition violated in a medium with "
+                    f"epsilon_r = {eps_min}")
+
+        if self.dx > 0 and self.frequency > 0 \
+                and 0 < self.courant_factor <= 1 \
+                and self.frequency * self.dt >= 0.5:
+            problems.append("frequency above the Nyquist limit of dt")
+
+        return problems
+
+    # --------------------------------------------------
+    # Construction
+    # --------------------------------------------------
+
+    @classmethod
+    def from_dict(cls, data, defaults=None):
+        """
+        Scenario from a dict (see module docstring).
+
+        Parameters
+        ----------
+        data : dict
+        defaults : dict (optional)
+            Values for keys missing from data
+        """
+        if not isinstance(data, dict):
+            raise ScenarioError("scenario must be a mapping")
+        if defaults:
+            data = {**defaults, **data}
+
+        try:
+            if "preset" in data:
+                return cls.from_presets(**data)
+            return cls(**data)
+        except ScenarioError:
+            raise
+        except (TypeError, ValueError) as error:
+            # Anything else the input trips over is still the input's fault
+            raise ScenarioError(str(error).replace(".__init__()", "()")) \
+                from None
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def from_presets(cls, preset, profile=None, object_material=None,
+                     object_position=0.6, object_width=10,
+                     frequency=10e9, **fields):
+        """
+        Scenario from a GRID_PRESETS entry and a LAYER_PROFILES entry.
+
+        Profile layers are clipped to the grid.  The object, if any,
+        starts at object_position (fraction of the grid length) and is
+        object_width cells thick.  Further keyword arguments (nx, dx,
+        nt, layers, objects, source_position, ...) override the
+        preset values.
+        """
+        if preset not in GRID_PRESETS:
+            raise ScenarioError(f"unknown grid preset: {preset}")
+        if profile is not None and profile not in LAYER_PROFILES:
+            raise ScenarioError(f"unknown layer profile: {profile}")
+
+        for key, value in GRID_PRESETS[preset].items():
+            fields.setdefault(key, value)
+        nx = _to_int(fields["nx"], "nx")
+
+        if profile is not None:
+            fields.setdefault("layers",
+                              clip_regions(LAYER_PROFILES[profile], nx))
+        if object_material is not None:
+            start = int(_to_float(object_position, "object_position") * nx)
+            width = _to_int(object_width, "object_width")
+            fields.setdefault("objects", [
+                (start, start + width, object_material)])
+
+        fields.setdefault("label", "/".join(
+            str(part) for part in (preset, profile, object_material)
+            if part is not None))
+
+        return cls(frequency=frequency, **fields)
+
+    # --------------------------------------------------
+    # Serialization
+    # --------------------------------------------------
+
+    def to_dict(self, label=True):
+        """
+        Plain dict with materials resolved (from_dict() round trips).
+        """
+        data = {
+            "nx": self.nx,
+            "dx": self.dx,
+            "nt": self.nt,
+            "frequency": self.frequency,
+            "source_position": self.source_position,
+            "courant_factor": self.courant_factor,
+            "background": self.background.to_dict(),
+            "layers": [region.to_list() for region in self.layers],
+            "objects": [region.to_list() for region in self.objects],
+        }
+        if label and self.label:
+            data["label"] = self.label
+        return data
+
+    def canonical_json(self):
+        """Deterministic JSON of the physics (sorted keys, no label)."""
+        return json.dumps(self.to_dict(label=False), sort_keys=True,
+                          separators=(",", ":"), allow_nan=False)
+
+    @property
+    def hash(self):
+        """sha256 hex digest of canonical_json() (computed once)."""
+        if self._digest is None:
+            object.__setattr__(self, "_digest", hashlib.sha256(
+                self.canonical_json().encode()).hexdigest())
+        return self._digest
+
+    # --------------------------------------------------
+    # Simulation
+    # --------------------------------------------------
+
+    @property
+    def dt(self):
+        """Time step (s)."""
+        return compute_time_step(self.dx, self.courant_factor)
+
+    def build_grid(self):
+        """Grid1D with the background, layers and objects applied."""
+        from core.simulation import build_grid
+
+        return build_grid(
+            self.nx, self.dx,
+            layers=[(r.start, r.end, r.material.to_material())
+                    for r in self.layers],
+            objects=[(r.start, r.end, r.material.to_material())
+                     for r in self.objects],
+            background=self.background.to_material()
+        )
+
+    def create_solver(self, backend=None):
+        """FDTDSolver1D for this scenario (exactly nt steps)."""
+        from core.simulation import create_solver
+
+        return create_solver(self.build_grid(), self.nt,
+                             self.source_position, self.courant_factor,
+                             backend=backend)
+
+    def source_signal(self):
+        """Ricker source of nt samples."""
+        from core.simulation import ricker_source
+
+        return ricker_source(self.dt, self.nt, self.frequency)
+
+
+def _to_regions(value, kind):
+    if isinstance(value, tuple) and all(type(r) is Region for r in value):
+        return value
+    if not isinstance(value, (list, tuple)):
+        raise ScenarioError(f"{kind}s must be a list")
+
+    regions = []
+    problems = []
+    for i, item in enumerate(value):
+        try:
+            regions.append(Region.from_value(item))
+        except ScenarioError as error:
+            problems.extend(f"{kind} {i}: {p}" for p in error.problems)
+
+    if problems:
+        raise ScenarioError(problems)
+    return tuple(regions)
+
+
+# -------------------------------------------------------
+# Files
+# -------------------------------------------------------
+
+def parse_scenarios(data):
+    """
+    Scenarios from a decoded file: one scenario dict, a list, or
+    {"defaults": {...}, "scenarios": [...]}.
+
+    Raises
+    ------
+    ScenarioError
+        Naming the index of every invalid scenario
+    """
+    defaults = None
+    if isinstance(data, dict) and "scenarios" in data:
+        defaults = data.get("defaults")
+        data = data["scenarios"]
+    elif isinstance(data, dict):
+        data = [data]
+
+    if not isinstance(data, list):
+        raise ScenarioError("expected a scenario or a list of scenarios")
+
+    scenarios = []
+    problems = []
+    for i, item in enumerate(data):
+        try:
+            scenarios.append(Scenario.from_dict(item, defaults))
+        except ScenarioError as error:
+            problems.extend(f"scenario {i}: {p}" for p in error.problems)
+
+    if problems:
+        raise ScenarioError(problems)
+    return scenarios
+
+
+def load_scenarios(path):
+    """
+    Load and validate scenarios from a .json or .toml file.
+
+    TOML needs Python 3.11+ (tomllib) or the tomli package.
+
+    Returns
+    -------
+    list of Scenario
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".toml":
+        if tomllib is None:
+            raise ImportError("Reading TOML needs Python 3.11+ "
+                              "or the tomli package.")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    elif extension == ".json":
+        with open(path) as f:
+            data = json.load(f)
+    else:
+        raise ValueError(f"Unsupported scenario file: {path}")
+
+    return parse_scenarios(data)
@@ -0,0 +1,134 @@
+"""
+core/simulation.py
+
+Helpers that assemble grids, sources and solvers from the
+configuration presets and run a complete reflection simulation.
+"""
+
+from config.material_database import MATERIAL_DATABASE
+from config.simulation_config import (
+    CFL_SAFETY_FACTOR,
+    DEFAULT_SOURCE_POSITION
+)
+from core.fdtd_solver import FDTDSolver1D
+from core.grid import Grid1D
+from core.material import Material
+from core.source import Source
+from physics.wave_equations import compute_time_step
+
+
+# -------------------------------------------------------
+# Materials
+# -------------------------------------------------------
+
+def material_from_database(name):
+    """
+    Create a Material from a MATERIAL_DATABASE entry.
+
+    Parameters
+    ----------
+    name : str or Material
+        Database key (a Material is returned unchanged)
+
+    Returns
+    -------
+    Material
+    """
+    if isinstance(name, Material):
+        return name
+
+    if name not in MATERIAL_DATABASE:
+        raise KeyError(f"Unknown material: {name}")
+
+    props = MATERIAL_DATABASE[name]
+
+    return Material(
+        name,
+        epsilon_r=props["epsilon_r"],
+        mu_r=props["mu_r"],
+        sigma=props["sigma"]
+    )
+
+
+# -------------------------------------------------------
+# Grid Assembly
+# -------------------------------------------------------
+
+def build_grid(nx, dx, layers=(), objects=(), background="Air"):
+    """
+    Build a layered grid with embedded objects.
+
+    Parameters
+    ----------
+    nx : int
+        Number of cells
+    dx : float
+        Cell size (m)
+    layers : iterable of (start, end, material)
+        Layer extents in cells (end exclusive), e.g. a LAYER_PROFILES
+        entry; extents beyond the grid are clipped
+    objects : iterable of (start, end, material)
+        Objects in cells, applied after the layers
+    background : str or Material
+        Background medium
+
+    Returns
+    -------
+    Grid1D
+    """
+    grid = Grid1D(nx, dx, material_from_database(background))
+
+    for start, end, material in list(layers) + list(objects):
+        end = min(end, nx)
+        if start >= end:
+            continue
+        grid.assign_cells(start, end, material_from_database(material))
+
+    return grid
+
+
+# -------------------------------------------------------
+# Simulation
+# -------------------------------------------------------
+
+def simulation_time_step(dx, courant_factor=CFL_SAFETY_FACTOR):
+    """Stable time step for the given cell size."""
+    return compute_time_step(dx, courant_factor)
+
+
+def ricker_source(dt, nt, frequency, amplitude=1.0):
+    """
+    Ricker source signal of exactly nt samples.
+    """
+    # Half-step margin so the floor in FDTDSolver1D yields nt steps
+    source = Source(dt, (nt + 0.5) * dt)
+    return source.ricker_wavelet(frequency, amplitude)[:nt]
+
+
+def create_solver(grid, nt, source_position=DEFAULT_SOURCE_POSITION,
+                  courant_factor=CFL_SAFETY_FACTOR, backend=None):
+    """
+    Create an FDTDSolver1D running exactly nt steps.
+    """
+    dt = simulation_time_step(grid.dx, courant_factor)
+    return FDTDSolver1D(grid, dt, (nt + 0.5) * dt, source_position,
+                        backend=backend)
+
+
+def simulate_reflection(grid, nt, frequency,
+                        source_position=DEFAULT_SOURCE_POSITION,
+                        courant_factor=CFL_SAFETY_FACTOR):
+    """
+    Run a Ricker-source simulation and return the recorded trace.
+
+    Returns
+    -------
+    signal : ndarray (nt,)
+        Field recorded at the source position
+    dt : float
+        Time step (s)
+    """
+    solver = create_solver(grid, nt, source_position, courant_factor)
+    signal = solver.run(ricker_source(solver.dt, solver.nt, frequency))
+
+    return signal, solver.dt
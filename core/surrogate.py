@@ -0,0 +1,497 @@
+"""
+core/surrogate.py
+
+Precomputed response table for instant trace predictions.
+
+The reflected trace of a buried object is tabulated over a grid of
+object depth, object permittivity, object conductivity and background
+material.  Traces are simulated once in batches with
+BatchFDTDSolver1D and stored as a float32 .npy file (memory-mapped on
+load) next to a JSON metadata file and the object-free reference trace
+of every background.  Queries inside the table are
+answered by multilinear interpolation of the 8 surrounding traces;
+queries outside it fall back to a full solver run.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from config.material_database import MATERIAL_DATABASE
+from config.simulation_config import (
+    CFL_SAFETY_FACTOR,
+    DEFAULT_SOURCE_POSITION
+)
+from core.fdtd_solver import BatchFDTDSolver1D
+from core.material import Material
+from core.simulation import (
+    build_grid,
+    ricker_source,
+    simulate_reflection,
+    simulation_time_step
+)
+from signal_processing.depth_estimation import (
+    LayeredVelocityModel,
+    estimate_depths_layered
+)
+from signal_processing.matched_filter import pick_reflections
+
+
+AXES = ("depth", "epsilon_r", "sigma")
+
+# Default table for the standard 400-cell grid (~90 MB)
+DEFAULT_TABLE_AXES = {
+    "depths": np.round(np.arange(0.005, 0.2001, 0.0025), 6),
+    "epsilon_r": [2.0, 4.0, 6.0, 8.0, 12.0, 16.0, 24.0, 40.0, 80.0],
+    "sigma": [0.0, 0.001, 0.01, 0.1],
+    "backgrounds": [
+        name for name, props in MATERIAL_DATABASE.items()
+        if props["category"] in ("soil", "construction")
+    ],
+}
+
+
+def _metadata_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def _reference_path(path):
+    return os.path.splitext(path)[0] + "_reference.npy"
+
+
+def _is_database_material(spec):
+    props = MATERIAL_DATABASE.get(spec.name)
+    return props is not None and all(
+        getattr(spec, key) == props[key]
+        for key in ("epsilon_r", "mu_r", "sigma"))
+
+
+# -------------------------------------------------------
+# Scenario Geometry
+# -------------------------------------------------------
+
+def scenario_metadata(nx=400, dx=1e-3, nt=800, frequency=10e9,
+                      surface=150, object_width=10,
+                      source_position=DEFAULT_SOURCE_POSITION,
+                      courant_factor=CFL_SAFETY_FACTOR):
+    """
+    Geometry and timing shared by all scenarios of a table.
+
+    Returns
+    -------
+    dict
+        JSON-serializable metadata (without table axes)
+    """
+    return {
+        "nx": int(nx),
+        "dx": float(dx),
+        "nt": int(nt),
+        "dt": float(simulation_time_step(dx, courant_factor)),
+        "frequency": float(frequency),
+        "surface": int(surface),
+        "object_width": int(object_width),
+        "source_position": int(source_position),
+        "courant_factor": float(courant_factor),
+        "dtype": "float32",
+    }
+
+
+def _object_cells(meta, depth):
+    start = meta["surface"] + int(round(depth / meta["dx"]))
+    return start, start + meta["object_width"]
+
+
+def scenario_grid(meta, depth, epsilon_r, sigma, background):
+    """
+    Grid1D of one table scenario.
+
+    Air above meta["surface"], the background material below it, and
+    an object of meta["object_width"] cells whose top lies `depth`
+    metres below the surface.
+    """
+    start, end = _object_cells(meta, depth)
+    target = Material("Object", epsilon_r=epsilon_r, sigma=sigma)
+
+    return build_grid(
+        meta["nx"], meta["dx"],
+        layers=[(0, meta["surface"], "Air"),
+                (meta["surface"], meta["nx"], background)],
+        objects=[(start, end, target)]
+    )
+
+
+def _batch_materials(meta, queries):
+    """epsilon_r and sigma arrays (batch, nx) for table scenarios."""
+    nx, surface = meta["nx"], meta["surface"]
+    air = MATERIAL_DATABASE["Air"]
+
+    epsilon_r = np.empty((len(queries), nx))
+    sigma = np.empty((len(queries), nx))
+
+    for row, (depth, eps, sig, background) in enumerate(queries):
+        props = MATERIAL_DATABASE[background]
+        epsilon_r[row, :surface] = air["epsilon_r"]
+        sigma[row, :surface] = air["sigma"]
+        epsilon_r[row, surface:] = props["epsilon_r"]
+        sigma[row, surface:] = props["sigma"]
+
+        start, end = _object_cells(meta, depth)
+        epsilon_r[row, start:end] = eps
+        sigma[row, start:end] = sig
+
+    return epsilon_r, sigma
+
+
+def simulate_reference(meta, background):
+    """Object-free trace of a background (full solver run)."""
+    grid = build_grid(
+        meta["nx"], meta["dx"],
+        layers=[(0, meta["surface"], "Air"),
+                (meta["surface"], meta["nx"], background)]
+    )
+    trace, _ = simulate_reflection(grid, meta["nt"], meta["frequency"],
+                                   meta["source_position"],
+                                   meta["courant_factor"])
+    return trace
+
+
+# -------------------------------------------------------
+# Table Construction
+# -------------------------------------------------------
+
+def build_surrogate_table(path, depths, epsilon_r, sigma, backgrounds,
+                          nx=400, dx=1e-3, nt=800, frequency=10e9,
+                          surface=150, object_width=10,
+                          source_position=DEFAULT_SOURCE_POSITION,
+                          courant_factor=CFL_SAFETY_FACTOR,
+                          batch_size=64):
+    """
+    Simulate and store a response table.
+
+    Parameters
+    ----------
+    path : str
+        Output .npy file; metadata goes to the matching .json and the
+        reference traces to the matching _reference.npy
+    depths : array_like
+        Object depths below the surface (m), increasing
+    epsilon_r, sigma : array_like
+        Object permittivities / conductivities, increasing
+    backgrounds : list of str
+        MATERIAL_DATABASE names of the medium below the surface
+    nx, dx, nt : int, float, int
+        Grid size, cell size (m) and number of time steps
+    frequency : float
+        Ricker center frequency (Hz)
+    surface : int
+        First cell of the background medium
+    object_width : int
+        Object thickness (cells)
+    batch_size : int
+        Scenarios simulated per BatchFDTDSolver1D run
+
+    Returns
+    -------
+    SurrogateTable
+    """
+    axes = {
+        "depth": np.asarray(depths, dtype=float),
+        "epsilon_r": np.asarray(epsilon_r, dtype=float),
+        "sigma": np.asarray(sigma, dtype=float),
+    }
+
+    for name, values in axes.items():
+        if values.ndim != 1 or len(values) == 0:
+            raise ValueError(f"{name} axis must be a non-empty 1D list.")
+        if np.any(np.diff(values) <= 0):
+            raise ValueError(f"{name} axis must be increasing.")
+
+    for name in backgrounds:
+        if name not in MATERIAL_DATABASE:
+            raise KeyError(f"Unknown material: {name}")
+
+    if not 0 <= source_position < surface:
+        raise ValueError("Source must lie above the surface.")
+    if surface + axes["depth"][-1] / dx + object_width > nx:
+        raise ValueError("Deepest object extends beyond the grid.")
+
+    meta = scenario_metadata(nx, dx, nt, frequency, surface,
+                             object_width, source_position, courant_factor)
+    meta["backgrounds"] = list(backgrounds)
+    meta["axes"] = {name: values.tolist() for name, values in axes.items()}
+    dt = meta["dt"]
+
+    shape = (len(backgrounds),) + tuple(len(axes[a]) for a in AXES)
+    table = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float32, shape=shape + (nt,))
+
+    source = ricker_source(dt, nt, frequency)
+
+    index = list(np.ndindex(shape))
+    for start in range(0, len(index), batch_size):
+        block = index[start:start + batch_size]
+        queries = [
+            (axes["depth"][i], axes["epsilon_r"][j], axes["sigma"][k],
+             backgrounds[b])
+            for b, i, j, k in block
+        ]
+
+        eps_batch, sigma_batch = _batch_materials(meta, queries)
+        solver = BatchFDTDSolver1D(eps_batch, sigma_batch, dx, dt,
+                                   (nt + 0.5) * dt, source_position)
+        traces = solver.run(source)
+
+        for row, key in enumerate(block):
+            table[key] = traces[row]
+
+    table.flush()
+    del table
+
+    np.save(_reference_path(path),
+            np.array([simulate_reference(meta, name) for name in backgrounds]))
+
+    with open(_metadata_path(path), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    return SurrogateTable.load(path)
+
+
+# -------------------------------------------------------
+# Table Lookup
+# -------------------------------------------------------
+
+class SurrogateTable:
+    """
+    Memory-mapped response table with multilinear interpolation.
+
+    Parameters
+    ----------
+    table : ndarray (n_backgrounds, n_depth, n_epsilon_r, n_sigma, nt)
+        Tabulated traces; None gives a solver-only instance
+    meta : dict
+        Metadata written by build_surrogate_table() (or
+        scenario_metadata() when table is None)
+    reference : ndarray (n_backgrounds, nt) (optional)
+        Stored object-free traces, in the order of meta["backgrounds"]
+    """
+
+    def __init__(self, table, meta, reference=None):
+        self.table = table
+        self.meta = meta
+        self.axes = {
+            name: np.asarray(meta.get("axes", {}).get(name, []), dtype=float)
+            for name in AXES
+        }
+        self.backgrounds = list(meta.get("backgrounds", []))
+        self.dt = meta["dt"]
+        self.nt = meta["nt"]
+        self._reference = {}
+        if reference is not None:
+            self._reference.update(zip(self.backgrounds, reference))
+
+    @classmethod
+    def load(cls, path):
+        """Open a table written by build_surrogate_table()."""
+        with open(_metadata_path(path)) as f:
+            meta = json.load(f)
+
+        reference = None
+        if os.path.exists(_reference_path(path)):
+            reference = np.load(_reference_path(path))
+
+        return cls(np.load(path, mmap_mode="r"), meta, reference)
+
+    @property
+    def time(self):
+        return np.arange(self.nt) * self.dt
+
+    def contains(self, depth, epsilon_r, sigma, background):
+        """True if the query lies inside the tabulated ranges."""
+        if self.table is None or background not in self.backgrounds:
+            return False
+
+        for name, value in zip(AXES, (depth, epsilon_r, sigma)):
+            axis = self.axes[name]
+            if not axis[0] <= value <= axis[-1]:
+                return False
+
+        return True
+
+    # --------------------------------------------------
+    # Prediction
+    # --------------------------------------------------
+
+    def interpolate(self, depth, epsilon_r, sigma, background):
+        """
+        Multilinear interpolation of the tabulated traces.
+
+        Returns
+        -------
+        ndarray (nt,)
+        """
+        if not self.contains(depth, epsilon_r, sigma, background):
+            raise ValueError("Query outside the surrogate table.")
+
+        corners = []
+        weights = []
+
+        for name, value in zip(AXES, (depth, epsilon_r, sigma)):
+            axis = self.axes[name]
+            if len(axis) == 1:
+                corners.append([0, 0])
+                weights.append(np.array([1.0, 0.0]))
+                continue
+
+            i0 = np.clip(np.searchsorted(axis, value, side="right") - 1,
+                         0, len(axis) - 2)
+            w = (value - axis[i0]) / (axis[i0 + 1] - axis[i0])
+            corners.append([i0, i0 + 1])
+            weights.append(np.array([1 - w, w]))
+
+        b = self.backgrounds.index(background)
+        block = self.table[b][np.ix_(*corners)].astype(float)
+
+        weight = (weights[0][:, None, None]
+                  * weights[1][None, :, None]
+                  * weights[2][None, None, :])
+
+        return np.tensordot(weight, block, axes=3)
+
+    def scenario_query(self, scenario):
+        """
+        Table query for a core.scenario.Scenario.
+
+        Returns
+        -------
+        (depth, epsilon_r, sigma, background) or None
+            None unless the scenario has the table geometry: same grid,
+            timing and source, air down to meta["surface"], one
+            database background below it and one non-magnetic object
+            of meta["object_width"] cells in the background
+        """
+        meta = self.meta
+        surface, nx = meta["surface"], meta["nx"]
+
+        same = (
+            scenario.nx == nx and scenario.nt == meta["nt"]
+            and scenario.source_position == meta["source_position"]
+            and all(math.isclose(getattr(scenario, key), meta[key],
+                                 rel_tol=1e-9)
+                    for key in ("dx", "frequency", "courant_factor"))
+        )
+        if not same or len(scenario.layers) != 2 or \
+                len(scenario.objects) != 1:
+            return None
+
+        air, below = scenario.layers
+        (target,) = scenario.objects
+        if (air.start, air.end) != (0, surface) \
+                or (below.start, below.end) != (surface, nx) \
+                or air.material.name != "Air" \
+                or not _is_database_material(air.material) \
+                or not _is_database_material(below.material):
+            return None
+
+        if target.start < surface or \
+                target.end - target.start != meta["object_width"] or \
+                target.material.mu_r != 1.0:
+            return None
+
+        return ((target.start - surface) * meta["dx"],
+                target.material.epsilon_r, target.material.sigma,
+                below.material.name)
+
+    def simulate(self, depth, epsilon_r, sigma, background):
+        """Run the full solver for one scenario."""
+        meta = self.meta
+        grid = scenario_grid(meta, depth, epsilon_r, sigma, background)
+
+        trace, _ = simulate_reflection(grid, meta["nt"], meta["frequency"],
+                                       meta["source_position"],
+                                       meta["courant_factor"])
+        return trace
+
+    def predict(self, depth, epsilon_r, sigma, background):
+        """
+        Approximate trace, using the solver outside the table.
+
+        Returns
+        -------
+        trace : ndarray (nt,)
+        from_table : bool
+            False if the solver was run
+        """
+        if self.contains(depth, epsilon_r, sigma, background):
+            return self.interpolate(depth, epsilon_r, sigma, background), True
+
+        return self.simulate(depth, epsilon_r, sigma, background), False
+
+    # --------------------------------------------------
+    # Depth Estimation
+    # --------------------------------------------------
+
+    def reference_trace(self, background):
+        """
+        Object-free trace for a background.
+
+        Read from the table; backgrounds it does not cover are
+        simulated once and cached.
+        """
+        if background not in self._reference:
+            self._reference[background] = simulate_reference(self.meta,
+                                                             background)
+
+        return self._reference[background]
+
+    def estimate_depths(self, trace, background, threshold_ratio=0.3,
+                        min_distance=None):
+        """
+        Depths below the surface of the object echoes in a trace.
+
+        The object-free reference trace is subtracted, which removes
+        the direct wave and the surface echo; the remainder is
+        matched-filtered with the source wavelet, picked and converted
+        with the air / background velocity model.
+
+        Parameters
+        ----------
+        trace : ndarray (nt,)
+        background : str
+            Medium below the surface
+        threshold_ratio : float
+            Pick threshold relative to the strongest echo
+        min_distance : int (optional)
+            Minimum pick spacing (samples); defaults to one period
+
+        Returns
+        -------
+        ndarray
+            Depths (m) relative to the surface, increasing
+        """
+        meta = self.meta
+        src = meta["source_position"]
+        period = 1.0 / (meta["frequency"] * self.dt)
+
+        trace = np.asarray(trace, dtype=float)
+        scattered = trace - self.reference_trace(background)
+
+        # Differences at the float32 round-off level are not echoes
+        if np.abs(scattered).max() <= 1e-4 * np.abs(trace).max():
+            return np.zeros(0)
+
+        picks = pick_reflections(
+            scattered, self.dt, "ricker", threshold_ratio=threshold_ratio,
+            min_distance=min_distance or int(np.ceil(period)),
+            f0=meta["frequency"])
+
+        model = LayeredVelocityModel.from_layer_profile(
+            [(0, meta["surface"], "Air"),
+             (meta["surface"], meta["nx"], background)],
+            meta["dx"], reference_index=src)
+
+        depths = estimate_depths_layered(np.asarray(picks, dtype=float),
+                                         self.dt, model)
+
+        return np.sort(depths - (meta["surface"] - src) * meta["dx"])
@@ -7,13 +7,16 @@ Handles all simulation input controls.
 import tkinter as tk
 from tkinter import ttk
 
+from config.simulation_config import GRID_PRESETS, LAYER_PROFILES
+
 
 class ControlsPanel(ttk.Frame):
 
-    def __init__(self, parent, run_callback):
+    def __init__(self, parent, run_callback, cancel_callback=None):
         super().__init__(parent, padding=15)
 
         self.run_callback = run_callback
+        self.cancel_callback = cancel_callback
 
         self._build_ui()
 
@@ -23,6 +26,21 @@ class ControlsPanel(ttk.Frame):
                   text="Simulation Parameters",
                   font=("Arial", 14)).pack(pady=10)
 
+        # Grid preset
+        ttk.Label(self, text="Grid Preset:").pack()
+        self.preset = ttk.Combobox(self, state="readonly",
+                                   values=list(GRID_PRESETS))
+        self.preset.set("Standard GPR")
+        self.preset.bind("<<ComboboxSelected>>", self._apply_preset)
+        self.preset.pack()
+
+        # Layer profile
+        ttk.Label(self, text="Layer Profile:").pack()
+        self.profile = ttk.Combobox(self, state="readonly",
+                                    values=list(LAYER_PROFILES))
+        self.profile.set("Air-Soil")
+        self.profile.pack()
+
         # Grid size
         ttk.Label(self, text="Grid Size (nx):").pack()
         self.nx = ttk.Entry(self)
@@ -35,21 +53,85 @@ class ControlsPanel(ttk.Frame):
         self.nt.insert(0, "800")
         self.nt.pack()
 
+        # Cell size
+        ttk.Label(self, text="Cell Size dx (m):").pack()
+        self.dx = ttk.Entry(self)
+        self.dx.insert(0, "1e-3")
+        self.dx.pack()
+
+        # Source frequency
+        ttk.Label(self, text="Frequency (GHz):").pack()
+        self.frequency = ttk.Entry(self)
+        self.frequency.insert(0, "10")
+        self.frequency.pack()
+
         # Object position
         ttk.Label(self, text="Object Position:").pack()
         self.obj_pos = ttk.Entry(self)
         self.obj_pos.insert(0, "250")
         self.obj_pos.pack()
 
+        # Object width
+        ttk.Label(self, text="Object Width (cells):").pack()
+        self.obj_width = ttk.Entry(self)
+        self.obj_width.insert(0, "10")
+        self.obj_width.pack()
+
         # Object permittivity
         ttk.Label(self, text="Object εr:").pack()
         self.obj_eps = ttk.Entry(self)
         self.obj_eps.insert(0, "6.0")
         self.obj_eps.pack()
 
-        ttk.Button(self,
-                   text="Run Simulation",
-                   command=self.run_callback).pack(pady=20)
+        # Object conductivity
+        ttk.Label(self, text="Object σ (S/m):").pack()
+        self.obj_sigma = ttk.Entry(self)
+        self.obj_sigma.insert(0, "0.0")
+        self.obj_sigma.pack()
+
+        buttons = ttk.Frame(self)
+        buttons.pack(pady=15)
+
+        self.run_button = ttk.Button(buttons,
+                                     text="Run Simulation",
+                                     command=self.run_callback)
+        self.run_button.pack(side="left", padx=5)
+
+        self.cancel_button = ttk.Button(buttons,
+                                        text="Cancel",
+                                        command=self.cancel_callback,
+                                        state="disabled")
+        self.cancel_button.pack(side="left", padx=5)
+
+        # Progress
+        self.progress = ttk.Progressbar(self, mode="determinate",
+                                        maximum=1.0, length=200)
+        self.progress.pack(pady=5)
+
+        self.status = tk.StringVar(value="Ready")
+        ttk.Label(self, textvariable=self.status).pack()
+
+    def _apply_preset(self, _event=None):
+        preset = GRID_PRESETS[self.preset.get()]
+
+        for entry, key in ((self.nx, "nx"), (self.nt, "nt"),
+                           (self.dx, "dx")):
+            entry.delete(0, tk.END)
+            entry.insert(0, str(preset[key]))
+
+    # --------------------------
+    # Run State
+    # --------------------------
+
+    def set_running(self, running):
+        self.run_button.configure(state="disabled" if running else "normal")
+        self.cancel_button.configure(
+            state="normal" if running else "disabled")
+
+    def set_progress(self, fraction, text=None):
+        self.progress["value"] = fraction
+        if text is not None:
+            self.status.set(text)
 
     # --------------------------
     # Getter methods
@@ -59,6 +141,11 @@ class ControlsPanel(ttk.Frame):
         return {
             "nx": int(self.nx.get()),
             "nt": int(self.nt.get()),
+            "dx": float(self.dx.get()),
+            "frequency": float(self.frequency.get()) * 1e9,
+            "profile": self.profile.get(),
             "obj_pos": int(self.obj_pos.get()),
-            "obj_eps": float(self.obj_eps.get())
+            "obj_width": int(self.obj_width.get()),
+            "obj_eps": float(self.obj_eps.get()),
+            "obj_sigma": float(self.obj_sigma.get())
         }
@@ -3,28 +3,44 @@ gui/main_window.py
 
 Main application window for EMScope.
 Connects simulation engine with visualization.
+
+Simulations run in a background process (gui/worker.py); the window
+polls the worker's message queue with root.after, so it stays
+responsive for large presets and runs can be cancelled.  Live
+snapshots are drawn in the embedded results panel.
+
+With a surrogate table (core/surrogate.py, main.py --table) scenarios
+inside the table are answered instantly from it; all others still run
+the solver.
 """
 
+import time
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 
-import numpy as np
+from core.scenario import ScenarioError
+from core.surrogate import SurrogateTable
+from gui.controls_panel import ControlsPanel
+from gui.results_panel import ResultsPanel
+from gui.worker import SimulationWorker, scenario_from_params
+
 
-from core.fdtd_solver import FDTDSolver1D as FDTDSolver
-from core.material import Material as layered_medium
-from visualization.animation import animate_field
-from visualization.plot_signal import plot_signal as plot_time_signal
+POLL_INTERVAL_MS = 50
 
 
 class EMScopeApp:
 
-    def __init__(self, root):
+    def __init__(self, root, table=None):
         self.root = root
+        self.table = table
         self.root.title("EMScope - Ground Penetrating Radar Simulator")
-        self.root.geometry("600x400")
+        self.root.geometry("1100x760")
+
+        self.worker = None
 
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     # --------------------------------------------------
     # UI Layout
@@ -32,39 +48,16 @@ class EMScopeApp:
 
     def create_widgets(self):
 
-        frame = ttk.Frame(self.root, padding=20)
+        frame = ttk.Frame(self.root)
         frame.pack(fill="both", expand=True)
 
-        ttk.Label(frame, text="Simulation Parameters",
-                  font=("Arial", 14)).pack(pady=10)
-
-        # Grid size
-        ttk.Label(frame, text="Grid Size (nx):").pack()
-        self.nx_entry = ttk.Entry(frame)
-        self.nx_entry.insert(0, "400")
-        self.nx_entry.pack()
-
-        # Time steps
-        ttk.Label(frame, text="Time Steps (nt):").pack()
-        self.nt_entry = ttk.Entry(frame)
-        self.nt_entry.insert(0, "800")
-        self.nt_entry.pack()
-
-        # Hidden object position
-        ttk.Label(frame, text="Object Position Index:").pack()
-        self.obj_pos_entry = ttk.Entry(frame)
-        self.obj_pos_entry.insert(0, "250")
-        self.obj_pos_entry.pack()
-
-        # Object permittivity
-        ttk.Label(frame, text="Object εr:").pack()
-        self.obj_eps_entry = ttk.Entry(frame)
-        self.obj_eps_entry.insert(0, "6.0")
-        self.obj_eps_entry.pack()
-
-        ttk.Button(frame,
-                   text="Run Simulation",
-                   command=self.run_simulation).pack(pady=20)
+        self.controls = ControlsPanel(frame,
+                                      run_callback=self.run_simulation,
+                                      cancel_callback=self.cancel_simulation)
+        self.controls.pack(side="left", fill="y")
+
+        self.results = ResultsPanel(frame)
+        self.results.pack(side="left", fill="both", expand=True)
 
     # --------------------------------------------------
     # Simulation Runner
@@ -72,58 +65,142 @@ class EMScopeApp:
 
     def run_simulation(self):
 
+        if self.worker is not None:
+            return
+
         try:
-            nx = int(self.nx_entry.get())
-            nt = int(self.nt_entry.get())
-            obj_pos = int(self.obj_pos_entry.get())
-            obj_eps = float(self.obj_eps_entry.get())
+            params = self.controls.get_values()
         except ValueError:
             messagebox.showerror("Error", "Invalid input values.")
             return
 
-        dx = 1e-3
-        dt = dx / (3e8 * 2)
+        # Validate up front rather than in the worker process
+        try:
+            scenario = scenario_from_params(params)
+        except ScenarioError as error:
+            messagebox.showerror("Error",
+                                 "Invalid scenario:\n" +
+                                 "\n".join(error.problems))
+            return
+
+        if self.table is not None and self.predict(scenario, params):
+            return
+
+        self.results.clear("Running...")
+        self.controls.set_running(True)
+        self.controls.set_progress(0.0, "Starting worker...")
+
+        self.worker = SimulationWorker(params).start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+
+    def predict(self, scenario, params):
+        """
+        Answer from the surrogate table; False if the scenario is
+        not covered by it.
+        """
+        query = self.table.scenario_query(scenario)
+        if query is None or not self.table.contains(*query):
+            return False
+
+        start = time.perf_counter()
+        trace = self.table.interpolate(*query)
+        depths = self.table.estimate_depths(trace, query[3])
+        elapsed = time.perf_counter() - start
+
+        grid = scenario.build_grid()
+        self.results.display_prediction({
+            "params": dict(params),
+            "signal": trace,
+            "dt": self.table.dt,
+            "x": grid.x,
+            "epsilon_r": grid.epsilon_r,
+            "depths": depths,
+            "elapsed": elapsed,
+        })
+        self.controls.set_progress(1.0, "Done (surrogate table)")
+        return True
+
+    def cancel_simulation(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.controls.set_progress(self.controls.progress["value"],
+                                       "Cancelling...")
+
+    def poll_worker(self):
+        worker = self.worker
+        if worker is None:
+            return
+
+        # Checked before draining: a process that has exited has
+        # already flushed everything it sent
+        alive = worker.is_alive
+        messages = worker.poll()
+
+        # Only the newest snapshot of a batch is worth drawing
+        latest = None
 
-        # Build layered medium
-        epsilon_r = layered_medium(
-            nx,
-            layers=[
-                (0, 150, 1.0),   # Air
-                (150, nx, 4.0)   # Soil
-            ]
-        )
+        for message in messages:
+            kind = message[0]
 
-        # Insert hidden object
-        epsilon_r[obj_pos:obj_pos+10] = obj_eps
+            if kind == "started":
+                self.results.start_run(message[1])
 
-        solver = FDTDSolver(nx, dx, nt, dt, epsilon_r)
+            elif kind == "snapshot":
+                latest = message[1]
 
-        solver.run()
+            elif kind == "progress":
+                _, step, nt = message
+                self.controls.set_progress(step / nt,
+                                           f"Step {step} / {nt}")
 
-        field_history = solver.field_history
-        x = np.arange(nx) * dx
+            elif kind == "done":
+                self._finish("Done")
+                self.results.display_results(message[1])
+                return
 
-        animate_field(field_history, x)
+            elif kind == "cancelled":
+                self._finish(f"Cancelled at step {message[1]}")
+                self.results.clear("Simulation cancelled.")
+                return
 
-        # Plot receiver signal (center of grid)
-        receiver_index = 50
-        signal = field_history[:, receiver_index]
-        time = np.arange(nt) * dt
+            elif kind == "error":
+                self._finish("Failed")
+                self.results.clear(message[1])
+                messagebox.showerror("Error", "Simulation failed.")
+                return
 
-        plot_time_signal(time, signal,
-                         title="Receiver Signal")
+        if latest is not None:
+            self.results.update_snapshot(latest)
 
-        messagebox.showinfo("Done",
-                            "Simulation Completed Successfully!")
+        if not alive and not messages:
+            # Process died without reporting (e.g. killed)
+            self._finish("Worker stopped")
+            return
+
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+
+    def _finish(self, status):
+        self.worker.terminate()
+        self.worker = None
+        self.controls.set_running(False)
+        self.controls.set_progress(self.controls.progress["value"], status)
+
+    def on_close(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.terminate()
+        self.root.destroy()
 
 
 # --------------------------------------------------
 # Launch App
 # --------------------------------------------------
 
-def launch():
+def launch(table_path=None):
+    table = SurrogateTable.load(table_path) if table_path else None
+
     root = tk.Tk()
-    app = EMScopeApp(root)
+    app = EMScopeApp(root, table)
     root.mainloop()
 
 
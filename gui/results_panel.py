@@ -2,42 +2,129 @@
 gui/results_panel.py
 
 Handles simulation output display.
+
+Ez and the recorded trace are drawn on an embedded FigureCanvasTkAgg
+and updated by blitting from the worker's decimated snapshots; no
+separate matplotlib windows are opened.
 """
 
-import numpy as np
+import tkinter as tk
 from tkinter import ttk
 
-from visualization.animation import animate_field
-from visualization.plot_signal import plot_time_signal
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from visualization.live_plot import LiveFieldView
 
 
 class ResultsPanel(ttk.Frame):
 
-    def __init__(self, parent):
+    def __init__(self, parent, max_fps=30.0):
         super().__init__(parent, padding=15)
 
+        self.result = None
+
         ttk.Label(self,
                   text="Simulation Results",
                   font=("Arial", 14)).pack(pady=10)
 
+        self.view = LiveFieldView(max_fps=max_fps)
+        self.canvas = self.view.attach(
+            FigureCanvasTkAgg(self.view.figure, master=self))
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        self.summary = tk.Text(self, width=44, height=8,
+                               state="disabled")
+        self.summary.pack(fill="x")
+
     # --------------------------------------------------
 
-    def display_results(self, solver):
+    def _set_text(self, text):
+        self.summary.configure(state="normal")
+        self.summary.delete("1.0", tk.END)
+        self.summary.insert(tk.END, text)
+        self.summary.configure(state="disabled")
+
+    def clear(self, message=""):
+        self.result = None
+        self._set_text(message)
+
+    def start_run(self, info):
+        """
+        Prepare the live view.
+
+        Parameters
+        ----------
+        info : dict
+            "started" payload of gui/worker.py::simulation_task
+        """
+        self.view.start(info["x"], info["epsilon_r"], info["nt"],
+                        info["dt"])
+
+    def update_snapshot(self, snapshot):
+        """Draw a live snapshot (subject to the frame-rate cap)."""
+        return self.view.update(snapshot)
+
+    def display_results(self, result):
+        """
+        Show a finished run.
+
+        Parameters
+        ----------
+        result : dict
+            "done" payload of gui/worker.py::simulation_task
+        """
+        self.result = result
+        params = result["params"]
+
+        cells_per_s = params["nx"] * params["nt"] / max(result["elapsed"],
+                                                         1e-12)
+
+        lines = [
+            f"Profile: {params['profile']}   "
+            f"Grid: {params['nx']} x {params['nt']}",
+            f"Run time: {result['elapsed']:.3f} s "
+            f"({cells_per_s / 1e6:.1f} Mcells/s)",
+            "Reflections:",
+        ]
+
+        if len(result["picks"]) == 0:
+            lines.append("  none detected")
+
+        for pick, depth in zip(result["picks"], result["depths"]):
+            lines.append(f"  t = {pick * result['dt'] * 1e9:7.3f} ns"
+                         f"   depth = {depth * 100:6.2f} cm")
+
+        self._set_text("\n".join(lines))
+        self.view.show_result(result["Ez"], result["signal"],
+                              result["picks"])
+
+    def display_prediction(self, result):
+        """
+        Show a surrogate-table prediction.
 
-        field_history = solver.field_history
-        nx = solver.nx
-        dx = solver.dx
-        nt = solver.nt
-        dt = solver.dt
+        Parameters
+        ----------
+        result : dict
+            "params", "signal", "dt", "x", "epsilon_r", "depths"
+            (below the surface) and "elapsed"
+        """
+        self.result = result
+        params = result["params"]
 
-        x = np.arange(nx) * dx
+        lines = [
+            f"Profile: {params['profile']}   "
+            f"Grid: {params['nx']} x {params['nt']}",
+            f"Surrogate table: {result['elapsed'] * 1e3:.1f} ms",
+            "Object echoes (depth below surface):",
+        ]
 
-        animate_field(field_history, x)
+        if len(result["depths"]) == 0:
+            lines.append("  none detected")
 
-        # Receiver at index 50
-        receiver_index = 50
-        signal = field_history[:, receiver_index]
-        time = np.arange(nt) * dt
+        for depth in result["depths"]:
+            lines.append(f"  depth = {depth * 100:6.2f} cm")
 
-        plot_time_signal(time, signal,
-                         title="Receiver Signal")
+        self._set_text("\n".join(lines))
+        self.view.start(result["x"], result["epsilon_r"],
+                        len(result["signal"]), result["dt"])
+        self.view.show_result(None, result["signal"], [])
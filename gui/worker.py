@@ -0,0 +1,248 @@
+"""
+gui/worker.py
+
+Background simulation worker for the GUI.
+
+The FDTD run executes in a separate process so the tkinter main loop
+stays responsive.  The worker reports progress and results through a
+multiprocessing queue (polled by the GUI with root.after) and checks
+a cancel event between progress reports.  This module does not import
+tkinter, so it is safe to load in the spawned child process.
+
+For live display the worker also streams snapshots of Ez and of the
+trace recorded so far.  They are min/max-decimated to a few thousand
+points and rate-limited by wall time, so a long run sends a bounded
+number of small messages regardless of nx and nt.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+import traceback
+
+import numpy as np
+
+from config.simulation_config import (
+    DEFAULT_SOURCE_POSITION,
+    LAYER_PROFILES
+)
+from core.scenario import MaterialSpec, Scenario, clip_regions
+from core.simulation import create_solver
+from signal_processing.depth_estimation import (
+    LayeredVelocityModel,
+    estimate_depths_layered
+)
+from signal_processing.matched_filter import pick_reflections
+from visualization.decimation import minmax_decimate
+
+
+# -------------------------------------------------------
+# Simulation Task (runs in the worker process)
+# -------------------------------------------------------
+
+def scenario_from_params(params):
+    """
+    Validated Scenario for a GUI parameter set.
+
+    Parameters
+    ----------
+    params : dict
+        nx, nt, dx, frequency, profile (LAYER_PROFILES key), obj_pos,
+        obj_width, obj_eps, obj_sigma, source_position (optional)
+
+    Raises
+    ------
+    core.scenario.ScenarioError
+    """
+    target = MaterialSpec("Object", params["obj_eps"],
+                          sigma=params.get("obj_sigma", 0.0))
+    start = params["obj_pos"]
+
+    return Scenario(
+        nx=params["nx"],
+        dx=params["dx"],
+        nt=params["nt"],
+        frequency=params["frequency"],
+        source_position=params.get("source_position",
+                                   DEFAULT_SOURCE_POSITION),
+        layers=clip_regions(LAYER_PROFILES[params["profile"]],
+                            params["nx"]),
+        objects=[(start, start + params.get("obj_width", 10), target)],
+        label=params["profile"]
+    )
+
+
+def snapshot(solver, step, max_points=2000):
+    """Decimated copy of Ez and of the trace up to step."""
+    field_index, field = minmax_decimate(solver.Ez, max_points)
+    trace_index, trace = minmax_decimate(
+        solver.reflected_signal[:step], max_points)
+
+    return {
+        "step": step,
+        "field_index": field_index,
+        "field": field.copy(),
+        "trace_index": trace_index,
+        "trace": trace.copy(),
+    }
+
+
+def simulation_task(params, messages, cancel, progress_interval=None,
+                    snapshot_fps=30.0, max_points=2000):
+    """
+    Run one simulation and report through the message queue.
+
+    Messages are tuples:
+        ("started", {"x", "epsilon_r", "nt", "dt"})
+        ("progress", step, nt)
+        ("snapshot", snapshot_dict)
+        ("done", result_dict)
+        ("cancelled", step)
+        ("error", traceback_text)
+
+    Parameters
+    ----------
+    progress_interval : int (optional)
+        Steps between progress checks (default nt / 200)
+    snapshot_fps : float
+        Maximum snapshot rate (0 disables snapshots)
+    max_points : int
+        Points per decimated snapshot line
+    """
+    try:
+        scenario = scenario_from_params(params)
+        grid = scenario.build_grid()
+        src = scenario.source_position
+
+        solver = create_solver(grid, scenario.nt, src,
+                               scenario.courant_factor)
+        source = scenario.source_signal()
+
+        messages.put(("started", {
+            "x": grid.x,
+            "epsilon_r": grid.epsilon_r,
+            "nt": solver.nt,
+            "dt": solver.dt,
+        }))
+
+        interval = progress_interval or max(solver.nt // 200, 1)
+        min_gap = 1.0 / snapshot_fps if snapshot_fps else None
+        state = {"step": 0, "last_snapshot": -float("inf")}
+
+        def report(step, _):
+            state["step"] = step
+            messages.put(("progress", step, solver.nt))
+
+            now = time.perf_counter()
+            if min_gap is not None and (
+                    now - state["last_snapshot"] >= min_gap):
+                messages.put(("snapshot",
+                              snapshot(solver, step, max_points)))
+                state["last_snapshot"] = now
+
+            return not cancel.is_set()
+
+        start = time.perf_counter()
+        signal = solver.run(source, callback=report,
+                            callback_interval=interval)
+        elapsed = time.perf_counter() - start
+
+        if state["step"] < solver.nt:
+            messages.put(("cancelled", state["step"]))
+            return
+
+        # Reflection picks after the direct wave
+        period = 1.0 / (params["frequency"] * solver.dt)
+        picks = np.asarray(pick_reflections(
+            signal, solver.dt, "ricker", threshold_ratio=0.2,
+            min_distance=int(np.ceil(period)),
+            mute_samples=int(np.ceil(3 * period)),
+            f0=params["frequency"]), dtype=int)
+
+        model = LayeredVelocityModel.from_grid(grid, reference_index=src)
+        depths = estimate_depths_layered(picks, solver.dt, model)
+
+        messages.put(("done", {
+            "params": dict(params),
+            "signal": signal,
+            "dt": solver.dt,
+            "dx": grid.dx,
+            "x": grid.x,
+            "epsilon_r": grid.epsilon_r,
+            "sigma": grid.sigma,
+            "Ez": solver.Ez.copy(),
+            "picks": picks,
+            "depths": depths,
+            "elapsed": elapsed,
+        }))
+
+    except Exception:
+        messages.put(("error", traceback.format_exc()))
+
+
+# -------------------------------------------------------
+# Worker Handle (used by the GUI process)
+# -------------------------------------------------------
+
+class SimulationWorker:
+    """
+    Runs simulation_task in a background process.
+
+    Parameters
+    ----------
+    params : dict
+        Simulation parameters (see scenario_from_params)
+    progress_interval : int (optional)
+        Steps between progress messages (default nt / 200)
+    snapshot_fps : float
+        Maximum rate of live snapshots (0 disables them)
+    max_points : int
+        Points per decimated snapshot line
+    """
+
+    def __init__(self, params, progress_interval=None, snapshot_fps=30.0,
+                 max_points=2000):
+        context = mp.get_context("spawn")
+
+        self.params = dict(params)
+        self.messages = context.Queue()
+        self.cancel_event = context.Event()
+        self.process = context.Process(
+            target=simulation_task,
+            args=(self.params, self.messages, self.cancel_event,
+                  progress_interval, snapshot_fps, max_points),
+            daemon=True
+        )
+
+    def start(self):
+        self.process.start()
+        return self
+
+    def cancel(self):
+        """Ask the worker to stop at its next progress report."""
+        self.cancel_event.set()
+
+    def terminate(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=1.0)
+
+    @property
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def poll(self, max_messages=500):
+        """
+        Drain pending messages without blocking.
+
+        Returns
+        -------
+        list of tuple
+        """
+        pending = []
+        for _ in range(max_messages):
+            try:
+                pending.append(self.messages.get_nowait())
+            except queue.Empty:
+                break
+        return pending
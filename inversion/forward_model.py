@@ -0,0 +1,234 @@
+"""
+inversion/forward_model.py
+
+Parameterized, batched forward model for trace inversion.
+
+A candidate model is a flat parameter vector (layer interfaces,
+permittivities, conductivities and an optional embedded object).
+Whole populations of candidates are converted to material arrays
+and simulated together with BatchFDTDSolver1D; results are cached
+so repeated candidates are never simulated twice.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from config.simulation_config import (
+    CFL_SAFETY_FACTOR,
+    DEFAULT_SOURCE_POSITION
+)
+from core.fdtd_solver import BatchFDTDSolver1D
+from core.simulation import material_from_database, ricker_source
+from physics.wave_equations import compute_time_step
+
+
+# -------------------------------------------------------
+# Parameter Space
+# -------------------------------------------------------
+
+class ParameterSpace:
+    """
+    Named, bounded parameter vector.
+
+    Parameters
+    ----------
+    bounds : dict
+        {name: (lower, upper)} for free parameters
+    fixed : dict (optional)
+        {name: value} for parameters held constant
+    """
+
+    def __init__(self, bounds, fixed=None):
+        self.names = list(bounds)
+        self.lower = np.array([bounds[n][0] for n in self.names], float)
+        self.upper = np.array([bounds[n][1] for n in self.names], float)
+        self.fixed = dict(fixed or {})
+
+        if np.any(self.lower > self.upper):
+            raise ValueError("Lower bound exceeds upper bound.")
+
+        overlap = set(self.names) & set(self.fixed)
+        if overlap:
+            raise ValueError(f"Parameters both free and fixed: {overlap}")
+
+    @property
+    def size(self):
+        return len(self.names)
+
+    def sample(self, rng, n):
+        """Uniform random population of shape (n, size)."""
+        return self.lower + rng.random((n, self.size)) * (
+            self.upper - self.lower)
+
+    def clip(self, population):
+        return np.clip(population, self.lower, self.upper)
+
+    def columns(self, population):
+        """
+        Map a population to {name: column} including fixed values.
+        """
+        population = np.atleast_2d(population)
+        values = {
+            name: population[:, i] for i, name in enumerate(self.names)
+        }
+        for name, value in self.fixed.items():
+            values[name] = np.full(len(population), float(value))
+        return values
+
+    def to_dict(self, vector):
+        values = self.columns(vector)
+        return {name: float(column[0]) for name, column in values.items()}
+
+
+# -------------------------------------------------------
+# Layered Forward Model
+# -------------------------------------------------------
+
+class LayeredForwardModel:
+    """
+    Batched FDTD forward model for a layered medium with an object.
+
+    The top layer (cells 0 .. interface_1) is the fixed background
+    material.  Subsurface layer k (1..n_layers) spans
+    interface_k .. interface_{k+1} (the last one to the grid end) and
+    is described by epsilon_r_k and sigma_k.  With an object, the
+    parameters object_center, object_width (cells), object_epsilon_r
+    and object_sigma are also used.
+
+    Parameters
+    ----------
+    space : ParameterSpace
+    nx, dx, nt : grid and run length
+    frequency : float
+        Ricker center frequency (Hz)
+    n_layers : int
+        Number of subsurface layers
+    with_object : bool
+    source_position : int
+    background : str
+        Material of the top layer
+    cache_size : int
+        Maximum number of cached traces
+    resolution : float
+        Cache key rounding, as a fraction of each parameter's range
+    """
+
+    def __init__(self, space, nx, dx, nt, frequency, n_layers=1,
+                 with_object=False,
+                 source_position=DEFAULT_SOURCE_POSITION,
+                 background="Air", courant_factor=CFL_SAFETY_FACTOR,
+                 cache_size=100000, resolution=1e-6):
+        self.space = space
+        self.nx = nx
+        self.dx = dx
+        self.nt = nt
+        self.frequency = frequency
+        self.n_layers = n_layers
+        self.with_object = with_object
+        self.source_position = source_position
+        self.background = material_from_database(background)
+
+        self.dt = compute_time_step(dx, courant_factor)
+        self.source_signal = ricker_source(self.dt, nt, frequency)
+
+        self.cache_size = cache_size
+        self.resolution = resolution
+        self._cache = OrderedDict()
+
+        self.n_evaluations = 0
+        self.n_simulations = 0
+
+        self._cells = np.arange(nx)
+
+    # --------------------------------------------------
+
+    def materials(self, population):
+        """
+        Material arrays for a population.
+
+        Returns
+        -------
+        epsilon_r, sigma : ndarray (n, nx)
+        """
+        values = self.space.columns(population)
+        n = len(next(iter(values.values())))
+
+        epsilon_r = np.full((n, self.nx), self.background.epsilon_r)
+        sigma = np.full((n, self.nx), self.background.sigma)
+
+        cells = self._cells[None, :]
+
+        for k in range(1, self.n_layers + 1):
+            start = np.rint(values[f"interface_{k}"])[:, None]
+            if k < self.n_layers:
+                end = np.rint(values[f"interface_{k + 1}"])[:, None]
+            else:
+                end = np.full((n, 1), self.nx)
+
+            inside = (cells >= start) & (cells < end)
+            epsilon_r = np.where(inside, values[f"epsilon_r_{k}"][:, None],
+                                 epsilon_r)
+            sigma = np.where(inside, values[f"sigma_{k}"][:, None], sigma)
+
+        if self.with_object:
+            half = values["object_width"][:, None] / 2
+            centre = values["object_center"][:, None]
+            inside = (cells >= np.rint(centre - half)) & (
+                cells < np.rint(centre + half))
+            epsilon_r = np.where(
+                inside, values["object_epsilon_r"][:, None], epsilon_r)
+            sigma = np.where(inside, values["object_sigma"][:, None], sigma)
+
+        return epsilon_r, sigma
+
+    def _key(self, vector):
+        span = np.maximum(self.space.upper - self.space.lower, 1e-300)
+        steps = (vector - self.space.lower) / (span * self.resolution)
+        return np.rint(steps).astype(np.int64).tobytes()
+
+    def simulate(self, population):
+        """
+        Traces for a population, using the cache.
+
+        Parameters
+        ----------
+        population : ndarray (n, space.size)
+
+        Returns
+        -------
+        ndarray (n, nt)
+        """
+        population = np.atleast_2d(population)
+        keys = [self._key(p) for p in population]
+
+        traces = np.empty((len(population), self.nt))
+        missing = {}
+
+        for i, key in enumerate(keys):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                traces[i] = self._cache[key]
+            else:
+                missing.setdefault(key, []).append(i)
+
+        self.n_evaluations += len(population)
+
+        if missing:
+            rows = [indices[0] for indices in missing.values()]
+            epsilon_r, sigma = self.materials(population[rows])
+
+            solver = BatchFDTDSolver1D(
+                epsilon_r, sigma, self.dx, self.dt,
+                (self.nt + 0.5) * self.dt, self.source_position
+            )
+            simulated = solver.run(self.source_signal)
+            self.n_simulations += len(rows)
+
+            for (key, indices), trace in zip(missing.items(), simulated):
+                traces[indices] = trace
+                self._cache[key] = trace.copy()
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return traces
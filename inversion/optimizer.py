@@ -0,0 +1,176 @@
+"""
+inversion/optimizer.py
+
+Derivative-free trace inversion.
+
+Differential evolution proposes a whole population per generation;
+the population is evaluated in one batched forward run, so the cost
+of a generation is close to that of a single vectorized simulation.
+"""
+
+import time
+
+import numpy as np
+
+
+# -------------------------------------------------------
+# Misfit
+# -------------------------------------------------------
+
+def trace_misfit(simulated, observed, mute_samples=0):
+    """
+    Normalized L2 misfit between simulated traces and an observation.
+
+    Parameters
+    ----------
+    simulated : ndarray (n, nt)
+    observed : ndarray (nt,)
+    mute_samples : int
+        Leading samples excluded (direct wave)
+
+    Returns
+    -------
+    ndarray (n,)
+    """
+    residual = simulated[:, mute_samples:] - observed[mute_samples:]
+    norm = np.sum(observed[mute_samples:] ** 2) or 1.0
+    return np.sum(residual ** 2, axis=1) / norm
+
+
+# -------------------------------------------------------
+# Result
+# -------------------------------------------------------
+
+class InversionResult:
+    """
+    Outcome of an inversion run.
+
+    Attributes
+    ----------
+    parameters : dict
+        Best-fitting parameter values (including fixed ones)
+    vector : ndarray
+        Best free-parameter vector
+    misfit : float
+    generations : int
+    n_evaluations : int
+        Candidate evaluations requested
+    n_simulations : int
+        Forward simulations actually run (cache misses)
+    elapsed : float
+        Wall time (s)
+    history : list of float
+        Best misfit per generation
+    """
+
+    def __init__(self, parameters, vector, misfit, generations,
+                 n_evaluations, n_simulations, elapsed, history):
+        self.parameters = parameters
+        self.vector = vector
+        self.misfit = misfit
+        self.generations = generations
+        self.n_evaluations = n_evaluations
+        self.n_simulations = n_simulations
+        self.elapsed = elapsed
+        self.history = history
+
+    def __repr__(self):
+        return (
+            f"InversionResult(misfit={self.misfit:.3e}, "
+            f"generations={self.generations}, "
+            f"simulations={self.n_simulations}, "
+            f"parameters={self.parameters})"
+        )
+
+
+# -------------------------------------------------------
+# Differential Evolution
+# -------------------------------------------------------
+
+def invert_trace(observed, forward_model, population_size=24,
+                 max_generations=100, mutation=0.7, crossover=0.9,
+                 tol=1e-6, max_time=None, mute_samples=0, seed=0):
+    """
+    Fit forward_model parameters to an observed trace.
+
+    Uses DE/rand/1/bin differential evolution.
+
+    Parameters
+    ----------
+    observed : ndarray (nt,)
+    forward_model : LayeredForwardModel
+        Provides space and batched, cached simulate()
+    population_size : int
+    max_generations : int
+    mutation : float
+        Differential weight F
+    crossover : float
+        Crossover probability CR
+    tol : float
+        Stop when the best misfit falls below tol
+    max_time : float (optional)
+        Wall-time budget (s)
+    mute_samples : int
+        Leading samples excluded from the misfit
+    seed : int
+
+    Returns
+    -------
+    InversionResult
+    """
+    if population_size < 4:
+        raise ValueError("population_size must be at least 4.")
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    space = forward_model.space
+    observed = np.asarray(observed, dtype=float)
+
+    def evaluate(population):
+        return trace_misfit(forward_model.simulate(population), observed,
+                            mute_samples)
+
+    population = space.sample(rng, population_size)
+    fitness = evaluate(population)
+    history = [float(fitness.min())]
+
+    generation = 0
+    while generation < max_generations and fitness.min() > tol:
+        if max_time is not None and time.perf_counter() - start > max_time:
+            break
+
+        generation += 1
+
+        # Three distinct donors per member, none equal to the member
+        idx = np.arange(population_size)
+        donors = np.argsort(rng.random((population_size, population_size - 1)),
+                            axis=1)[:, :3]
+        others = np.array([np.delete(idx, i) for i in idx])
+        a, b, c = (others[idx, donors[:, k]] for k in range(3))
+
+        mutant = space.clip(
+            population[a] + mutation * (population[b] - population[c]))
+
+        cross = rng.random(population.shape) < crossover
+        cross[idx, rng.integers(space.size, size=population_size)] = True
+        trial = np.where(cross, mutant, population)
+
+        trial_fitness = evaluate(trial)
+
+        better = trial_fitness <= fitness
+        population[better] = trial[better]
+        fitness[better] = trial_fitness[better]
+        history.append(float(fitness.min()))
+
+    best = int(np.argmin(fitness))
+
+    return InversionResult(
+        parameters=space.to_dict(population[best]),
+        vector=population[best].copy(),
+        misfit=float(fitness[best]),
+        generations=generation,
+        n_evaluations=forward_model.n_evaluations,
+        n_simulations=forward_model.n_simulations,
+        elapsed=time.perf_counter() - start,
+        history=history
+    )
@@ -9,10 +9,9 @@ and launches GUI.
 """
 
 import sys
+import time
 import argparse
 
-from gui.main_window import launch
-
 
 APP_NAME = "EMScope"
 APP_VERSION = "1.0.0"
@@ -36,12 +35,75 @@ def parse_arguments():
     parser.add_argument(
         "--nogui",
         action="store_true",
-        help="Run without GUI (future CLI mode)"
+        help="Run a single prediction on the command line"
+    )
+
+    parser.add_argument(
+        "--table",
+        help="Surrogate table (.npy) used for instant predictions"
     )
 
+    parser.add_argument(
+        "--build-table",
+        metavar="PATH",
+        help="Simulate the default surrogate table and save it to PATH"
+    )
+
+    parser.add_argument("--depth", type=float, default=0.05,
+                        help="Object depth below the surface (m)")
+    parser.add_argument("--object-epsilon-r", type=float, default=6.0,
+                        help="Object relative permittivity")
+    parser.add_argument("--object-sigma", type=float, default=0.01,
+                        help="Object conductivity (S/m)")
+    parser.add_argument("--background", default="Dry Soil",
+                        help="Material below the surface")
+
     return parser.parse_args()
 
 
+# --------------------------------------------------
+# CLI Mode
+# --------------------------------------------------
+
+def run_cli(args):
+    from core.surrogate import (
+        DEFAULT_TABLE_AXES,
+        SurrogateTable,
+        build_surrogate_table,
+        scenario_metadata
+    )
+
+    if args.build_table:
+        start = time.perf_counter()
+        table = build_surrogate_table(args.build_table, **DEFAULT_TABLE_AXES)
+        print(f"Built table {table.table.shape} "
+              f"in {time.perf_counter() - start:.1f} s")
+        if not args.nogui:
+            return
+
+    if args.table:
+        table = SurrogateTable.load(args.table)
+    elif args.build_table:
+        table = SurrogateTable.load(args.build_table)
+    else:
+        table = SurrogateTable(None, scenario_metadata())
+
+    start = time.perf_counter()
+    trace, from_table = table.predict(args.depth, args.object_epsilon_r,
+                                      args.object_sigma, args.background)
+    depths = table.estimate_depths(trace, args.background)
+    elapsed = time.perf_counter() - start
+
+    print(f"Prediction: {'surrogate table' if from_table else 'FDTD solver'}"
+          f" ({elapsed * 1e3:.1f} ms)")
+
+    if len(depths):
+        print("Estimated object depth: "
+              f"{depths[0] * 100:.2f} cm (true {args.depth * 100:.2f} cm)")
+    else:
+        print("No object echo detected.")
+
+
 # --------------------------------------------------
 # Main Execution
 # --------------------------------------------------
@@ -54,12 +116,14 @@ def main():
         print(f"{APP_NAME} Version: {APP_VERSION}")
         sys.exit(0)
 
-    if args.nogui:
-        print("CLI mode not implemented yet.")
+    if args.nogui or args.build_table:
+        run_cli(args)
         sys.exit(0)
 
+    from gui.main_window import launch
+
     print(f"Launching {APP_NAME} v{APP_VERSION}...")
-    launch()
+    launch(args.table)
 
 
 # --------------------------------------------------
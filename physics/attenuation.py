@@ -19,24 +19,29 @@ def propagation_constant(frequency, epsilon_r, mu_r=1.0, sigma=0.0):
 
     gamma = alpha + j*beta
 
+    All arguments may be arrays and are broadcast together, so a
+    whole (layers x frequencies) table is evaluated in one call.
+
     Parameters
     ----------
-    frequency : float
+    frequency : float or ndarray
         Frequency (Hz)
-    epsilon_r : float
+    epsilon_r : float or ndarray
         Relative permittivity
-    mu_r : float
+    mu_r : float or ndarray
         Relative permeability
-    sigma : float
+    sigma : float or ndarray
         Conductivity (S/m)
 
     Returns
     -------
-    gamma : complex
+    gamma : complex or ndarray
         Complex propagation constant
     """
 
-    if frequency <= 0:
+    frequency = np.asarray(frequency, dtype=float)
+
+    if np.any(frequency <= 0):
         raise ValueError("Frequency must be positive.")
 
     omega = 2 * np.pi * frequency
@@ -84,10 +89,11 @@ def skin_depth(frequency, epsilon_r, mu_r=1.0, sigma=0.0):
     """
     alpha = attenuation_constant(frequency, epsilon_r, mu_r, sigma)
 
-    if alpha == 0:
-        return np.inf
+    if np.ndim(alpha) == 0:
+        return np.inf if alpha == 0 else 1 / alpha
 
-    return 1 / alpha
+    with np.errstate(divide="ignore"):
+        return np.where(alpha == 0, np.inf, 1 / alpha)
 
 
 # -------------------------------------------------------
@@ -100,7 +106,7 @@ def good_conductor_attenuation(frequency, sigma, mu_r=1.0):
 
     alpha ≈ sqrt(pi * f * mu * sigma)
     """
-    if frequency <= 0:
+    if np.any(np.asarray(frequency) <= 0):
         raise ValueError("Frequency must be positive.")
 
     mu = MU_0 * mu_r
@@ -0,0 +1,90 @@
+"""
+service/batching.py
+
+Batched execution of sweep scenarios in the service's worker processes.
+
+Scenarios (core/scenario.py) that share the grid size, cell size,
+step count, Courant factor and source position (and therefore the
+time step) are compatible: their media become rows of one
+BatchFDTDSolver1D and they are solved together, each with its own
+Ricker source.  A single scenario is run on the regular solver so it
+can use the compiled kernels.
+
+Results are returned per scenario, so one failing scenario does not
+take its batch down.
+"""
+
+import numpy as np
+
+from core import backends
+from core.fdtd_solver import BatchFDTDSolver1D
+from sweep.scenarios import run_scenario
+
+
+def batch_key(scenario):
+    """Scenarios with equal keys can be solved in one batch."""
+    return (scenario.nx, scenario.dx, scenario.nt, scenario.courant_factor,
+            scenario.source_position)
+
+
+def init_worker(backend=None):
+    """Process pool initializer: load (or compile) the kernels once."""
+    if backend in (None, "auto", "numba") and backends.NUMBA_AVAILABLE:
+        backends.warmup("numba")
+    else:
+        backends.load_kernels()
+
+
+def run_batch(scenarios, backend=None):
+    """
+    Simulate compatible scenarios (equal batch_key()) together.
+
+    Parameters
+    ----------
+    scenarios : list of Scenario
+    backend : str (optional)
+        Kernel backend for single-scenario runs
+
+    Returns
+    -------
+    list of (dict or None, str or None)
+        Per scenario, either ({"trace", "dt"}, None) or (None, error)
+    """
+    if len(scenarios) == 1:
+        try:
+            return [(run_scenario(scenarios[0], backend), None)]
+        except (KeyError, ValueError) as error:
+            return [(None, _message(error))]
+
+    results = [None] * len(scenarios)
+    grids = []
+    rows = []
+
+    for i, scenario in enumerate(scenarios):
+        try:
+            grids.append(scenario.build_grid())
+            rows.append(i)
+        except (KeyError, ValueError) as error:
+            results[i] = (None, _message(error))
+
+    if rows:
+        first = scenarios[rows[0]]
+        dt = first.dt
+
+        sources = np.stack([scenarios[i].source_signal() for i in rows])
+
+        solver = BatchFDTDSolver1D.from_grids(
+            grids, dt, (first.nt + 0.5) * dt, first.source_position)
+        traces = solver.run(sources)
+
+        for i, trace in zip(rows, traces):
+            results[i] = ({"trace": trace, "dt": dt}, None)
+
+    return results
+
+
+def _message(error):
+    # KeyError repr()s its argument; show the plain message instead
+    if isinstance(error, KeyError) and error.args:
+        return str(error.args[0])
+    return str(error)
@@ -0,0 +1,266 @@
+"""
+service/loadgen.py
+
+Load generator for the simulation service.
+
+Opens `concurrency` keep-alive connections that send POST /simulate
+requests back to back, drawn from a pool of distinct scenarios (so
+repeated scenarios exercise request coalescing), and reports
+throughput, latency percentiles and the service counters accumulated
+during the run.
+
+Usage:
+    python -m service.loadgen --port 8765 --requests 500 --concurrency 32
+    python -m service.loadgen --spawn --workers 4    # in-process service
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from sweep.scenarios import expand_sweep
+
+
+# -------------------------------------------------------
+# Client
+# -------------------------------------------------------
+
+class HTTPClient:
+    """
+    Minimal keep-alive HTTP/1.1 JSON client for the service.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def request(self, method, path, payload=None):
+        """
+        Send a request and read a JSON response.
+
+        Returns
+        -------
+        status : int
+        body : dict
+        """
+        status, headers = await self._send(method, path, payload)
+        length = int(headers.get("content-length", 0))
+        body = await self._reader.readexactly(length)
+        self._finish(headers)
+
+        return status, json.loads(body) if body else None
+
+    async def stream(self, path, payload):
+        """
+        POST and yield the NDJSON lines of a chunked response.
+        """
+        status, headers = await self._send("POST", path, payload)
+        if headers.get("transfer-encoding") != "chunked":
+            length = int(headers.get("content-length", 0))
+            body = await self._reader.readexactly(length)
+            self._finish(headers)
+            raise RuntimeError(f"HTTP {status}: {body.decode()}")
+
+        while True:
+            size = int((await self._reader.readline()).strip(), 16)
+            data = await self._reader.readexactly(size + 2)
+            if size == 0:
+                break
+            yield json.loads(data[:-2])
+
+        self._finish(headers)
+
+    async def _send(self, method, path, payload):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port)
+
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self._writer.write(
+            (f"{method} {path} HTTP/1.1\r\n"
+             f"Host: {self.host}:{self.port}\r\n"
+             f"Content-Type: application/json\r\n"
+             f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1")
+            + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by the service.")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        return status, headers
+
+    def _finish(self, headers):
+        if headers.get("connection", "").lower() == "close":
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+# -------------------------------------------------------
+# Load Test
+# -------------------------------------------------------
+
+def make_workload(n_requests, n_distinct, seed=0):
+    """
+    n_requests scenarios drawn (with repetition) from n_distinct
+    "Small Test" scenarios of varying profile, object and frequency.
+    """
+    pool = expand_sweep(
+        ["Small Test"], None,
+        [None, "Steel", "Concrete", "Brick"],
+        np.linspace(5e9, 20e9, max(1, -(-n_distinct // 16))).tolist()
+    )[:n_distinct]
+
+    pool = [scenario.to_dict() for scenario in pool]
+
+    rng = random.Random(seed)
+    return [rng.choice(pool) for _ in range(n_requests)]
+
+
+async def run_load(host, port, scenarios, concurrency=16):
+    """
+    Send every scenario as POST /simulate over `concurrency`
+    connections.
+
+    Returns
+    -------
+    dict
+        Request counts, duration, throughput, latency percentiles (ms)
+        and the change in the service counters
+    """
+    async with HTTPClient(host, port) as client:
+        _, before = await client.request("GET", "/stats")
+
+    queue = asyncio.Queue()
+    for scenario in scenarios:
+        queue.put_nowait(scenario)
+
+    latencies = []
+    errors = 0
+
+    async def user():
+        nonlocal errors
+        async with HTTPClient(host, port) as client:
+            while not queue.empty():
+                scenario = queue.get_nowait()
+                start = time.perf_counter()
+                status, _ = await client.request("POST", "/simulate",
+                                                 scenario)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+
+    async with HTTPClient(host, port) as client:
+        _, after = await client.request("GET", "/stats")
+
+    latency_ms = np.array(latencies) * 1e3
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "throughput_rps": len(latencies) / duration if duration else 0.0,
+        "latency_ms": {
+            "mean": float(latency_ms.mean()),
+            "p50": float(np.percentile(latency_ms, 50)),
+            "p90": float(np.percentile(latency_ms, 90)),
+            "p99": float(np.percentile(latency_ms, 99)),
+            "max": float(latency_ms.max()),
+        },
+        "service": {
+            key: after[key] - before[key]
+            for key in ("requests", "coalesced", "simulated", "batches")
+        },
+        "largest_batch": after["largest_batch"],
+    }
+
+
+async def _spawn_and_run(args, scenarios):
+    from service.server import SimulationServer, SimulationService
+
+    async with SimulationService(workers=args.workers,
+                                 batch_window=args.batch_window / 1000,
+                                 max_batch=args.max_batch,
+                                 backend=args.backend) as service:
+        server = SimulationServer(service)
+        host, port = await server.start(args.host, 0)
+        try:
+            # Untimed warm-up so worker start-up is not measured
+            async with HTTPClient(host, port) as client:
+                await client.request("POST", "/simulate",
+                                     {"preset": "Small Test",
+                                      "profile": "Air-Soil",
+                                      "frequency": 1e9})
+            return await run_load(host, port, scenarios, args.concurrency)
+        finally:
+            await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load generator for the EMScope service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--distinct", type=int, default=32,
+                        help="Distinct scenarios in the workload")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true",
+                        help="Start an in-process service on a free port")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-window", type=float, default=5.0,
+                        help="Micro-batching window of --spawn (ms)")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    scenarios = make_workload(args.requests, args.distinct, args.seed)
+
+    if args.spawn:
+        report = asyncio.run(_spawn_and_run(args, scenarios))
+    else:
+        report = asyncio.run(run_load(args.host, args.port, scenarios,
+                                      args.concurrency))
+
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+"""
+service/server.py
+
+On-demand simulation service (asyncio, HTTP/1.1 + JSON, stdlib only).
+
+Clients post scenarios (see core/scenario.py); simulations run on a
+process pool and the event loop only parses, schedules and replies.
+
+- Coalescing: requests for a scenario that is already in flight (same
+  scenario hash) wait on the same result instead of simulating again.
+- Micro-batching: new scenarios are queued; a batch is collected when
+  a pool worker is free (plus a short window for stragglers), split
+  into compatible groups (service/batching.py) and each group is
+  solved as one BatchFDTDSolver1D run.  Under load the queue grows
+  while workers are busy, so batches grow with it.
+- Streaming: /simulate/stream answers a list of scenarios with one
+  NDJSON line per scenario, in completion order.
+
+Endpoints:
+    GET  /health            {"status": "ok"}
+    GET  /stats             service counters
+    POST /simulate          scenario -> {"hash", "dt", "trace"}
+    POST /simulate/stream   {"scenarios": [...]} -> NDJSON lines
+                            {"index", "hash", "dt", "trace"} or
+                            {"index", "error"}
+
+A scenario is a core.scenario dict, full or preset shorthand, e.g.
+{"preset": "Small Test", "profile": "Air-Soil"}; it is validated
+before it is queued.
+
+Usage:
+    python -m service.server --port 8765 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from core.scenario import Scenario, ScenarioError
+from service.batching import batch_key, init_worker, run_batch
+
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large",
+           422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# -------------------------------------------------------
+# Scheduling
+# -------------------------------------------------------
+
+class SimulationService:
+    """
+    Coalescing, micro-batching front end to a worker pool.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor (optional)
+        Pool running service.batching.run_batch (default: a process
+        pool of `workers` processes)
+    workers : int (optional)
+        Size of the default pool and number of batch groups in
+        flight (default: CPU count)
+    batch_window : float
+        Time to wait for more requests once a batch is started (s)
+    max_batch : int
+        Maximum scenarios per batch
+    backend : str (optional)
+        Kernel backend of the workers (see core/backends.py)
+    """
+
+    def __init__(self, executor=None, workers=None, batch_window=0.005,
+                 max_batch=32, backend=None):
+        if max_batch <= 0:
+            raise ValueError("max_batch must be positive.")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.backend = backend
+
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(backend,)
+            )
+        self._executor = executor
+
+        self._inflight = {}
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+        self._tasks = set()
+
+        self.stats = {"requests": 0, "coalesced": 0, "simulated": 0,
+                      "errors": 0, "batches": 0, "largest_batch": 0,
+                      "queued": 0}
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def close(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, *self._tasks,
+                                 return_exceptions=True)
+            self._batcher = None
+
+        for future in self._inflight.values():
+            if not future.done():
+                future.set_exception(ScenarioError("Service stopped."))
+        self._inflight.clear()
+
+        if self._own_executor:
+            self._executor.shutdown(cancel_futures=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def simulate(self, scenario):
+        """
+        Simulate a scenario (or join the identical in-flight request).
+
+        Returns
+        -------
+        digest : str
+            Scenario hash
+        result : dict
+            "trace" (nt,) and "dt"
+
+        Raises
+        ------
+        ScenarioError
+            Failed simulation
+        """
+        digest = scenario.hash
+        self.stats["requests"] += 1
+
+        future = self._inflight.get(digest)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            # Mark errors as retrieved even if every waiter went away
+            future.add_done_callback(
+                lambda f: f.cancelled() or f.exception())
+            self._inflight[digest] = future
+            self._queue.put_nowait((digest, scenario))
+
+        # A cancelled client must not cancel the shared result
+        return digest, await asyncio.shield(future)
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            first = await self._queue.get()
+            await self._slots.acquire()
+
+            # Everything queued while waiting for a worker, then
+            # whatever arrives within the window
+            batch = [first]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(),
+                                                        timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.stats["queued"] = self._queue.qsize()
+
+            groups = {}
+            for digest, scenario in batch:
+                groups.setdefault(batch_key(scenario), []).append(
+                    (digest, scenario))
+
+            # Each group is one pool job: the permit taken above covers
+            # the first, every other group waits for its own
+            for i, group in enumerate(groups.values()):
+                if i:
+                    await self._slots.acquire()
+                task = asyncio.create_task(self._run_group(group))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run_group(self, group):
+        """Run one group on the pool; releases its _slots permit."""
+        loop = asyncio.get_running_loop()
+        scenarios = [scenario for _, scenario in group]
+
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"],
+                                          len(group))
+
+        try:
+            results = await loop.run_in_executor(
+                self._executor, run_batch, scenarios, self.backend)
+        except Exception as error:
+            results = [(None, f"Simulation failed: {error!r}")] * len(group)
+        finally:
+            self._slots.release()
+
+        for (digest, _), (result, error) in zip(group, results):
+            if error is None:
+                self.stats["simulated"] += 1
+            else:
+                self.stats["errors"] += 1
+
+            future = self._inflight.pop(digest, None)
+            if future is None or future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(ScenarioError(error))
+
+
+# -------------------------------------------------------
+# HTTP
+# -------------------------------------------------------
+
+class SimulationServer:
+    """
+    HTTP/1.1 front end (keep-alive, chunked NDJSON streaming).
+
+    Parameters
+    ----------
+    service : SimulationService
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Start listening; returns the bound (host, port)."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as error:
+                    await _send_json(writer, error.status,
+                                     {"error": str(error)}, False)
+                    break
+
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                try:
+                    await self._dispatch(method, path, body, writer,
+                                         keep_alive)
+                except HTTPError as error:
+                    await _send_json(writer, error.status,
+                                     {"error": str(error)}, keep_alive)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as error:
+                    await _send_json(writer, 500,
+                                     {"error": f"Internal error: {error!r}"},
+                                     False)
+                    break
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body, writer, keep_alive):
+        routes = {
+            "/health": ("GET", self._health),
+            "/stats": ("GET", self._stats),
+            "/simulate": ("POST", self._simulate),
+            "/simulate/stream": ("POST", self._simulate_stream),
+        }
+
+        path = path.split("?", 1)[0]
+        if path not in routes:
+            raise HTTPError(404, f"Unknown path: {path}")
+
+        expected, handler = routes[path]
+        if method != expected:
+            raise HTTPError(405, f"{path} expects {expected}")
+
+        payload = None
+        if expected == "POST":
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, "Invalid JSON body.") from None
+
+        await handler(payload, writer, keep_alive)
+
+    async def _health(self, payload, writer, keep_alive):
+        await _send_json(writer, 200, {"status": "ok"}, keep_alive)
+
+    async def _stats(self, payload, writer, keep_alive):
+        stats = dict(self.service.stats, inflight=len(self.service._inflight))
+        await _send_json(writer, 200, stats, keep_alive)
+
+    async def _simulate(self, payload, writer, keep_alive):
+        try:
+            digest, result = await self.service.simulate(
+                Scenario.from_dict(payload))
+        except ScenarioError as error:
+            raise HTTPError(422, str(error)) from None
+
+        await _send_json(writer, 200, _result_json(digest, result),
+                         keep_alive)
+
+    async def _simulate_stream(self, payload, writer, keep_alive):
+        if isinstance(payload, dict):
+            payload = payload.get("scenarios")
+        if not isinstance(payload, list):
+            raise HTTPError(400, "Expected a list of scenarios.")
+
+        async def one(index, item):
+            try:
+                digest, result = await self.service.simulate(
+                    Scenario.from_dict(item))
+            except ScenarioError as error:
+                return {"index": index, "error": str(error)}
+            except Exception as error:
+                # The response has started; report the item, not a 500
+                return {"index": index,
+                        "error": f"Internal error: {error!r}"}
+            return dict(_result_json(digest, result), index=index)
+
+        writer.write(_head(200, "application/x-ndjson", keep_alive,
+                           chunked=True))
+
+        tasks = [asyncio.create_task(one(i, item))
+                 for i, item in enumerate(payload)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = (json.dumps(await next_done) + "\n").encode()
+                writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+                await writer.drain()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def _result_json(digest, result):
+    return {"hash": digest, "dt": float(result["dt"]),
+            "trace": result["trace"].tolist()}
+
+
+async def _read_request(reader):
+    """(method, path, headers, body), or None at end of connection."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line.") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length.") from None
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large.")
+
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _head(status, content_type, keep_alive, length=None, chunked=False):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+             f"Content-Type: {content_type}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if chunked:
+        lines.append("Transfer-Encoding: chunked")
+    else:
+        lines.append(f"Content-Length: {length}")
+
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _send_json(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    writer.write(_head(status, "application/json", keep_alive, len(body)))
+    writer.write(body)
+    await writer.drain()
+
+
+# -------------------------------------------------------
+# Command Line
+# -------------------------------------------------------
+
+async def serve(host, port, **kwargs):
+    """Run the service until cancelled."""
+    async with SimulationService(**kwargs) as service:
+        server = SimulationServer(service)
+        host, port = await server.start(host, port)
+        print(f"EMScope service listening on http://{host}:{port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EMScope simulation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-window", type=float, default=5.0,
+                        help="Micro-batching window (ms)")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--backend", default=None,
+                        help="Kernel backend (numpy, numba, auto)")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers,
+                          batch_window=args.batch_window / 1000,
+                          max_batch=args.max_batch, backend=args.backend))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+signal_processing/attenuation_compensation.py
+
+Inverse-attenuation gain derived from a layered material model.
+
+The two-way amplitude loss exp(-2 * integral(alpha dz)) is evaluated
+once per model from physics/attenuation.py and stored as a gain
+table over time (optionally also over frequency).  Applying it to a
+batch of traces is then a single broadcasted multiply, either
+directly in time or per STFT frame.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from physics.attenuation import attenuation_constant
+from signal_processing.pipeline import Stage
+
+
+# -------------------------------------------------------
+# Gain Tables
+# -------------------------------------------------------
+
+def _two_way_loss(model, times, alpha):
+    """
+    Two-way attenuation exponent at the given times.
+
+    Parameters
+    ----------
+    model : LayeredVelocityModel
+    times : ndarray (n_times,)
+        Two-way times (s)
+    alpha : ndarray (n_layers, ...)
+        Attenuation constant per layer (Np/m)
+
+    Returns
+    -------
+    ndarray (n_times, ...)
+    """
+    depth = model.time_to_depth(np.maximum(times, 0.0))
+
+    layer = np.searchsorted(model.top_depth, depth, side="right") - 1
+    layer = np.clip(layer, 0, model.n_layers - 1)
+
+    # Attenuation accumulated down to the top of each layer
+    per_layer = alpha[:-1] * model.thickness[:-1].reshape(
+        (-1,) + (1,) * (alpha.ndim - 1))
+    top = np.concatenate((np.zeros_like(alpha[:1]),
+                          np.cumsum(per_layer, axis=0)))
+
+    within = (depth - model.top_depth[layer]).reshape(
+        (-1,) + (1,) * (alpha.ndim - 1))
+
+    return 2 * (top[layer] + alpha[layer] * within)
+
+
+@lru_cache(maxsize=32)
+def attenuation_gain_table(model, dt, nt, frequency, max_gain_db=60.0,
+                           time_zero=0.0):
+    """
+    Time-varying inverse-attenuation gain at one frequency.
+
+    Cached per (model, dt, nt, frequency, max_gain_db, time_zero).
+
+    Parameters
+    ----------
+    model : LayeredVelocityModel
+    dt : float
+        Sample interval (s)
+    nt : int
+        Samples per trace
+    frequency : float
+        Frequency at which alpha is evaluated (Hz), e.g. the
+        antenna center frequency
+    max_gain_db : float
+        Gain ceiling (dB)
+    time_zero : float
+        Time of the zero-depth reference (s)
+
+    Returns
+    -------
+    ndarray (nt,)
+        Read-only gain
+    """
+    alpha = attenuation_constant(frequency, model.epsilon_r, model.mu_r,
+                                 model.sigma)
+
+    times = np.arange(nt) * dt - time_zero
+    loss = _two_way_loss(model, times, alpha)
+
+    gain = np.exp(np.minimum(loss, max_gain_db * np.log(10) / 20))
+    gain.setflags(write=False)
+    return gain
+
+
+@lru_cache(maxsize=32)
+def attenuation_gain_spectrum(model, dt, n_frames, nperseg,
+                              max_gain_db=60.0, time_zero=0.0):
+    """
+    Time- and frequency-dependent inverse-attenuation gain.
+
+    Frame f is centered on sample f * nperseg // 2.
+
+    Parameters
+    ----------
+    model : LayeredVelocityModel
+    dt : float
+        Sample interval (s)
+    n_frames : int
+        Number of STFT frames
+    nperseg : int
+        STFT frame length (samples)
+    max_gain_db : float
+    time_zero : float
+
+    Returns
+    -------
+    ndarray (n_frames, nperseg // 2 + 1)
+        Read-only gain; the DC bin is left unscaled
+    """
+    frequencies = np.fft.rfftfreq(nperseg, dt)
+
+    alpha = np.zeros((model.n_layers, len(frequencies)))
+    alpha[:, 1:] = attenuation_constant(
+        frequencies[None, 1:],
+        model.epsilon_r[:, None],
+        model.mu_r[:, None],
+        model.sigma[:, None]
+    )
+
+    frame_times = np.arange(n_frames) * (nperseg // 2) * dt - time_zero
+    loss = _two_way_loss(model, frame_times, alpha)
+
+    gain = np.exp(np.minimum(loss, max_gain_db * np.log(10) / 20))
+    gain.setflags(write=False)
+    return gain
+
+
+# -------------------------------------------------------
+# Compensation Stage
+# -------------------------------------------------------
+
+class AttenuationCompensation(Stage):
+    """
+    Pipeline stage applying the inverse-attenuation gain.
+
+    Parameters
+    ----------
+    model : LayeredVelocityModel
+        Layered model (needs sigma for non-zero loss)
+    dt : float
+        Sample interval (s)
+    frequency : float
+        Center frequency for the time-only gain (Hz)
+    max_gain_db : float
+        Gain ceiling (dB)
+    time_zero : float
+        Time of the zero-depth reference (s)
+    stft : bool
+        Apply a frequency-dependent gain per STFT frame instead
+    nperseg : int
+        STFT frame length (even; 50% overlap Hann frames)
+    """
+
+    name = "attenuation_compensation"
+
+    def __init__(self, model, dt, frequency=None, max_gain_db=60.0,
+                 time_zero=0.0, stft=False, nperseg=64):
+        if not stft and frequency is None:
+            raise ValueError("frequency is required without stft.")
+        if stft and (nperseg < 2 or nperseg % 2):
+            raise ValueError("nperseg must be even.")
+
+        super().__init__()
+        self.model = model
+        self.dt = dt
+        self.frequency = frequency
+        self.max_gain_db = max_gain_db
+        self.time_zero = time_zero
+        self.stft = stft
+        self.nperseg = int(nperseg)
+
+    def process(self, chunk):
+        nt = chunk.shape[-1]
+
+        if not self.stft:
+            chunk *= attenuation_gain_table(
+                self.model, self.dt, nt, self.frequency,
+                self.max_gain_db, self.time_zero)
+            return chunk
+
+        return self._process_stft(chunk)
+
+    def _process_stft(self, chunk):
+        n, nt = chunk.shape
+        hop = self.nperseg // 2
+
+        # One hop of padding on the left; enough on the right for
+        # every sample to be covered by two frames
+        length = -(-(nt + 2 * hop) // hop) * hop
+        padded = np.zeros((n, length))
+        padded[:, hop:hop + nt] = chunk
+
+        frames = sliding_window_view(padded, self.nperseg, axis=-1)[:, ::hop]
+        n_frames = frames.shape[1]
+
+        # Periodic Hann windows at 50% overlap sum to one
+        window = 0.5 - 0.5 * np.cos(
+            2 * np.pi * np.arange(self.nperseg) / self.nperseg)
+
+        spectrum = np.fft.rfft(frames * window, axis=-1)
+        spectrum *= attenuation_gain_spectrum(
+            self.model, self.dt, n_frames, self.nperseg,
+            self.max_gain_db, self.time_zero)
+        frames = np.fft.irfft(spectrum, self.nperseg, axis=-1)
+
+        blocks = np.zeros((n, n_frames + 1, hop))
+        blocks[:, :-1] += frames[..., :hop]
+        blocks[:, 1:] += frames[..., hop:]
+
+        return blocks.reshape(n, -1)[:, hop:hop + nt]
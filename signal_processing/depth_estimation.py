@@ -7,6 +7,7 @@ using time-of-flight analysis.
 
 import numpy as np
 from physics.constants import C0
+from config.material_database import MATERIAL_DATABASE
 
 
 # -------------------------------------------------------
@@ -91,10 +92,210 @@ def estimate_multiple_depths(peak_indices, dt, epsilon_r, mu_r=1.0):
     list of depths
     """
 
-    depths = []
+    indices = np.asarray(peak_indices, dtype=float)
 
-    for idx in peak_indices:
-        depth = estimate_depth_from_index(idx, dt, epsilon_r, mu_r)
-        depths.append(depth)
+    return estimate_depth_from_index(indices, dt, epsilon_r, mu_r).tolist()
+
+
+# -------------------------------------------------------
+# Layered Velocity Model
+# -------------------------------------------------------
+
+class LayeredVelocityModel:
+    """
+    Piecewise-constant velocity model for time-to-depth conversion.
+
+    Depths are measured from the reference point (normally the
+    antenna / source cell).  The two-way travel time to the top of
+    every layer is tabulated once, so any number of picks can be
+    converted with a single np.searchsorted.
+
+    Parameters
+    ----------
+    thickness : array_like (n_layers,)
+        Layer thicknesses (m); the last layer is treated as a
+        half-space
+    epsilon_r : array_like (n_layers,)
+        Relative permittivity per layer
+    mu_r : array_like or float
+        Relative permeability per layer
+    sigma : array_like or float
+        Conductivity per layer (S/m)
+    """
+
+    def __init__(self, thickness, epsilon_r, mu_r=1.0, sigma=0.0):
+        thickness = np.atleast_1d(np.asarray(thickness, dtype=float))
+        n = len(thickness)
+
+        self.thickness = thickness
+        self.epsilon_r = np.broadcast_to(
+            np.asarray(epsilon_r, dtype=float), (n,)).copy()
+        self.mu_r = np.broadcast_to(
+            np.asarray(mu_r, dtype=float), (n,)).copy()
+        self.sigma = np.broadcast_to(
+            np.asarray(sigma, dtype=float), (n,)).copy()
+
+        if n == 0:
+            raise ValueError("Model needs at least one layer.")
+        if np.any(thickness[:-1] <= 0):
+            raise ValueError("Layer thicknesses must be positive.")
+        if np.any(self.epsilon_r <= 0) or np.any(self.mu_r <= 0):
+            raise ValueError("Material parameters must be positive.")
+
+        self.velocity = C0 / np.sqrt(self.epsilon_r * self.mu_r)
+
+        # Depth and two-way time at the top of each layer
+        self.top_depth = np.concatenate(([0.0], np.cumsum(thickness[:-1])))
+        self.top_time = np.concatenate(
+            ([0.0], np.cumsum(2 * thickness[:-1] / self.velocity[:-1]))
+        )
+
+    @property
+    def n_layers(self):
+        return len(self.thickness)
+
+    @property
+    def key(self):
+        """Hashable description of the model (used for caching)."""
+        return (
+            tuple(self.thickness.tolist()),
+            tuple(self.epsilon_r.tolist()),
+            tuple(self.mu_r.tolist()),
+            tuple(self.sigma.tolist()),
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, LayeredVelocityModel):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    # --------------------------------------------------
+    # Constructors
+    # --------------------------------------------------
+
+    @classmethod
+    def from_grid(cls, grid, reference_index=0):
+        """
+        Build the model from a Grid1D material distribution.
+
+        Parameters
+        ----------
+        grid : Grid1D
+        reference_index : int
+            Cell that depths are measured from (e.g. source position)
+        """
+        epsilon_r = grid.epsilon_r[reference_index:]
+        sigma = grid.sigma[reference_index:]
+
+        if len(epsilon_r) == 0:
+            raise ValueError("reference_index outside grid.")
+
+        change = np.flatnonzero(
+            (np.diff(epsilon_r) != 0) | (np.diff(sigma) != 0)
+        ) + 1
+        starts = np.concatenate(([0], change))
+        cells = np.diff(np.concatenate((starts, [len(epsilon_r)])))
+
+        return cls(cells * grid.dx, epsilon_r[starts], sigma=sigma[starts])
+
+    @classmethod
+    def from_layer_profile(cls, profile, dx, reference_index=0):
+        """
+        Build the model from a LAYER_PROFILES entry.
+
+        Parameters
+        ----------
+        profile : list of (start, end, material_name)
+            Layer extents in cells
+        dx : float
+            Cell size (m)
+        reference_index : int
+            Cell that depths are measured from
+        """
+        layers = sorted(
+            (max(start, reference_index), end, name)
+            for start, end, name in profile
+            if end > reference_index
+        )
+
+        if not layers:
+            raise ValueError("No layers below reference_index.")
+
+        for name in (name for _, _, name in layers):
+            if name not in MATERIAL_DATABASE:
+                raise KeyError(f"Unknown material: {name}")
+
+        return cls(
+            [(end - start) * dx for start, end, _ in layers],
+            [MATERIAL_DATABASE[name]["epsilon_r"] for _, _, name in layers],
+            mu_r=[MATERIAL_DATABASE[name]["mu_r"] for _, _, name in layers],
+            sigma=[MATERIAL_DATABASE[name]["sigma"] for _, _, name in layers]
+        )
+
+    # --------------------------------------------------
+    # Conversions
+    # --------------------------------------------------
+
+    def time_to_depth(self, two_way_time):
+        """
+        Convert two-way travel times (any shape) to depths (m).
+        """
+        t = np.asarray(two_way_time, dtype=float)
+
+        layer = np.searchsorted(self.top_time, t, side="right") - 1
+        layer = np.clip(layer, 0, self.n_layers - 1)
+
+        return (
+            self.top_depth[layer]
+            + (t - self.top_time[layer]) * self.velocity[layer] / 2
+        )
+
+    def depth_to_time(self, depth):
+        """
+        Convert depths (any shape) to two-way travel times (s).
+        """
+        z = np.asarray(depth, dtype=float)
+
+        layer = np.searchsorted(self.top_depth, z, side="right") - 1
+        layer = np.clip(layer, 0, self.n_layers - 1)
+
+        return (
+            self.top_time[layer]
+            + 2 * (z - self.top_depth[layer]) / self.velocity[layer]
+        )
+
+
+# -------------------------------------------------------
+# Batch Depth Estimation (Layered)
+# -------------------------------------------------------
+
+def estimate_depths_layered(peak_indices, dt, model, time_zero=0.0):
+    """
+    Convert a pick array to depths in a layered medium.
+
+    Parameters
+    ----------
+    peak_indices : array_like (..., n_peaks)
+        Sample indices, e.g. (n_traces, n_peaks); negative or NaN
+        entries mark missing picks
+    dt : float
+        Sample interval (s)
+    model : LayeredVelocityModel
+    time_zero : float
+        Time of the zero-depth reference (s)
+
+    Returns
+    -------
+    ndarray
+        Depths (m), NaN where picks are missing
+    """
+
+    indices = np.asarray(peak_indices, dtype=float)
+
+    depths = model.time_to_depth(indices * dt - time_zero)
+    depths[~(indices >= 0)] = np.nan
 
     return depths
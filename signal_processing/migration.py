@@ -0,0 +1,232 @@
+"""
+signal_processing/migration.py
+
+Migration of B-scans (n_positions, nt) to depth images.
+
+Two paths are provided:
+
+- Stolt (f-k) migration for a constant velocity, done entirely with
+  FFTs and one vectorized interpolation in the frequency domain.
+- Kirchhoff (diffraction-stack) migration for a layered velocity
+  model, using a precomputed travel-time table indexed by depth and
+  lateral offset; the stack loops over offsets only, each offset
+  being a single gather over all positions and depths.
+
+Both follow the exploding-reflector convention for zero-offset GPR
+data (two-way times, half the medium velocity).
+"""
+
+import numpy as np
+
+from physics.constants import C0
+from signal_processing.depth_estimation import (
+    LayeredVelocityModel,
+    wave_velocity
+)
+from signal_processing.matched_filter import next_fast_len
+
+
+def _resolve_velocity(velocity, epsilon_r):
+    if (velocity is None) == (epsilon_r is None):
+        raise ValueError("Give exactly one of velocity or epsilon_r.")
+    if velocity is None:
+        velocity = wave_velocity(epsilon_r)
+    if velocity <= 0:
+        raise ValueError("velocity must be positive.")
+    return velocity
+
+
+# -------------------------------------------------------
+# Stolt (f-k) Migration
+# -------------------------------------------------------
+
+def stolt_migration(radargram, dt, dx, velocity=None, epsilon_r=None):
+    """
+    Constant-velocity Stolt migration.
+
+    Parameters
+    ----------
+    radargram : ndarray (n_positions, nt)
+        Zero-offset traces at spacing dx
+    dt : float
+        Sample interval (s)
+    dx : float
+        Trace spacing (m)
+    velocity : float (optional)
+        Medium velocity (m/s)
+    epsilon_r : float (optional)
+        Medium permittivity, used when velocity is not given
+
+    Returns
+    -------
+    image : ndarray (n_positions, nt)
+        Migrated section
+    depth : ndarray (nt,)
+        Depth axis (m), dz = velocity * dt / 2
+    """
+    velocity = _resolve_velocity(velocity, epsilon_r)
+    data = np.atleast_2d(np.asarray(radargram, dtype=float))
+    nx, nt = data.shape
+
+    nfx = next_fast_len(2 * nx)
+    nft = next_fast_len(2 * nt)
+
+    spectrum = np.fft.fft(np.fft.rfft(data, nft, axis=1), nfx, axis=0)
+
+    kx = np.fft.fftfreq(nfx, dx)[:, None]
+    f = np.fft.rfftfreq(nft, dt)
+    df = f[1]
+
+    half_v = velocity / 2
+    kz = f[None, :] / half_v
+
+    # Input frequency feeding each output (kx, kz)
+    f_in = half_v * np.sqrt(kx ** 2 + kz ** 2)
+
+    position = f_in / df
+    i0 = np.floor(position).astype(int)
+    frac = position - i0
+    valid = i0 + 1 < len(f)
+    i0 = np.where(valid, i0, 0)
+
+    low = np.take_along_axis(spectrum, i0, axis=1)
+    high = np.take_along_axis(spectrum, i0 + 1, axis=1)
+    mapped = low + frac * (high - low)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        jacobian = np.where(f_in > 0, half_v * kz / f_in, 0.0)
+
+    mapped *= np.where(valid, jacobian, 0.0)
+
+    image = np.fft.irfft(np.fft.ifft(mapped, axis=0), nft, axis=1)
+    image = image[:nx, :nt]
+
+    return image, np.arange(nt) * half_v * dt
+
+
+# -------------------------------------------------------
+# Kirchhoff Migration
+# -------------------------------------------------------
+
+def travel_time_table(model, depth, offsets):
+    """
+    Two-way diffraction travel times for a layered model.
+
+    Uses the RMS-velocity (Dix) hyperbola
+    T = 2 * sqrt(t0^2 + h^2 / v_rms^2).
+
+    Parameters
+    ----------
+    model : LayeredVelocityModel
+    depth : ndarray (nz,)
+        Image depths (m)
+    offsets : ndarray (n_offsets,)
+        Lateral offsets (m)
+
+    Returns
+    -------
+    ndarray (nz, n_offsets)
+        Two-way times (s)
+    """
+    depth = np.asarray(depth, dtype=float)
+
+    t0 = model.depth_to_time(depth) / 2
+
+    # v_rms^2 = integral(v^2 dt) / integral(dt), integrated over
+    # the one-way time table of the model
+    layer = np.clip(
+        np.searchsorted(model.top_depth, depth, side="right") - 1,
+        0, model.n_layers - 1
+    )
+    layer_time = np.diff(model.top_time) / 2
+    v2t = np.concatenate(
+        ([0.0], np.cumsum(model.velocity[:-1] ** 2 * layer_time)))
+    integral = (
+        v2t[layer]
+        + model.velocity[layer] ** 2 * (t0 - model.top_time[layer] / 2)
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        v_rms2 = np.where(t0 > 0, integral / t0, model.velocity[0] ** 2)
+
+    offsets = np.asarray(offsets, dtype=float)
+    return 2 * np.sqrt(t0[:, None] ** 2
+                       + offsets[None, :] ** 2 / v_rms2[:, None])
+
+
+def kirchhoff_migration(radargram, dt, dx, model=None, velocity=None,
+                        epsilon_r=None, depth=None, aperture=None):
+    """
+    Kirchhoff (diffraction-stack) migration.
+
+    Parameters
+    ----------
+    radargram : ndarray (n_positions, nt)
+    dt : float
+        Sample interval (s)
+    dx : float
+        Trace spacing (m)
+    model : LayeredVelocityModel (optional)
+        Layered velocity model; otherwise a constant velocity (or
+        epsilon_r) is used
+    depth : ndarray (optional)
+        Image depths (m); defaults to nt samples at v * dt / 2 of the
+        top layer
+    aperture : float (optional)
+        Maximum lateral offset summed (m); defaults to the full line
+
+    Returns
+    -------
+    image : ndarray (n_positions, nz)
+    depth : ndarray (nz,)
+    """
+    data = np.atleast_2d(np.asarray(radargram, dtype=float))
+    nx, nt = data.shape
+
+    if model is None:
+        velocity = _resolve_velocity(velocity, epsilon_r)
+        model = LayeredVelocityModel([np.inf], [(C0 / velocity) ** 2])
+
+    if depth is None:
+        depth = np.arange(nt) * model.velocity[0] * dt / 2
+    depth = np.asarray(depth, dtype=float)
+
+    n_offsets = nx if aperture is None else min(
+        int(aperture / dx) + 1, nx)
+    offsets = np.arange(n_offsets) * dx
+
+    times = travel_time_table(model, depth, offsets)
+
+    # Fractional sample index and obliquity weight per (z, offset)
+    position = times / dt
+    i0 = np.floor(position).astype(int)
+    frac = position - i0
+    valid = i0 + 1 < nt
+    i0 = np.where(valid, i0, 0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(times > 0, times[:, :1] / times, 1.0)
+    weight = np.where(valid, weight, 0.0)
+
+    w_low = weight * (1 - frac)
+    w_high = weight * frac
+
+    # Time-major copy: gathering whole rows is much faster than
+    # gathering scattered columns
+    data_t = np.ascontiguousarray(data.T)
+    image = np.zeros((len(depth), nx))
+
+    for o in range(n_offsets):
+        low = i0[:, o]
+
+        stacked = data_t[low] * w_low[:, o:o + 1]
+        stacked += data_t[low + 1] * w_high[:, o:o + 1]
+
+        # Traces to the right (x0 + o) and, for o > 0, to the left
+        image[:, :nx - o] += stacked[:, o:]
+        if o:
+            image[:, o:] += stacked[:, :nx - o]
+
+    image = image.T
+
+    return image, depth
@@ -0,0 +1,340 @@
+"""
+signal_processing/montecarlo.py
+
+Monte Carlo estimation of detection probability and false-alarm
+rate for buried reflectors.
+
+One clean trace per scenario is reused for every realization.  Noisy
+copies are generated in vectorized chunks, run through the batched
+peak detector and depth converter, and reduced into streaming
+counters, so no noisy trace is kept after its chunk is processed.
+Independent blocks of realizations run in separate processes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from signal_processing.depth_estimation import estimate_depth_from_index
+from signal_processing.noise_model import NoiseGenerator
+from signal_processing.peak_detection import peak_mask
+
+
+# -------------------------------------------------------
+# Scenario
+# -------------------------------------------------------
+
+class DetectionScenario:
+    """
+    Clean trace and ground truth for one detection experiment.
+
+    Parameters
+    ----------
+    clean_signal : ndarray (nt,)
+        Noise-free simulated trace
+    dt : float
+        Sample interval (s)
+    target_indices : array_like
+        Sample indices of the true reflections
+    epsilon_r : float
+        Permittivity used for depth conversion
+    velocity_model : LayeredVelocityModel (optional)
+        Layered model used for depth conversion instead of epsilon_r
+    time_zero : float
+        Time of the zero-depth reference (s)
+    mute_samples : int
+        Leading samples ignored by the detector (direct wave)
+    name : str
+    """
+
+    def __init__(self, clean_signal, dt, target_indices, epsilon_r=1.0,
+                 velocity_model=None, time_zero=0.0, mute_samples=0,
+                 name="scenario"):
+        self.clean_signal = np.asarray(clean_signal, dtype=float)
+        self.dt = dt
+        self.target_indices = np.atleast_1d(
+            np.asarray(target_indices, dtype=int))
+        self.epsilon_r = epsilon_r
+        self.velocity_model = velocity_model
+        self.time_zero = time_zero
+        self.mute_samples = int(mute_samples)
+        self.name = name
+
+        nt = len(self.clean_signal)
+        if np.any(self.target_indices < 0) or np.any(self.target_indices >= nt):
+            raise ValueError("Target index outside trace.")
+
+    @property
+    def nt(self):
+        return len(self.clean_signal)
+
+    def index_to_depth(self, indices):
+        """Convert sample indices (any shape) to depth (m)."""
+        indices = np.asarray(indices, dtype=float)
+
+        if self.velocity_model is not None:
+            return self.velocity_model.time_to_depth(
+                indices * self.dt - self.time_zero)
+
+        t0_index = self.time_zero / self.dt
+        return estimate_depth_from_index(
+            indices - t0_index, self.dt, self.epsilon_r)
+
+    @property
+    def target_depths(self):
+        return self.index_to_depth(self.target_indices)
+
+
+# -------------------------------------------------------
+# Streaming Statistics
+# -------------------------------------------------------
+
+class DetectionStatistics:
+    """
+    Streaming detection / false-alarm counters.
+
+    All counters are additive, so partial results from chunks or
+    worker processes are combined with merge().
+
+    Parameters
+    ----------
+    thresholds : array_like (n_thresholds,)
+        Detector threshold ratios
+    n_targets : int
+    """
+
+    def __init__(self, thresholds, n_targets):
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        shape = (len(self.thresholds), n_targets)
+
+        self.n_trials = 0
+        self.detections = np.zeros(shape, dtype=np.int64)
+        self.false_alarm_traces = np.zeros(len(self.thresholds), np.int64)
+        self.false_alarms = np.zeros(len(self.thresholds), np.int64)
+        self.depth_error_sum = np.zeros(shape)
+        self.depth_error_sq_sum = np.zeros(shape)
+
+    def merge(self, other):
+        """Add the counters of another DetectionStatistics."""
+        if not np.array_equal(self.thresholds, other.thresholds):
+            raise ValueError("Threshold grids differ.")
+
+        self.n_trials += other.n_trials
+        self.detections += other.detections
+        self.false_alarm_traces += other.false_alarm_traces
+        self.false_alarms += other.false_alarms
+        self.depth_error_sum += other.depth_error_sum
+        self.depth_error_sq_sum += other.depth_error_sq_sum
+        return self
+
+    @property
+    def probability_of_detection(self):
+        """(n_thresholds, n_targets) detection probability."""
+        return self.detections / max(self.n_trials, 1)
+
+    @property
+    def probability_of_false_alarm(self):
+        """Fraction of traces with at least one false peak."""
+        return self.false_alarm_traces / max(self.n_trials, 1)
+
+    @property
+    def mean_false_alarms(self):
+        """Mean number of false peaks per trace."""
+        return self.false_alarms / max(self.n_trials, 1)
+
+    @property
+    def depth_bias(self):
+        """Mean depth error of detected targets (m)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.depth_error_sum / self.detections
+
+    @property
+    def depth_rmse(self):
+        """RMS depth error of detected targets (m)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self.depth_error_sq_sum / self.detections)
+
+    def to_dict(self):
+        return {
+            "n_trials": self.n_trials,
+            "thresholds": self.thresholds.tolist(),
+            "probability_of_detection":
+                self.probability_of_detection.tolist(),
+            "probability_of_false_alarm":
+                self.probability_of_false_alarm.tolist(),
+            "mean_false_alarms": self.mean_false_alarms.tolist(),
+            "depth_bias": self.depth_bias.tolist(),
+            "depth_rmse": self.depth_rmse.tolist(),
+        }
+
+
+# -------------------------------------------------------
+# Chunk Evaluation
+# -------------------------------------------------------
+
+def _target_windows(scenario, tolerance):
+    nt = scenario.nt
+    lo = np.clip(scenario.target_indices - tolerance, 0, nt)
+    hi = np.clip(scenario.target_indices + tolerance + 1, 0, nt)
+
+    region = np.zeros(nt, dtype=bool)
+    for start, stop in zip(lo, hi):
+        region[start:stop] = True
+
+    return lo, hi, region
+
+
+def evaluate_chunk(chunk, scenario, stats, min_distance=10, tolerance=5):
+    """
+    Run detection on a chunk of noisy traces and update stats.
+
+    Parameters
+    ----------
+    chunk : ndarray (n, nt)
+    scenario : DetectionScenario
+    stats : DetectionStatistics
+    min_distance : int
+        Minimum peak spacing for the detector
+    tolerance : int
+        A peak within this many samples of a target counts as a hit
+    """
+    if scenario.mute_samples:
+        chunk[:, :scenario.mute_samples] = 0.0
+
+    amplitude = np.abs(chunk)
+    lo, hi, region = _target_windows(scenario, tolerance)
+    true_depths = scenario.target_depths
+
+    for i, ratio in enumerate(stats.thresholds):
+        mask = peak_mask(chunk, ratio, min_distance=min_distance)
+
+        for j, (start, stop) in enumerate(zip(lo, hi)):
+            window = np.where(mask[:, start:stop],
+                              amplitude[:, start:stop], -1.0)
+            hit = window.max(axis=1) >= 0
+
+            if not hit.any():
+                continue
+
+            picks = start + window[hit].argmax(axis=1)
+            error = scenario.index_to_depth(picks) - true_depths[j]
+
+            stats.detections[i, j] += np.count_nonzero(hit)
+            stats.depth_error_sum[i, j] += error.sum()
+            stats.depth_error_sq_sum[i, j] += (error ** 2).sum()
+
+        false = np.count_nonzero(mask[:, ~region], axis=1)
+        stats.false_alarms[i] += false.sum()
+        stats.false_alarm_traces[i] += np.count_nonzero(false)
+
+    stats.n_trials += len(chunk)
+
+
+def _run_block(scenario, n_realizations, stream, seed, thresholds,
+               noise_params, chunk_size, min_distance, tolerance):
+    stats = DetectionStatistics(thresholds, len(scenario.target_indices))
+    generator = NoiseGenerator(seed, stream=stream)
+
+    for chunk in generator.realizations(scenario.clean_signal,
+                                        n_realizations, chunk_size,
+                                        **noise_params):
+        evaluate_chunk(chunk, scenario, stats, min_distance, tolerance)
+
+    return stats
+
+
+# -------------------------------------------------------
+# Study Runner
+# -------------------------------------------------------
+
+def run_detection_study(scenario, n_realizations, thresholds=(0.2,),
+                        snr_db=20, impulse_prob=0.005, multipath_delay=15,
+                        multipath_attenuation=0.2, min_distance=10,
+                        tolerance=5, chunk_size=2048, block_size=65536,
+                        n_workers=1, seed=0):
+    """
+    Estimate detection statistics for one scenario and noise level.
+
+    Realizations are split into fixed blocks of block_size, each with
+    its own noise stream, so results depend only on seed and not on
+    the number of workers.
+
+    Parameters
+    ----------
+    scenario : DetectionScenario
+    n_realizations : int
+        Number of noisy traces
+    thresholds : array_like
+        Detector threshold ratios (one ROC point each)
+    snr_db, impulse_prob, multipath_delay, multipath_attenuation
+        Noise parameters, as in apply_realistic_noise()
+    min_distance : int
+        Minimum peak spacing (detect_peaks_with_distance)
+    tolerance : int
+        Hit window half-width (samples)
+    chunk_size : int
+        Traces generated per vectorized chunk
+    block_size : int
+        Realizations per noise stream / process task
+    n_workers : int
+        Worker processes (None = CPU count)
+    seed : int
+        Root seed
+
+    Returns
+    -------
+    DetectionStatistics
+    """
+    if n_realizations <= 0:
+        raise ValueError("n_realizations must be positive.")
+
+    noise_params = {
+        "snr_db": snr_db,
+        "impulse_prob": impulse_prob,
+        "multipath_delay": multipath_delay,
+        "multipath_attenuation": multipath_attenuation,
+    }
+
+    blocks = [
+        (min(block_size, n_realizations - start), stream)
+        for stream, start in enumerate(range(0, n_realizations, block_size))
+    ]
+
+    total = DetectionStatistics(thresholds, len(scenario.target_indices))
+    args = (seed, thresholds, noise_params, chunk_size, min_distance,
+            tolerance)
+
+    n_workers = n_workers or os.cpu_count()
+
+    if n_workers == 1 or len(blocks) == 1:
+        for count, stream in blocks:
+            total.merge(_run_block(scenario, count, stream, *args))
+        return total
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [
+            pool.submit(_run_block, scenario, count, stream, *args)
+            for count, stream in blocks
+        ]
+        for future in as_completed(futures):
+            total.merge(future.result())
+
+    return total
+
+
+def detection_curves(scenarios, snr_values, n_realizations, **kwargs):
+    """
+    Run run_detection_study over scenarios x SNR values.
+
+    Returns
+    -------
+    dict
+        {(scenario.name, snr_db): DetectionStatistics}
+    """
+    return {
+        (scenario.name, snr): run_detection_study(
+            scenario, n_realizations, snr_db=snr, **kwargs)
+        for scenario in scenarios
+        for snr in snr_values
+    }
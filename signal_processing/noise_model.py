@@ -3,24 +3,36 @@ signal_processing/noise_model.py
 
 Noise modeling utilities for EM signal simulation.
 Adds realistic disturbances to reflected signals.
+
+All functions operate along the last axis, so a single trace and a
+(n_traces, nt) batch are handled alike.  Randomness comes from the
+rng argument (a numpy.random.Generator); without it the global NumPy
+RNG is used.
 """
 
 import numpy as np
 
+from core.backends import get_kernel, jit, register
+
+
+def _resolve_rng(rng):
+    return np.random if rng is None else rng
+
 
 # -------------------------------------------------------
 # Additive White Gaussian Noise (AWGN)
 # -------------------------------------------------------
 
-def add_awgn(signal, snr_db):
+def add_awgn(signal, snr_db, rng=None):
     """
     Add additive white Gaussian noise to signal.
 
     Parameters
     ----------
-    signal : ndarray
+    signal : ndarray (nt,) or (n_traces, nt)
     snr_db : float
-        Signal-to-noise ratio in dB
+        Signal-to-noise ratio in dB (per trace)
+    rng : numpy.random.Generator (optional)
 
     Returns
     -------
@@ -31,17 +43,16 @@ def add_awgn(signal, snr_db):
     if snr_db <= 0:
         raise ValueError("SNR must be positive.")
 
-    signal_power = np.mean(signal ** 2)
+    signal = np.asarray(signal, dtype=float)
+
+    signal_power = np.mean(signal ** 2, axis=-1, keepdims=True)
 
     snr_linear = 10 ** (snr_db / 10)
 
     noise_power = signal_power / snr_linear
 
-    noise = np.random.normal(
-        0,
-        np.sqrt(noise_power),
-        size=signal.shape
-    )
+    noise = _resolve_rng(rng).normal(0, 1, size=signal.shape)
+    noise *= np.sqrt(noise_power)
 
     return signal + noise
 
@@ -50,7 +61,61 @@ def add_awgn(signal, snr_db):
 # Impulse Noise
 # -------------------------------------------------------
 
-def add_impulse_noise(signal, probability=0.01, amplitude_factor=2.0):
+def _impulse_numpy(noisy, probability, amplitude_factor, rng):
+    """
+    Add spikes to a (n_traces, nt) array in place.
+
+    All hit draws come first, then one sign draw per hit in row-major
+    order; the compiled kernel consumes the generator identically.
+    """
+    max_amp = np.max(np.abs(noisy), axis=-1, keepdims=True)
+
+    hits = rng.random(noisy.shape) < probability
+    n_hits = np.count_nonzero(hits)
+
+    if n_hits:
+        spikes = np.broadcast_to(amplitude_factor * max_amp,
+                                 noisy.shape)[hits]
+        signs = np.where(rng.random(n_hits) < 0.5, -1.0, 1.0)
+        noisy[hits] += spikes * signs
+
+
+def _impulse_loop(noisy, probability, amplitude_factor, rng):
+    n, m = noisy.shape
+
+    max_amp = np.zeros(n)
+    for i in range(n):
+        for j in range(m):
+            if abs(noisy[i, j]) > max_amp[i]:
+                max_amp[i] = abs(noisy[i, j])
+
+    hits = np.empty(n * m, dtype=np.int64)
+    n_hits = 0
+    for index in range(n * m):
+        if rng.random() < probability:
+            hits[n_hits] = index
+            n_hits += 1
+
+    for h in range(n_hits):
+        i = hits[h] // m
+        j = hits[h] % m
+        sign = -1.0 if rng.random() < 0.5 else 1.0
+        noisy[i, j] += amplitude_factor * max_amp[i] * sign
+
+
+_impulse_jit = jit(_impulse_loop)
+
+
+def _warmup_impulse():
+    _impulse_jit(np.ones((1, 4)), 0.5, 2.0, np.random.default_rng(0))
+
+
+register("impulse_noise", "numpy", _impulse_numpy)
+register("impulse_noise", "numba", _impulse_jit, warmup=_warmup_impulse)
+
+
+def add_impulse_noise(signal, probability=0.01, amplitude_factor=2.0,
+                      rng=None, backend=None):
     """
     Add random impulse spikes to signal.
 
@@ -59,16 +124,21 @@ def add_impulse_noise(signal, probability=0.01, amplitude_factor=2.0):
     probability : float
         Probability of impulse occurrence
     amplitude_factor : float
-        Multiplier relative to max signal amplitude
+        Multiplier relative to max signal amplitude (per trace)
+    rng : numpy.random.Generator (optional)
+    backend : str (optional)
+        Kernel backend (see core/backends.py); the compiled kernel
+        needs a Generator, so the global RNG always uses NumPy
     """
 
-    noisy_signal = signal.copy()
-    max_amp = np.max(np.abs(signal))
+    rng = _resolve_rng(rng)
+    if not isinstance(rng, np.random.Generator):
+        backend = "numpy"
 
-    for i in range(len(signal)):
-        if np.random.rand() < probability:
-            spike = amplitude_factor * max_amp
-            noisy_signal[i] += spike * np.random.choice([-1, 1])
+    noisy_signal = np.array(signal, dtype=float)
+    get_kernel("impulse_noise", backend)(
+        noisy_signal.reshape(-1, noisy_signal.shape[-1]), probability,
+        amplitude_factor, rng)
 
     return noisy_signal
 
@@ -84,10 +154,13 @@ def add_multipath(signal, delay_samples=20, attenuation=0.3):
     Adds delayed and attenuated copy of signal.
     """
 
+    signal = np.asarray(signal, dtype=float)
     delayed_signal = np.zeros_like(signal)
 
-    if delay_samples < len(signal):
-        delayed_signal[delay_samples:] = signal[:-delay_samples]
+    if delay_samples == 0:
+        delayed_signal[...] = signal
+    elif delay_samples < signal.shape[-1]:
+        delayed_signal[..., delay_samples:] = signal[..., :-delay_samples]
 
     return signal + attenuation * delayed_signal
 
@@ -100,7 +173,8 @@ def apply_realistic_noise(signal,
                           snr_db=20,
                           impulse_prob=0.005,
                           multipath_delay=15,
-                          multipath_attenuation=0.2):
+                          multipath_attenuation=0.2,
+                          rng=None):
     """
     Apply combined noise effects.
 
@@ -110,10 +184,140 @@ def apply_realistic_noise(signal,
         Distorted signal
     """
 
-    noisy = add_awgn(signal, snr_db)
-    noisy = add_impulse_noise(noisy, impulse_prob)
+    noisy = add_awgn(signal, snr_db, rng=rng)
+    noisy = add_impulse_noise(noisy, impulse_prob, rng=rng)
     noisy = add_multipath(noisy,
                           delay_samples=multipath_delay,
                           attenuation=multipath_attenuation)
 
     return noisy
+
+
+# -------------------------------------------------------
+# Seeded Noise Generator
+# -------------------------------------------------------
+
+class NoiseGenerator:
+    """
+    Reproducible, batched noise source.
+
+    Wraps a numpy.random.Generator seeded from a SeedSequence.
+    Passing the same (seed, stream) pair always reproduces the same
+    noise, and different streams are statistically independent, so
+    each worker process can be given its own stream.
+
+    Parameters
+    ----------
+    seed : int (optional)
+        Root seed; None draws fresh OS entropy
+    stream : int (optional)
+        Independent stream index (e.g. worker id)
+    """
+
+    def __init__(self, seed=None, stream=None):
+        if stream is None:
+            sequence = np.random.SeedSequence(seed)
+        else:
+            sequence = np.random.SeedSequence(seed, spawn_key=(stream,))
+
+        self._init_from_sequence(sequence)
+
+    def _init_from_sequence(self, sequence):
+        self.seed_sequence = sequence
+        self.rng = np.random.default_rng(sequence)
+
+    @classmethod
+    def from_seed_sequence(cls, sequence):
+        """Create a generator from an existing SeedSequence."""
+        generator = cls.__new__(cls)
+        generator._init_from_sequence(sequence)
+        return generator
+
+    def spawn(self, n):
+        """
+        Create n independent child generators.
+
+        Returns
+        -------
+        list of NoiseGenerator
+        """
+        return [
+            NoiseGenerator.from_seed_sequence(child)
+            for child in self.seed_sequence.spawn(n)
+        ]
+
+    # --------------------------------------------------
+    # Noise Components
+    # --------------------------------------------------
+
+    def awgn(self, signal, snr_db):
+        return add_awgn(signal, snr_db, rng=self.rng)
+
+    def impulse(self, signal, probability=0.01, amplitude_factor=2.0,
+                backend=None):
+        return add_impulse_noise(signal, probability, amplitude_factor,
+                                 rng=self.rng, backend=backend)
+
+    def multipath(self, signal, delay_samples=20, attenuation=0.3):
+        return add_multipath(signal, delay_samples, attenuation)
+
+    def realistic(self, signal, snr_db=20, impulse_prob=0.005,
+                  multipath_delay=15, multipath_attenuation=0.2):
+        return apply_realistic_noise(signal, snr_db, impulse_prob,
+                                     multipath_delay, multipath_attenuation,
+                                     rng=self.rng)
+
+    # --------------------------------------------------
+    # Chunked Realizations
+    # --------------------------------------------------
+
+    def realizations(self, clean_signal, n_realizations, chunk_size=4096,
+                     snr_db=20, impulse_prob=0.005, multipath_delay=15,
+                     multipath_attenuation=0.2):
+        """
+        Generate noisy copies of one clean trace on the fly.
+
+        Equivalent to apply_realistic_noise applied independently to
+        each copy, but every chunk is produced with a handful of
+        whole-array operations.
+
+        Parameters
+        ----------
+        clean_signal : ndarray (nt,)
+        n_realizations : int
+            Total number of noisy traces
+        chunk_size : int
+            Traces per yielded chunk
+
+        Yields
+        ------
+        ndarray (<= chunk_size, nt)
+        """
+        if snr_db <= 0:
+            raise ValueError("SNR must be positive.")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive.")
+
+        clean = np.asarray(clean_signal, dtype=float)
+        noise_std = np.sqrt(np.mean(clean ** 2) / 10 ** (snr_db / 10))
+
+        remaining = int(n_realizations)
+
+        while remaining > 0:
+            m = min(chunk_size, remaining)
+            remaining -= m
+
+            chunk = self.rng.standard_normal((m, clean.shape[-1]))
+            chunk *= noise_std
+            chunk += clean
+
+            chunk = self.impulse(chunk, impulse_prob)
+
+            if 0 < multipath_delay < chunk.shape[-1]:
+                chunk[:, multipath_delay:] += (
+                    multipath_attenuation * chunk[:, :-multipath_delay]
+                )
+            elif multipath_delay == 0:
+                chunk *= 1 + multipath_attenuation
+
+            yield chunk
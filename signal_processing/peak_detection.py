@@ -8,78 +8,393 @@ and concealed objects.
 
 import numpy as np
 
+from core.backends import get_kernel, jit, register
+
+
+# -------------------------------------------------------
+# Local Maxima Kernels
+# -------------------------------------------------------
+
+def _local_maxima_numpy(amp, threshold_ratio, mask):
+    """
+    Mark samples of each row of amp that exceed both neighbours and
+    threshold_ratio times the row maximum (mask updated in place).
+    """
+    threshold = threshold_ratio * np.max(amp, axis=-1, keepdims=True)
+
+    centre = amp[:, 1:-1]
+    mask[:, 1:-1] = (
+        (centre > threshold)
+        & (centre > amp[:, :-2])
+        & (centre > amp[:, 2:])
+    )
+
+
+def _local_maxima_loop(amp, threshold_ratio, mask):
+    n, m = amp.shape
+
+    for i in range(n):
+        peak = amp[i, 0]
+        for j in range(1, m):
+            if amp[i, j] > peak:
+                peak = amp[i, j]
+        threshold = threshold_ratio * peak
+
+        for j in range(1, m - 1):
+            centre = amp[i, j]
+            mask[i, j] = (centre > threshold and centre > amp[i, j - 1]
+                          and centre > amp[i, j + 1])
+
+
+_local_maxima_jit = jit(_local_maxima_loop)
+
+
+def _warmup_local_maxima():
+    _local_maxima_jit(np.ones((1, 3)), 0.5, np.zeros((1, 3), dtype=bool))
+
+
+register("local_maxima", "numpy", _local_maxima_numpy)
+register("local_maxima", "numba", _local_maxima_jit,
+         warmup=_warmup_local_maxima)
+
+
+# -------------------------------------------------------
+# Vectorized Peak Mask
+# -------------------------------------------------------
+
+def peak_mask(signal, threshold_ratio=0.2, min_distance=None,
+              prominence=None, width=None, wlen=None, backend=None):
+    """
+    Boolean mask of local maxima of |signal| above threshold.
+
+    Works along the last axis, so a whole radargram of shape
+    (n_traces, nt) is processed in one call.
+
+    Parameters
+    ----------
+    signal : ndarray (nt,) or (n_traces, nt)
+        Reflected signal(s)
+    threshold_ratio : float
+        Fraction of each trace's max amplitude to define threshold
+    min_distance : int (optional)
+        Minimum index spacing between peaks; within that spacing the
+        strongest peak is kept
+    prominence : float (optional)
+        Minimum peak prominence, as a fraction of the trace's max
+        amplitude
+    width : int (optional)
+        Minimum peak width in samples, measured at half prominence
+    wlen : int (optional)
+        Window (samples each side) used to evaluate prominence and
+        width; defaults to the full trace
+    backend : str (optional)
+        Backend of the local-maxima kernel (see core/backends.py)
+
+    Returns
+    -------
+    ndarray of bool
+        Same shape as signal
+    """
+
+    amp = np.abs(np.asarray(signal, dtype=float))
+    shape = amp.shape
+    amp = amp.reshape(-1, shape[-1])
+
+    mask = np.zeros(amp.shape, dtype=bool)
+
+    if amp.shape[-1] < 3:
+        return mask.reshape(shape)
+
+    get_kernel("local_maxima", backend)(amp, threshold_ratio, mask)
+
+    if prominence is not None or width is not None:
+        peak_max = np.max(amp, axis=-1, keepdims=True)
+        rows, cols = np.nonzero(mask)
+        prom, widths = _prominences_and_widths(amp, rows, cols, wlen)
+
+        keep = np.ones(rows.shape, dtype=bool)
+        if prominence is not None:
+            keep &= prom >= prominence * peak_max[rows, 0]
+        if width is not None:
+            keep &= widths >= width
+
+        mask[rows[~keep], cols[~keep]] = False
+
+    if min_distance is not None and min_distance > 1:
+        mask = _suppress_close_peaks(amp, mask, int(min_distance))
+
+    return mask.reshape(shape)
+
+
+# Initial half-window of the prominence search and the largest gathered
+# window block (elements) processed at once
+PROMINENCE_WINDOW = 64
+PROMINENCE_BLOCK = 1 << 20
+
+
+def _prominences_and_widths(amp, rows, cols, wlen=None):
+    """
+    Prominence and half-prominence width of each peak.
+
+    Each peak looks at most wlen samples to either side.  Windows are
+    gathered for many peaks at once, starting small and doubling only
+    for the peaks whose base or half-prominence crossing lies further
+    out, in blocks of at most PROMINENCE_BLOCK samples.  Memory is
+    therefore bounded, not peaks x trace length, and the result equals
+    a single pass with the full window.
+    """
+    nt = amp.shape[-1]
+    wlen = nt if wlen is None else max(int(wlen), 1)
+
+    prom = np.empty(len(rows))
+    widths = np.empty(len(rows), dtype=int)
+
+    pending = np.arange(len(rows))
+    window = min(PROMINENCE_WINDOW, wlen)
+
+    while pending.size:
+        block = max(PROMINENCE_BLOCK // (2 * window), 1)
+        unresolved = []
+
+        for start in range(0, pending.size, block):
+            chosen = pending[start:start + block]
+            p, w, done = _window_pass(amp, rows[chosen], cols[chosen],
+                                      window, wlen)
+            prom[chosen[done]] = p[done]
+            widths[chosen[done]] = w[done]
+            unresolved.append(chosen[~done])
+
+        pending = np.concatenate(unresolved)
+        window = min(2 * window, wlen)
+
+    return prom, widths
+
+
+def _window_pass(amp, rows, cols, window, wlen):
+    """
+    Prominences and widths from windows of `window` samples per side.
+
+    Returns the values and a mask of peaks whose result is final: the
+    window held both bases and half-prominence crossings, reached the
+    trace edge, or is the full wlen.
+    """
+    nt = amp.shape[-1]
+    final = window >= wlen
+    offsets = np.arange(1, window + 1)
+    r = rows[:, None]
+
+    def gather(index):
+        # Samples beyond the trace edges act as higher samples
+        inside = (index >= 0) & (index < nt)
+        values = amp[r, np.clip(index, 0, nt - 1)]
+        values[~inside] = np.inf
+        return values
+
+    left = gather(cols[:, None] - offsets)
+    right = gather(cols[:, None] + offsets)
+    edge_left = cols - window < 0
+    edge_right = cols + window >= nt
+
+    heights = amp[rows, cols]
+    idx = np.arange(len(rows))
+
+    def base(values):
+        higher = values > heights[:, None]
+        found = higher.any(axis=1)
+        cut = np.where(found, higher.argmax(axis=1), window)
+        running_min = np.minimum.accumulate(values, axis=1)
+        return running_min[idx, cut - 1], found
+
+    base_left, found_left = base(left)
+    base_right, found_right = base(right)
+    prom = heights - np.maximum(base_left, base_right)
+
+    reference = (heights - prom / 2)[:, None]
+
+    def extent(values, edge):
+        below = values < reference
+        found = below.any(axis=1)
+        return (np.where(found, below.argmax(axis=1), wlen),
+                found | edge)
+
+    extent_left, crossed_left = extent(left, edge_left)
+    extent_right, crossed_right = extent(right, edge_right)
+
+    done = final | (found_left & found_right & crossed_left & crossed_right)
+
+    return prom, extent_left + extent_right + 1, done
+
+
+def _suppress_close_peaks(amp, mask, min_distance):
+    """
+    Keep the strongest peak within every min_distance neighbourhood.
+
+    Equivalent to greedily accepting peaks in order of decreasing
+    amplitude: each pass accepts every candidate that dominates its
+    undecided neighbours, then discards candidates close to them.
+    Works on the flat candidate list, comparing each peak with its
+    k-th neighbour for all peaks at once.
+    """
+
+    rows, cols = np.nonzero(mask)
+    heights = amp[rows, cols]
+    n = len(rows)
+
+    # (k, close) for every neighbour offset that can fall within range
+    neighbours = []
+    for k in range(1, min_distance):
+        close = (rows[k:] == rows[:-k]) & (cols[k:] - cols[:-k] < min_distance)
+        if not close.any():
+            break
+        neighbours.append((k, close))
+
+    kept = np.zeros(n, dtype=bool)
+    undecided = np.ones(n, dtype=bool)
+
+    while undecided.any():
+        dominated = np.zeros(n, dtype=bool)
+        for k, close in neighbours:
+            # Stronger (or equal, earlier) undecided peak on the left
+            dominated[k:] |= (
+                close & undecided[:-k] & (heights[:-k] >= heights[k:])
+            )
+            # Strictly stronger undecided peak on the right
+            dominated[:-k] |= (
+                close & undecided[k:] & (heights[k:] > heights[:-k])
+            )
+
+        winners = undecided & ~dominated
+        kept |= winners
+        undecided &= ~winners
+
+        for k, close in neighbours:
+            undecided[k:] &= ~(close & winners[:-k])
+            undecided[:-k] &= ~(close & winners[k:])
+
+    result = np.zeros_like(mask)
+    result[rows[kept], cols[kept]] = True
+    return result
+
+
+def _mask_to_indices(mask):
+    if mask.ndim == 1:
+        return np.flatnonzero(mask).tolist()
+
+    mask = mask.reshape(-1, mask.shape[-1])
+    rows, cols = np.nonzero(mask)
+    return np.split(cols, np.searchsorted(rows, np.arange(1, len(mask))))
+
 
 # -------------------------------------------------------
 # Basic Peak Detection
 # -------------------------------------------------------
 
-def detect_peaks(signal, threshold_ratio=0.2):
+def detect_peaks(signal, threshold_ratio=0.2, prominence=None,
+                 width=None, wlen=None, backend=None):
     """
     Detect local maxima above threshold.
 
     Parameters
     ----------
-    signal : ndarray
+    signal : ndarray (nt,) or (n_traces, nt)
         Reflected signal array
     threshold_ratio : float
         Fraction of max amplitude to define threshold
+    prominence, width, wlen
+        Optional shape criteria, see peak_mask()
+    backend : str (optional)
+        Kernel backend, see peak_mask()
 
     Returns
     -------
     list
-        Indices of detected peaks
+        Indices of detected peaks (one int array per trace for 2D
+        input)
     """
 
-    if len(signal) < 3:
-        return []
-
-    threshold = threshold_ratio * np.max(np.abs(signal))
-    peaks = []
+    signal = np.asarray(signal)
 
-    for i in range(1, len(signal) - 1):
-        if (
-            abs(signal[i]) > threshold
-            and abs(signal[i]) > abs(signal[i - 1])
-            and abs(signal[i]) > abs(signal[i + 1])
-        ):
-            peaks.append(i)
+    if signal.shape[-1] < 3:
+        return [] if signal.ndim == 1 else [
+            np.zeros(0, dtype=int) for _ in range(len(signal))
+        ]
 
-    return peaks
+    return _mask_to_indices(
+        peak_mask(signal, threshold_ratio,
+                  prominence=prominence, width=width, wlen=wlen,
+                  backend=backend)
+    )
 
 
 # -------------------------------------------------------
 # Peak Detection with Minimum Distance
 # -------------------------------------------------------
 
-def detect_peaks_with_distance(signal, threshold_ratio=0.2, min_distance=10):
+def detect_peaks_with_distance(signal, threshold_ratio=0.2, min_distance=10,
+                               prominence=None, width=None, wlen=None):
     """
     Detect peaks while enforcing minimum separation.
 
+    When two candidates are closer than min_distance the stronger
+    one is kept.
+
     Parameters
     ----------
-    signal : ndarray
+    signal : ndarray (nt,) or (n_traces, nt)
     threshold_ratio : float
     min_distance : int
         Minimum index spacing between peaks
+    prominence, width, wlen
+        Optional shape criteria, see peak_mask()
 
     Returns
     -------
     list
-        Peak indices
+        Peak indices (one int array per trace for 2D input)
     """
 
-    candidate_peaks = detect_peaks(signal, threshold_ratio)
+    signal = np.asarray(signal)
+
+    if signal.shape[-1] < 3:
+        return detect_peaks(signal, threshold_ratio)
+
+    return _mask_to_indices(
+        peak_mask(signal, threshold_ratio, min_distance=min_distance,
+                  prominence=prominence, width=width, wlen=wlen)
+    )
 
-    if not candidate_peaks:
-        return []
 
-    filtered_peaks = [candidate_peaks[0]]
+# -------------------------------------------------------
+# Pick Array
+# -------------------------------------------------------
+
+def pad_peak_indices(peaks, fill=-1):
+    """
+    Stack per-trace peak lists into a rectangular pick array.
+
+    Parameters
+    ----------
+    peaks : list of array_like
+        e.g. output of detect_peaks on a radargram
+    fill : int
+        Value for missing picks
+
+    Returns
+    -------
+    ndarray (n_traces, max_peaks)
+    """
+
+    counts = np.array([len(p) for p in peaks], dtype=int)
+    picks = np.full((len(peaks), counts.max(initial=0)), fill, dtype=int)
 
-    for idx in candidate_peaks[1:]:
-        if idx - filtered_peaks[-1] >= min_distance:
-            filtered_peaks.append(idx)
+    if counts.sum():
+        rows = np.repeat(np.arange(len(peaks)), counts)
+        cols = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        picks[rows, cols] = np.concatenate([np.asarray(p) for p in peaks])
 
-    return filtered_peaks
+    return picks
 
 
 # -------------------------------------------------------
@@ -0,0 +1,418 @@
+"""
+signal_processing/pipeline.py
+
+Standard GPR processing flow built from composable stages.
+
+Every stage transforms chunks of a (n_traces, nt) radargram with
+whole-array NumPy operations.  Stages are chained lazily as
+generators, so a survey streams through the pipeline one chunk at a
+time and memory stays bounded by the chunk size.  Each stage keeps
+its own timing counters.
+
+Stages may modify the chunks they receive in place; iter_chunks()
+hands out private float64 copies of the source data.
+"""
+
+import time
+
+import numpy as np
+
+
+# -------------------------------------------------------
+# Chunk Source
+# -------------------------------------------------------
+
+def iter_chunks(radargram, chunk_size=1024):
+    """
+    Iterate over a radargram (array or memmap) in blocks of traces.
+
+    Yields
+    ------
+    ndarray (<= chunk_size, nt)
+        float64 copy of the block
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+
+    radargram = np.atleast_2d(radargram)
+
+    for start in range(0, len(radargram), chunk_size):
+        yield np.array(radargram[start:start + chunk_size], dtype=float)
+
+
+# -------------------------------------------------------
+# Stage Base Class
+# -------------------------------------------------------
+
+class Stage:
+    """
+    Base class for processing stages.
+
+    Subclasses implement process(chunk) -> chunk.
+    """
+
+    name = "stage"
+
+    def __init__(self):
+        self.reset_timing()
+
+    def process(self, chunk):
+        raise NotImplementedError("Stage must implement process().")
+
+    def __call__(self, chunks):
+        """Apply the stage lazily to an iterable of chunks."""
+        for chunk in chunks:
+            start = time.perf_counter()
+            out = self.process(chunk)
+            self.elapsed += time.perf_counter() - start
+            self.n_chunks += 1
+            self.n_traces += len(out)
+            yield out
+
+    def reset_timing(self):
+        self.elapsed = 0.0
+        self.n_chunks = 0
+        self.n_traces = 0
+
+    @property
+    def timing(self):
+        """Accumulated timing for this stage."""
+        return {
+            "stage": self.name,
+            "seconds": self.elapsed,
+            "chunks": self.n_chunks,
+            "traces": self.n_traces,
+            "traces_per_s": (
+                self.n_traces / self.elapsed if self.elapsed else 0.0
+            ),
+        }
+
+
+def _moving_average(data, window):
+    """Centered moving average along the last axis."""
+    nt = data.shape[-1]
+    half = window // 2
+
+    cumsum = np.zeros(data.shape[:-1] + (nt + 1,))
+    np.cumsum(data, axis=-1, out=cumsum[..., 1:])
+
+    lo = np.clip(np.arange(nt) - half, 0, nt)
+    hi = np.clip(np.arange(nt) + window - half, 0, nt)
+
+    return (cumsum[..., hi] - cumsum[..., lo]) / (hi - lo)
+
+
+# -------------------------------------------------------
+# Dewow
+# -------------------------------------------------------
+
+class Dewow(Stage):
+    """
+    Remove low-frequency "wow" by subtracting a running mean.
+
+    Parameters
+    ----------
+    window : int
+        Running-mean window (samples)
+    """
+
+    name = "dewow"
+
+    def __init__(self, window=31):
+        if window <= 0:
+            raise ValueError("window must be positive.")
+        super().__init__()
+        self.window = int(window)
+
+    def process(self, chunk):
+        chunk -= _moving_average(chunk, self.window)
+        return chunk
+
+
+# -------------------------------------------------------
+# Time-Zero Correction
+# -------------------------------------------------------
+
+class TimeZeroCorrection(Stage):
+    """
+    Shift traces so that time zero lands on a common sample.
+
+    Either a fixed shift is removed from every trace, or the first
+    break (first sample above threshold_ratio of the trace maximum)
+    is picked per trace and moved to sample `target`.
+
+    Parameters
+    ----------
+    shift : int (optional)
+        Fixed number of leading samples to remove
+    threshold_ratio : float (optional)
+        First-break threshold for automatic picking
+    target : int
+        Output sample of the first break (automatic mode)
+    """
+
+    name = "time_zero"
+
+    def __init__(self, shift=None, threshold_ratio=None, target=0):
+        if (shift is None) == (threshold_ratio is None):
+            raise ValueError("Give exactly one of shift or threshold_ratio.")
+        super().__init__()
+        self.shift = shift
+        self.threshold_ratio = threshold_ratio
+        self.target = int(target)
+
+    def process(self, chunk):
+        nt = chunk.shape[-1]
+
+        if self.shift is not None:
+            shifts = np.full((len(chunk), 1), int(self.shift))
+        else:
+            amp = np.abs(chunk)
+            above = amp > self.threshold_ratio * amp.max(axis=1,
+                                                           keepdims=True)
+            shifts = above.argmax(axis=1)[:, None] - self.target
+
+        source = np.arange(nt)[None, :] + shifts
+        valid = (source >= 0) & (source < nt)
+
+        out = np.take_along_axis(chunk, np.clip(source, 0, nt - 1), axis=1)
+        out[~valid] = 0.0
+        return out
+
+
+# -------------------------------------------------------
+# Background Removal
+# -------------------------------------------------------
+
+class BackgroundRemoval(Stage):
+    """
+    Subtract the mean trace to suppress horizontal banding.
+
+    Parameters
+    ----------
+    window : int (optional)
+        Number of preceding traces in the running mean (the window
+        spans chunk boundaries); None uses the mean of each chunk
+    """
+
+    name = "background_removal"
+
+    def __init__(self, window=None):
+        if window is not None and window <= 0:
+            raise ValueError("window must be positive.")
+        super().__init__()
+        self.window = window
+        self._history = None
+
+    def process(self, chunk):
+        if self.window is None:
+            chunk -= chunk.mean(axis=0, keepdims=True)
+            return chunk
+
+        history = self._history
+        if history is None:
+            history = np.zeros((0, chunk.shape[1]))
+
+        data = np.concatenate((history, chunk))
+        n_prev = len(history)
+
+        cumsum = np.zeros((len(data) + 1, data.shape[1]))
+        np.cumsum(data, axis=0, out=cumsum[1:])
+
+        hi = np.arange(n_prev, len(data)) + 1
+        lo = np.maximum(hi - self.window, 0)
+
+        background = (cumsum[hi] - cumsum[lo]) / (hi - lo)[:, None]
+
+        self._history = data[-(self.window - 1):] if self.window > 1 \
+            else data[:0]
+
+        chunk -= background
+        return chunk
+
+
+# -------------------------------------------------------
+# Gain
+# -------------------------------------------------------
+
+class SECGain(Stage):
+    """
+    Spreading and exponential compensation gain.
+
+    g(t) = (t / dt) ** power * exp(alpha * t)
+
+    Parameters
+    ----------
+    dt : float
+        Sample interval (s)
+    alpha : float
+        Exponential gain (1/s)
+    power : float
+        Spreading exponent
+    max_gain : float (optional)
+        Upper clip for the gain
+    """
+
+    name = "sec_gain"
+
+    def __init__(self, dt, alpha=0.0, power=1.0, max_gain=None):
+        super().__init__()
+        self.dt = dt
+        self.alpha = alpha
+        self.power = power
+        self.max_gain = max_gain
+        self._gain = None
+
+    def gain(self, nt):
+        if self._gain is None or len(self._gain) != nt:
+            t = np.arange(nt) * self.dt
+            gain = np.arange(nt, dtype=float) ** self.power
+            gain *= np.exp(self.alpha * t)
+            gain[0] = gain[1] if nt > 1 else 1.0
+            if self.max_gain is not None:
+                np.minimum(gain, self.max_gain, out=gain)
+            self._gain = gain
+        return self._gain
+
+    def process(self, chunk):
+        chunk *= self.gain(chunk.shape[-1])
+        return chunk
+
+
+class AGCGain(Stage):
+    """
+    Automatic gain control: normalize by the running RMS amplitude.
+
+    Parameters
+    ----------
+    window : int
+        RMS window (samples)
+    eps : float
+        Stabilizer relative to each trace's overall RMS
+    """
+
+    name = "agc_gain"
+
+    def __init__(self, window=64, eps=1e-3):
+        if window <= 0:
+            raise ValueError("window must be positive.")
+        super().__init__()
+        self.window = int(window)
+        self.eps = eps
+
+    def process(self, chunk):
+        power = _moving_average(chunk ** 2, self.window)
+        floor = self.eps * np.sqrt(np.mean(chunk ** 2, axis=1,
+                                           keepdims=True))
+        chunk /= np.sqrt(power) + floor + np.finfo(float).tiny
+        return chunk
+
+
+# -------------------------------------------------------
+# Bandpass
+# -------------------------------------------------------
+
+class Bandpass(Stage):
+    """
+    Zero-phase FFT bandpass with cosine tapers.
+
+    Parameters
+    ----------
+    dt : float
+        Sample interval (s)
+    low, high : float
+        Pass band edges (Hz)
+    taper : float
+        Taper width as a fraction of each edge frequency
+    """
+
+    name = "bandpass"
+
+    def __init__(self, dt, low, high, taper=0.2):
+        if not 0 <= low < high:
+            raise ValueError("Require 0 <= low < high.")
+        super().__init__()
+        self.dt = dt
+        self.low = low
+        self.high = high
+        self.taper = taper
+        self._response = {}
+
+    def response(self, nt):
+        if nt not in self._response:
+            f = np.fft.rfftfreq(nt, self.dt)
+            response = np.zeros_like(f)
+
+            low_edge = self.low * (1 - self.taper)
+            high_edge = self.high * (1 + self.taper)
+
+            response[(f >= self.low) & (f <= self.high)] = 1.0
+
+            rise = (f >= low_edge) & (f < self.low)
+            response[rise] = 0.5 - 0.5 * np.cos(
+                np.pi * (f[rise] - low_edge) / (self.low - low_edge))
+
+            fall = (f > self.high) & (f <= high_edge)
+            response[fall] = 0.5 + 0.5 * np.cos(
+                np.pi * (f[fall] - self.high) / (high_edge - self.high))
+
+            self._response[nt] = response
+
+        return self._response[nt]
+
+    def process(self, chunk):
+        nt = chunk.shape[-1]
+        spectrum = np.fft.rfft(chunk, axis=-1)
+        spectrum *= self.response(nt)
+        return np.fft.irfft(spectrum, nt, axis=-1)
+
+
+# -------------------------------------------------------
+# Pipeline
+# -------------------------------------------------------
+
+class Pipeline:
+    """
+    Lazy chain of processing stages.
+
+    Parameters
+    ----------
+    stages : list of Stage
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+
+    def run(self, chunks):
+        """
+        Chain all stages over an iterable of chunks.
+
+        Returns
+        -------
+        generator of ndarray
+        """
+        stream = iter(chunks)
+        for stage in self.stages:
+            stream = stage(stream)
+        return stream
+
+    def process(self, radargram, chunk_size=1024):
+        """
+        Process an in-memory or memory-mapped radargram.
+
+        Returns
+        -------
+        ndarray (n_traces, nt)
+        """
+        chunks = list(self.run(iter_chunks(radargram, chunk_size)))
+        if not chunks:
+            return np.zeros((0, np.shape(radargram)[-1]))
+        return np.concatenate(chunks)
+
+    def reset_timing(self):
+        for stage in self.stages:
+            stage.reset_timing()
+
+    def timings(self):
+        """Per-stage timing dictionaries."""
+        return [stage.timing for stage in self.stages]
@@ -0,0 +1,544 @@
+"""
+signal_processing/segy.py
+
+SEG-Y (rev 1) export and import for radargrams.
+
+Traces are written as IEEE float32 (format code 5, big-endian).
+Both directions work on whole blocks of traces through NumPy
+structured views, so arbitrarily large surveys are streamed with
+bounded memory.
+"""
+
+import os
+import re
+
+import numpy as np
+
+
+TEXT_HEADER_SIZE = 3200
+BINARY_HEADER_SIZE = 400
+TRACE_HEADER_SIZE = 240
+
+SEGY_REVISION_1 = 0x0100
+
+# Sample interval units tried when encoding dt into the 16-bit
+# header field.  SEG-Y specifies microseconds, which is far too coarse
+# for GPR sampling, so finer units are used (and recorded in the
+# textual header) whenever dt is not a whole number of microseconds.
+_TIME_UNITS = (
+    ("us", 1e-6),
+    ("ns", 1e-9),
+    ("ps", 1e-12),
+    ("fs", 1e-15),
+)
+
+_MAX_INTERVAL = 32767
+
+# format code -> (sample dtype, bytes per sample)
+_SAMPLE_FORMATS = {
+    1: ("u4", 4),   # IBM float (converted on read)
+    2: ("i4", 4),
+    3: ("i2", 2),
+    5: ("f4", 4),
+    8: ("i1", 1),
+}
+
+
+# -------------------------------------------------------
+# Header Layouts
+# -------------------------------------------------------
+
+def _binary_header_dtype(order):
+    return np.dtype({
+        "names": ["job_id", "line_number", "reel_number",
+                  "traces_per_ensemble", "aux_traces_per_ensemble",
+                  "sample_interval", "sample_interval_orig",
+                  "samples_per_trace", "samples_per_trace_orig",
+                  "format_code", "ensemble_fold", "sorting_code",
+                  "measurement_system", "revision",
+                  "fixed_length_flag", "n_extended_headers"],
+        "formats": [order + "i4", order + "i4", order + "i4",
+                    order + "i2", order + "i2",
+                    order + "i2", order + "i2",
+                    order + "u2", order + "u2",
+                    order + "i2", order + "i2", order + "i2",
+                    order + "i2", order + "u2",
+                    order + "i2", order + "i2"],
+        "offsets": [0, 4, 8, 12, 14, 16, 18, 20, 22, 24, 26, 28,
+                    54, 300, 302, 304],
+        "itemsize": BINARY_HEADER_SIZE,
+    })
+
+
+def _trace_header_dtype(order):
+    return np.dtype({
+        "names": ["trace_seq_line", "trace_seq_file",
+                  "field_record", "trace_number", "trace_id_code",
+                  "coordinate_scalar", "source_x", "source_y",
+                  "group_x", "group_y", "coordinate_units",
+                  "n_samples", "sample_interval", "cdp_x", "cdp_y"],
+        "formats": [order + "i4", order + "i4",
+                    order + "i4", order + "i4", order + "i2",
+                    order + "i2", order + "i4", order + "i4",
+                    order + "i4", order + "i4", order + "i2",
+                    order + "u2", order + "i2", order + "i4",
+                    order + "i4"],
+        "offsets": [0, 4, 8, 12, 28, 70, 72, 76, 80, 84, 88,
+                    114, 116, 180, 184],
+        "itemsize": TRACE_HEADER_SIZE,
+    })
+
+
+def _trace_record_dtype(order, sample_type, nt):
+    return np.dtype([
+        ("header", _trace_header_dtype(order)),
+        ("data", order + sample_type, (nt,)),
+    ])
+
+
+# Positions are stored in millimetres (coordinate scalar -1000).
+_COORDINATE_SCALAR = -1000
+
+
+# -------------------------------------------------------
+# Sample Interval Encoding
+# -------------------------------------------------------
+
+def encode_sample_interval(dt):
+    """
+    Choose a header unit for dt.
+
+    Parameters
+    ----------
+    dt : float
+        Sample interval (s)
+
+    Returns
+    -------
+    value : int
+        Integer sample interval for the 16-bit header field
+    unit : str
+        Unit of value ("us", "ns", "ps" or "fs")
+    """
+    if dt <= 0:
+        raise ValueError("dt must be positive.")
+
+    micro = dt / 1e-6
+    if round(micro) >= 1 and abs(round(micro) - micro) <= 1e-9 * micro:
+        if round(micro) <= _MAX_INTERVAL:
+            return int(round(micro)), "us"
+
+    best = None
+    for unit, scale in _TIME_UNITS:
+        value = int(round(dt / scale))
+        if 1 <= value <= _MAX_INTERVAL:
+            best = (value, unit)
+
+    if best is None:
+        raise ValueError("dt cannot be represented in a SEG-Y header.")
+
+    return best
+
+
+def _decode_sample_interval(value, unit):
+    return value * dict(_TIME_UNITS)[unit]
+
+
+def _encodes_to(dt, value, unit):
+    try:
+        return dt > 0 and encode_sample_interval(dt) == (value, unit)
+    except ValueError:
+        return False
+
+
+# -------------------------------------------------------
+# Textual Header
+# -------------------------------------------------------
+
+def _build_text_header(dt, unit, text=None):
+    lines = [
+        "EMSCOPE RADARGRAM",
+        "SEG-Y REV1 IEEE FLOAT32 BIG-ENDIAN",
+        f"SAMPLE INTERVAL {dt!r} S",
+        f"HEADER SAMPLE INTERVAL UNIT {unit.upper()}",
+        "TRACE POSITIONS IN SOURCE/GROUP/CDP X, SCALAR -1000",
+    ]
+    if text:
+        lines.extend(text)
+
+    if len(lines) > 39:
+        raise ValueError("Too many textual header lines.")
+
+    lines += [""] * (39 - len(lines))
+    lines.append("END EBCDIC")
+
+    card = "".join(
+        f"C{i + 1:2d} {line}"[:80].ljust(80)
+        for i, line in enumerate(lines)
+    )
+    return card.encode("cp500")
+
+
+# Whole cards written by _build_text_header(); field headers use
+# similar wording (e.g. "C 6 SAMPLE INTERVAL 4000 SAMPLES/TRACE 1501")
+_TEXT_DT = re.compile(r"^C\s*\d+\s+SAMPLE INTERVAL\s+([0-9.eE+-]+)\s+S\s*$")
+_TEXT_UNIT = re.compile(
+    r"^C\s*\d+\s+HEADER SAMPLE INTERVAL UNIT\s+(US|NS|PS|FS)\s*$")
+
+
+def _parse_text_header(raw):
+    # ASCII textual headers are common in field data
+    encoding = "cp500" if raw[:1] == b"\xc3" else "ascii"
+    text = raw.decode(encoding, errors="replace")
+
+    dt = None
+    unit = None
+
+    for start in range(0, len(text), 80):
+        card = text[start:start + 80]
+
+        match = _TEXT_DT.match(card)
+        if match:
+            try:
+                dt = float(match.group(1))
+            except ValueError:
+                dt = None
+
+        match = _TEXT_UNIT.match(card)
+        if match:
+            unit = match.group(1).lower()
+
+    return text, dt, unit
+
+
+# -------------------------------------------------------
+# Writer
+# -------------------------------------------------------
+
+class SegyWriter:
+    """
+    Streaming SEG-Y writer.
+
+    Traces are appended in blocks with write(); headers for a block
+    are filled in one vectorized pass.
+
+    Parameters
+    ----------
+    path : str
+        Output file path
+    nt : int
+        Samples per trace
+    dt : float
+        Sample interval (s)
+    text : list of str (optional)
+        Extra lines for the textual header
+    buffer_size : int
+        File buffer size in bytes
+    """
+
+    def __init__(self, path, nt, dt, text=None, buffer_size=1 << 20):
+        if nt <= 0 or nt > 65535:
+            raise ValueError("nt must be between 1 and 65535.")
+
+        self.path = path
+        self.nt = int(nt)
+        self.dt = float(dt)
+        self.n_traces = 0
+
+        self._interval, self.time_unit = encode_sample_interval(dt)
+        self._record_dtype = _trace_record_dtype(">", "f4", self.nt)
+
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._file.write(_build_text_header(self.dt, self.time_unit, text))
+        self._write_binary_header()
+
+    def _write_binary_header(self):
+        header = np.zeros(1, dtype=_binary_header_dtype(">"))
+        header["line_number"] = 1
+        header["reel_number"] = 1
+        header["traces_per_ensemble"] = min(self.n_traces, 32767)
+        header["sample_interval"] = self._interval
+        header["sample_interval_orig"] = self._interval
+        header["samples_per_trace"] = self.nt
+        header["samples_per_trace_orig"] = self.nt
+        header["format_code"] = 5
+        header["ensemble_fold"] = 1
+        header["sorting_code"] = 1
+        header["measurement_system"] = 1
+        header["revision"] = SEGY_REVISION_1
+        header["fixed_length_flag"] = 1
+        self._file.write(header.tobytes())
+
+    def write(self, traces, positions=None):
+        """
+        Append a block of traces.
+
+        Parameters
+        ----------
+        traces : ndarray (nt,) or (n_traces, nt)
+        positions : ndarray (n_traces,) (optional)
+            Antenna positions along the line (m)
+        """
+        traces = np.atleast_2d(traces)
+
+        if traces.ndim != 2 or traces.shape[1] != self.nt:
+            raise ValueError("Trace length mismatch.")
+
+        n = traces.shape[0]
+        records = np.zeros(n, dtype=self._record_dtype)
+
+        seq = np.arange(self.n_traces + 1, self.n_traces + n + 1)
+
+        header = records["header"]
+        header["trace_seq_line"] = seq
+        header["trace_seq_file"] = seq
+        header["field_record"] = 1
+        header["trace_number"] = seq
+        header["trace_id_code"] = 1
+        header["coordinate_scalar"] = _COORDINATE_SCALAR
+        header["coordinate_units"] = 1
+        header["n_samples"] = self.nt
+        header["sample_interval"] = self._interval
+
+        if positions is not None:
+            positions = np.asarray(positions, dtype=float)
+            if positions.shape != (n,):
+                raise ValueError("positions must have one entry per trace.")
+            scaled = np.rint(positions * -_COORDINATE_SCALAR)
+            header["source_x"] = scaled
+            header["group_x"] = scaled
+            header["cdp_x"] = scaled
+
+        records["data"] = traces
+
+        records.tofile(self._file)
+        self.n_traces += n
+
+    def close(self):
+        """Finalize headers and close the file."""
+        if self._file.closed:
+            return
+
+        self._file.seek(TEXT_HEADER_SIZE)
+        self._write_binary_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# -------------------------------------------------------
+# Reader
+# -------------------------------------------------------
+
+def _ibm_to_float(words):
+    """Convert IBM System/360 floats (as uint32) to float64."""
+    words = words.astype(np.uint32, copy=False)
+    sign = np.where(words >> 31, -1.0, 1.0)
+    exponent = ((words >> 24) & 0x7F).astype(np.int64)
+    mantissa = (words & 0x00FFFFFF).astype(np.float64)
+    return sign * np.ldexp(mantissa, 4 * (exponent - 64) - 24)
+
+
+class SegyReader:
+    """
+    Memory-mapped SEG-Y reader.
+
+    The file is never loaded as a whole; read() and iter_chunks()
+    return float64 copies of the requested traces only.
+
+    Parameters
+    ----------
+    path : str
+        Input file path
+    dt : float (optional)
+        Override the sample interval stored in the file
+    """
+
+    def __init__(self, path, dt=None):
+        self.path = path
+
+        with open(path, "rb") as f:
+            raw_text = f.read(TEXT_HEADER_SIZE)
+            raw_binary = f.read(BINARY_HEADER_SIZE)
+
+        if len(raw_binary) < BINARY_HEADER_SIZE:
+            raise ValueError("File too short to be SEG-Y.")
+
+        self.text_header, text_dt, text_unit = _parse_text_header(raw_text)
+
+        self.byteorder = ">"
+        binary = np.frombuffer(raw_binary, dtype=_binary_header_dtype(">"))[0]
+        if int(binary["format_code"]) not in _SAMPLE_FORMATS:
+            binary = np.frombuffer(
+                raw_binary, dtype=_binary_header_dtype("<")
+            )[0]
+            self.byteorder = "<"
+
+        self.format_code = int(binary["format_code"])
+        if self.format_code not in _SAMPLE_FORMATS:
+            raise ValueError(
+                f"Unsupported SEG-Y format code {self.format_code}."
+            )
+
+        self.nt = int(binary["samples_per_trace"])
+        if self.nt <= 0:
+            raise ValueError("Invalid samples per trace.")
+
+        # The binary field is authoritative; the exact textual value
+        # is used when it encodes to the same field (or the field is 0)
+        interval = int(binary["sample_interval"])
+        unit = text_unit or "us"
+        if dt is not None:
+            self.dt = float(dt)
+        elif interval > 0:
+            self.dt = _decode_sample_interval(interval, unit)
+            if text_dt is not None and text_unit is not None and \
+                    _encodes_to(text_dt, interval, unit):
+                self.dt = text_dt
+        elif text_dt is not None:
+            self.dt = text_dt
+        else:
+            self.dt = 0.0
+
+        sample_type, sample_size = _SAMPLE_FORMATS[self.format_code]
+
+        n_extended = 0
+        if int(binary["revision"]) >= SEGY_REVISION_1:
+            n_extended = max(int(binary["n_extended_headers"]), 0)
+
+        self._offset = (
+            TEXT_HEADER_SIZE + BINARY_HEADER_SIZE
+            + n_extended * TEXT_HEADER_SIZE
+        )
+        trace_size = TRACE_HEADER_SIZE + self.nt * sample_size
+
+        data_bytes = os.path.getsize(path) - self._offset
+        self.n_traces = max(data_bytes, 0) // trace_size
+
+        self._records = np.memmap(
+            path,
+            dtype=_trace_record_dtype(self.byteorder, sample_type, self.nt),
+            mode="r",
+            offset=self._offset,
+            shape=(self.n_traces,),
+        ) if self.n_traces else None
+
+    def __len__(self):
+        return self.n_traces
+
+    @property
+    def headers(self):
+        """Trace headers as a structured memory-mapped view."""
+        if self._records is None:
+            return np.zeros(0, dtype=_trace_header_dtype(self.byteorder))
+        return self._records["header"]
+
+    @property
+    def positions(self):
+        """Antenna positions (m) decoded from the CDP X header."""
+        headers = self.headers
+        scalar = headers["coordinate_scalar"].astype(float)
+        x = headers["cdp_x"].astype(float)
+        factor = np.ones_like(scalar)
+        factor[scalar > 0] = scalar[scalar > 0]
+        factor[scalar < 0] = -1.0 / scalar[scalar < 0]
+        return x * factor
+
+    @property
+    def time(self):
+        """Time axis (s)."""
+        return np.arange(self.nt) * self.dt
+
+    def read(self, start=0, stop=None):
+        """
+        Read a contiguous block of traces.
+
+        Returns
+        -------
+        ndarray (n_traces, nt)
+            Native-endian float64 traces
+        """
+        if self._records is None:
+            return np.zeros((0, self.nt))
+
+        raw = self._records["data"][start:stop]
+
+        if self.format_code == 1:
+            return _ibm_to_float(raw)
+
+        return raw.astype(np.float64)
+
+    def iter_chunks(self, chunk_size=1024):
+        """
+        Iterate over the file in blocks of traces.
+
+        Yields
+        ------
+        ndarray (<= chunk_size, nt)
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive.")
+
+        for start in range(0, self.n_traces, chunk_size):
+            yield self.read(start, start + chunk_size)
+
+    def close(self):
+        """Release the memory map."""
+        self._records = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# -------------------------------------------------------
+# Convenience Functions
+# -------------------------------------------------------
+
+def write_segy(path, traces, dt, positions=None, chunk_size=4096,
+               text=None):
+    """
+    Write a single trace or a B-scan to SEG-Y.
+
+    Parameters
+    ----------
+    path : str
+    traces : ndarray (nt,) or (n_traces, nt)
+        e.g. FDTDSolver1D.reflected_signal or a stack of them
+    dt : float
+        Sample interval (s), e.g. FDTDSolver1D.dt
+    positions : ndarray (n_traces,) (optional)
+        Antenna positions (m)
+    chunk_size : int
+        Traces converted per block
+    """
+    traces = np.atleast_2d(traces)
+    n, nt = traces.shape
+
+    with SegyWriter(path, nt, dt, text=text) as writer:
+        for start in range(0, n, chunk_size):
+            stop = start + chunk_size
+            writer.write(
+                traces[start:stop],
+                None if positions is None else positions[start:stop]
+            )
+
+
+def read_segy(path, dt=None):
+    """
+    Read a whole SEG-Y file.
+
+    Returns
+    -------
+    traces : ndarray (n_traces, nt)
+    dt : float
+        Sample interval (s)
+    """
+    with SegyReader(path, dt=dt) as reader:
+        return reader.read(), reader.dt
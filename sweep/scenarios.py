@@ -0,0 +1,75 @@
+"""
+sweep/scenarios.py
+
+Sweep expansion and execution.
+
+Scenarios are core.scenario.Scenario objects: validated up front,
+with a canonical JSON form whose hash identifies the scenario in the
+work queue and names its result file, which makes re-running a sweep
+idempotent.
+"""
+
+from config.simulation_config import (
+    DEFAULT_SOURCE_POSITION,
+    GRID_PRESETS,
+    LAYER_PROFILES
+)
+from core.scenario import Scenario
+
+
+# -------------------------------------------------------
+# Sweep Expansion
+# -------------------------------------------------------
+
+def expand_sweep(presets=None, profiles=None, object_materials=(None,),
+                 frequencies=(10e9,), source_position=DEFAULT_SOURCE_POSITION,
+                 **kwargs):
+    """
+    Cartesian product of presets x profiles x materials x frequencies.
+
+    Parameters
+    ----------
+    presets, profiles : list of str (optional)
+        Default: all GRID_PRESETS / LAYER_PROFILES
+    object_materials : list
+        Object materials (None for no object)
+    frequencies : list of float
+    source_position : int
+    **kwargs
+        Further Scenario.from_presets() arguments
+
+    Returns
+    -------
+    list of Scenario
+    """
+    presets = list(GRID_PRESETS) if presets is None else presets
+    profiles = list(LAYER_PROFILES) if profiles is None else profiles
+
+    return [
+        Scenario.from_presets(preset, profile, material,
+                              frequency=frequency,
+                              source_position=source_position, **kwargs)
+        for preset in presets
+        for profile in profiles
+        for material in object_materials
+        for frequency in frequencies
+    ]
+
+
+# -------------------------------------------------------
+# Execution
+# -------------------------------------------------------
+
+def run_scenario(scenario, backend=None):
+    """
+    Simulate one scenario.
+
+    Returns
+    -------
+    dict
+        "trace" (nt,) recorded signal and "dt" time step (s)
+    """
+    solver = scenario.create_solver(backend=backend)
+    trace = solver.run(scenario.source_signal())
+
+    return {"trace": trace, "dt": solver.dt}
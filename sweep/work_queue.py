@@ -0,0 +1,394 @@
+"""
+sweep/work_queue.py
+
+SQLite work queue for sweeps spread over several processes or nodes.
+
+The coordinator submits scenarios in chunks.  Workers claim a whole
+chunk under a lease (owner + expiry time) inside an IMMEDIATE
+transaction, so two workers never hold the same chunk, and renew the
+lease after every scenario.  A worker that dies simply stops renewing:
+once the lease expires the chunk is claimed again, up to
+max_attempts times, after which it is marked failed.  Failed chunks
+are given a fresh set of attempts when one of their unfinished
+scenarios is submitted again (or by requeue_failed()), so a sweep can
+be re-run after a fix.
+
+Each finished scenario is written to its own result file (named by
+the scenario hash) through a temporary file and os.replace, so a
+result is either complete or absent.  Scenarios are keyed by hash:
+submitting a scenario that is already pending, leased or done is a
+no-op, and a retried chunk skips scenarios whose results already exist.
+
+The database and the results directory may live on a shared
+filesystem, provided it supports SQLite's file locking.  The default
+rollback journal works there; WAL mode (wal=True) is faster under
+many workers but keeps its index in shared memory, so it is only safe
+when every worker runs on the same host.  The journal mode is stored
+in the database file, so it only needs to be chosen once (when the
+queue is created).
+"""
+
+import io
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+import numpy as np
+
+from core.scenario import Scenario
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_expires REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    hash TEXT PRIMARY KEY,
+    chunk INTEGER NOT NULL REFERENCES chunks(id),
+    scenario TEXT NOT NULL,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS scenarios_chunk ON scenarios(chunk);
+"""
+
+CHUNK_STATES = ("pending", "leased", "done", "failed")
+
+
+# -------------------------------------------------------
+# Atomic Result Files
+# -------------------------------------------------------
+
+def write_result(path, **arrays):
+    """
+    Write an .npz file atomically (temporary file + os.replace).
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+
+    temporary = os.path.join(
+        directory, f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temporary, "wb") as f:
+            f.write(buffer.getvalue())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+# -------------------------------------------------------
+# Work Queue
+# -------------------------------------------------------
+
+class WorkQueue:
+    """
+    Chunked scenario queue backed by an SQLite file.
+
+    Parameters
+    ----------
+    path : str
+        Database file (created if missing)
+    results_dir : str (optional)
+        Result files directory (default: "<path without ext>_results")
+    lease_seconds : float
+        Lease duration; a chunk whose lease is not renewed within this
+        time is handed to another worker
+    max_attempts : int
+        Claims allowed per chunk before it is marked failed
+    wal : bool
+        Switch the database to WAL mode (single host only)
+    """
+
+    def __init__(self, path, results_dir=None, lease_seconds=60.0,
+                 max_attempts=3, wal=False):
+        self.path = path
+        self.results_dir = results_dir or \
+            os.path.splitext(path)[0] + "_results"
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = int(max_attempts)
+
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        if wal:
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _transaction(self):
+        """Write transaction taken immediately (serializes claims)."""
+        return _Transaction(self._db)
+
+    # --------------------------------------------------
+    # Coordinator
+    # --------------------------------------------------
+
+    def submit(self, scenarios, chunk_size=8):
+        """
+        Enqueue scenarios not already in the queue.
+
+        Scenarios already queued in a failed chunk and still without a
+        result requeue that chunk (see requeue_failed()).
+
+        Parameters
+        ----------
+        scenarios : iterable of Scenario or dict
+            Dicts are validated (core.scenario.Scenario.from_dict)
+            before anything is queued
+        chunk_size : int
+
+        Returns
+        -------
+        int
+            Number of newly queued or requeued scenarios
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive.")
+
+        unique = {}
+        for scenario in scenarios:
+            if not isinstance(scenario, Scenario):
+                scenario = Scenario.from_dict(scenario)
+            unique.setdefault(scenario.hash, scenario)
+
+        with self._transaction() as db:
+            known = {
+                row[0] for row in db.execute("SELECT hash FROM scenarios")
+            }
+            new = [(h, s) for h, s in unique.items() if h not in known]
+            requeued = _requeue(db, [h for h in unique if h in known])
+
+            for start in range(0, len(new), chunk_size):
+                chunk = db.execute("INSERT INTO chunks DEFAULT VALUES")
+                db.executemany(
+                    "INSERT INTO scenarios (hash, chunk, scenario) "
+                    "VALUES (?, ?, ?)",
+                    [(h, chunk.lastrowid, json.dumps(s.to_dict()))
+                     for h, s in new[start:start + chunk_size]]
+                )
+
+        return len(new) + requeued
+
+    def requeue_failed(self):
+        """
+        Make every failed chunk pending again with fresh attempts.
+
+        Returns
+        -------
+        int
+            Number of requeued scenarios (those without a result)
+        """
+        with self._transaction() as db:
+            return _requeue(db)
+
+    def status(self):
+        """
+        Chunk counts per state and scenario progress.
+
+        Returns
+        -------
+        dict
+        """
+        counts = dict.fromkeys(CHUNK_STATES, 0)
+        for state, n in self._db.execute(
+                "SELECT state, COUNT(*) FROM chunks GROUP BY state"):
+            counts[state] = n
+
+        total, done = self._db.execute(
+            "SELECT COUNT(*), COUNT(result) FROM scenarios").fetchone()
+
+        counts["scenarios"] = total
+        counts["scenarios_done"] = done
+        return counts
+
+    def finished(self):
+        """True when no chunk is pending or leased."""
+        status = self.status()
+        return status["pending"] == 0 and status["leased"] == 0
+
+    def results(self):
+        """
+        Iterate over finished scenarios.
+
+        Yields
+        ------
+        (hash, Scenario, result path)
+        """
+        rows = self._db.execute(
+            "SELECT hash, scenario, result FROM scenarios "
+            "WHERE result IS NOT NULL ORDER BY rowid").fetchall()
+
+        for digest, scenario, result in rows:
+            yield digest, Scenario.from_json(scenario), \
+                os.path.join(self.results_dir, result)
+
+    def failures(self):
+        """List of (chunk id, attempts, error) for failed chunks."""
+        return self._db.execute(
+            "SELECT id, attempts, error FROM chunks WHERE state = 'failed'"
+        ).fetchall()
+
+    # --------------------------------------------------
+    # Worker
+    # --------------------------------------------------
+
+    def claim(self, owner):
+        """
+        Lease the next available chunk.
+
+        Pending chunks and chunks whose lease has expired are
+        eligible; an expired chunk that has used all its attempts is
+        marked failed instead.
+
+        Returns
+        -------
+        (chunk id, list of (hash, Scenario)) or None if nothing is
+        available
+        """
+        now = time.time()
+
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE chunks SET state = 'failed', "
+                "error = COALESCE(error, 'lease expired') "
+                "WHERE state = 'leased' AND lease_expires < ? "
+                "AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+
+            row = db.execute(
+                "SELECT id FROM chunks WHERE state = 'pending' "
+                "OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            chunk = row[0]
+            db.execute(
+                "UPDATE chunks SET state = 'leased', owner = ?, "
+                "lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (owner, now + self.lease_seconds, chunk)
+            )
+
+            items = db.execute(
+                "SELECT hash, scenario FROM scenarios "
+                "WHERE chunk = ? AND result IS NULL ORDER BY rowid",
+                (chunk,)
+            ).fetchall()
+
+        return chunk, [(h, Scenario.from_json(s)) for h, s in items]
+
+    def renew(self, chunk, owner):
+        """
+        Extend a lease; False if the lease was lost to another worker.
+        """
+        cursor = self._db.execute(
+            "UPDATE chunks SET lease_expires = ? "
+            "WHERE id = ? AND owner = ? AND state = 'leased'",
+            (time.time() + self.lease_seconds, chunk, owner)
+        )
+        return cursor.rowcount == 1
+
+    def result_path(self, digest):
+        return os.path.join(self.results_dir, digest[:2], digest + ".npz")
+
+    def has_result(self, digest):
+        return os.path.exists(self.result_path(digest))
+
+    def mark_done(self, digest):
+        """Record an existing result file for a scenario."""
+        self._db.execute(
+            "UPDATE scenarios SET result = ? WHERE hash = ?",
+            (os.path.relpath(self.result_path(digest), self.results_dir),
+             digest)
+        )
+
+    def store_result(self, digest, **arrays):
+        """Write a scenario's result file and mark the scenario done."""
+        write_result(self.result_path(digest), **arrays)
+        self.mark_done(digest)
+
+    def complete(self, chunk, owner):
+        """Mark a leased chunk done; False if the lease was lost."""
+        cursor = self._db.execute(
+            "UPDATE chunks SET state = 'done', lease_expires = NULL, "
+            "error = NULL WHERE id = ? AND owner = ? AND state = 'leased'",
+            (chunk, owner)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, chunk, owner, error):
+        """
+        Give up a chunk after an error.
+
+        It becomes pending again, or failed once max_attempts claims
+        have been used.
+        """
+        self._db.execute(
+            "UPDATE chunks SET "
+            "state = CASE WHEN attempts >= ? THEN 'failed' "
+            "ELSE 'pending' END, "
+            "owner = NULL, lease_expires = NULL, error = ? "
+            "WHERE id = ? AND owner = ?",
+            (self.max_attempts, str(error), chunk, owner)
+        )
+
+
+def _requeue(db, hashes=None):
+    """
+    Reset failed chunks holding unfinished scenarios (all, or those
+    with one of the given hashes); returns the scenarios requeued.
+    """
+    rows = db.execute(
+        "SELECT scenarios.hash, scenarios.chunk FROM scenarios "
+        "JOIN chunks ON chunks.id = scenarios.chunk "
+        "WHERE chunks.state = 'failed' AND scenarios.result IS NULL"
+    ).fetchall()
+
+    if hashes is not None:
+        wanted = set(hashes)
+        chunks = {chunk for digest, chunk in rows if digest in wanted}
+    else:
+        chunks = {chunk for _, chunk in rows}
+
+    db.executemany(
+        "UPDATE chunks SET state = 'pending', attempts = 0, owner = NULL, "
+        "lease_expires = NULL, error = NULL WHERE id = ?",
+        [(chunk,) for chunk in sorted(chunks)]
+    )
+
+    return sum(chunk in chunks for _, chunk in rows)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT / ROLLBACK context manager."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, *exc):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,230 @@
+"""
+sweep/worker.py
+
+Sweep workers and command line.
+
+A worker repeatedly claims a chunk from the work queue, simulates its
+scenarios, stores each result atomically and renews its lease after
+every scenario.  Any number of workers (on one machine or on several
+nodes sharing the queue file) can run at once; run_local_workers()
+starts several worker processes on this machine.  A queue used from
+one host only can be created with --wal (see sweep/work_queue.py).
+
+Usage:
+    python -m sweep.worker submit sweep.db --presets "Small Test" \\
+        --materials none Steel Concrete
+    python -m sweep.worker submit sweep.db --file scenarios.toml --wal
+    python -m sweep.worker work sweep.db --workers 4
+    python -m sweep.worker requeue sweep.db
+    python -m sweep.worker status sweep.db
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+
+from core.scenario import load_scenarios
+from sweep.scenarios import expand_sweep, run_scenario
+from sweep.work_queue import WorkQueue
+
+
+class LeaseLost(Exception):
+    """The chunk was handed to another worker."""
+
+
+# -------------------------------------------------------
+# Worker Loop
+# -------------------------------------------------------
+
+def default_owner():
+    """Unique worker name: host, process id and a random suffix."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def process_chunk(queue, chunk, items, owner, backend=None):
+    """
+    Run the scenarios of a leased chunk and mark it done.
+
+    Scenarios whose result file already exists (written by an earlier
+    attempt) are not simulated again.
+    """
+    for digest, scenario in items:
+        if queue.has_result(digest):
+            queue.mark_done(digest)
+        else:
+            result = run_scenario(scenario, backend)
+            queue.store_result(digest,
+                               scenario=scenario.canonical_json(),
+                               **result)
+
+        if not queue.renew(chunk, owner):
+            raise LeaseLost(chunk)
+
+    if not queue.complete(chunk, owner):
+        raise LeaseLost(chunk)
+
+
+def run_worker(db_path, owner=None, results_dir=None, lease_seconds=60.0,
+               max_attempts=3, poll_interval=0.5, max_chunks=None,
+               backend=None):
+    """
+    Claim and run chunks until the queue is drained.
+
+    While other workers hold leases the worker keeps polling, so it
+    picks up their chunks if they die.
+
+    Parameters
+    ----------
+    db_path : str
+        Queue database
+    owner : str (optional)
+        Worker name (default: default_owner())
+    results_dir, lease_seconds, max_attempts
+        See WorkQueue
+    poll_interval : float
+        Wait between claims when only leased chunks remain (s)
+    max_chunks : int (optional)
+        Stop after this many chunks
+    backend : str (optional)
+        Solver kernel backend (see core/backends.py)
+
+    Returns
+    -------
+    int
+        Chunks completed by this worker
+    """
+    owner = owner or default_owner()
+    completed = 0
+
+    with WorkQueue(db_path, results_dir, lease_seconds,
+                   max_attempts) as queue:
+
+        while max_chunks is None or completed < max_chunks:
+            claimed = queue.claim(owner)
+
+            if claimed is None:
+                if queue.finished():
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            chunk, items = claimed
+            try:
+                process_chunk(queue, chunk, items, owner, backend)
+            except LeaseLost:
+                continue
+            except Exception as error:
+                queue.release(chunk, owner, repr(error))
+                continue
+
+            completed += 1
+
+    return completed
+
+
+def _worker_process(db_path, kwargs):
+    run_worker(db_path, **kwargs)
+
+
+def run_local_workers(db_path, n_workers, **kwargs):
+    """
+    Run n_workers worker processes on this machine until the queue is
+    drained.
+
+    Returns
+    -------
+    list of int
+        Exit codes of the worker processes
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_process, args=(db_path, kwargs))
+        for _ in range(n_workers)
+    ]
+
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    return [process.exitcode for process in processes]
+
+
+# -------------------------------------------------------
+# Command Line
+# -------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EMScope sweep queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Queue a sweep")
+    submit.add_argument("db")
+    submit.add_argument("--file",
+                        help="Scenario file (.json / .toml) instead of "
+                             "a preset sweep")
+    submit.add_argument("--presets", nargs="+",
+                        help="GRID_PRESETS names (default: all)")
+    submit.add_argument("--profiles", nargs="+",
+                        help="LAYER_PROFILES names (default: all)")
+    submit.add_argument("--materials", nargs="+", default=["none"],
+                        help="Object materials ('none' for no object)")
+    submit.add_argument("--frequencies", nargs="+", type=float,
+                        default=[10e9])
+    submit.add_argument("--chunk-size", type=int, default=8)
+    submit.add_argument("--wal", action="store_true",
+                        help="WAL journal (faster; workers on this host "
+                             "only)")
+
+    work = commands.add_parser("work", help="Run workers until done")
+    work.add_argument("db")
+    work.add_argument("--workers", type=int, default=1)
+    work.add_argument("--lease", type=float, default=60.0,
+                      help="Lease duration (s)")
+    work.add_argument("--max-attempts", type=int, default=3)
+
+    requeue = commands.add_parser(
+        "requeue", help="Retry failed chunks with fresh attempts")
+    requeue.add_argument("db")
+
+    status = commands.add_parser("status", help="Show queue progress")
+    status.add_argument("db")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "submit":
+        if args.file:
+            scenarios = load_scenarios(args.file)
+        else:
+            materials = [None if m.lower() == "none" else m
+                         for m in args.materials]
+            scenarios = expand_sweep(args.presets, args.profiles,
+                                     materials, args.frequencies)
+        with WorkQueue(args.db, wal=args.wal) as queue:
+            added = queue.submit(scenarios, args.chunk_size)
+        print(f"Queued {added} of {len(scenarios)} scenarios")
+
+    elif args.command == "work":
+        kwargs = {"lease_seconds": args.lease,
+                  "max_attempts": args.max_attempts}
+        if args.workers == 1:
+            print(f"Completed {run_worker(args.db, **kwargs)} chunks")
+        else:
+            run_local_workers(args.db, args.workers, **kwargs)
+
+    elif args.command == "requeue":
+        with WorkQueue(args.db) as queue:
+            print(f"Requeued {queue.requeue_failed()} scenarios")
+
+    with WorkQueue(args.db) as queue:
+        print(json.dumps(queue.status(), indent=2))
+        for chunk, attempts, error in queue.failures():
+            print(f"chunk {chunk} failed after {attempts} attempts: {error}")
+
+
+if __name__ == "__main__":
+    main()
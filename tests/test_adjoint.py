@@ -0,0 +1,59 @@
+"""
+tests/test_adjoint.py
+"""
+
+import numpy as np
+
+from core.simulation import build_grid, create_solver, ricker_source
+
+
+NX, NT, SRC = 80, 200, 10
+
+
+def _grid(boundary, material):
+    return build_grid(NX, 1e-3, [(0, boundary, "Air"),
+                                 (boundary, NX, material)])
+
+
+def _misfit(grid, source, observed):
+    trace = create_solver(grid, NT, SRC).run(source)
+    return 0.5 * np.sum((trace - observed) ** 2)
+
+
+def test_adjoint_gradient_matches_finite_differences():
+    true = _grid(40, "Moist Soil")
+    solver = create_solver(true, NT, SRC)
+    source = ricker_source(solver.dt, NT, 20e9)
+    observed = solver.run(source)
+
+    start = _grid(36, "Dry Soil")
+    misfit, grad_eps, grad_sigma = create_solver(
+        start, NT, SRC).misfit_gradient(source, observed,
+                                        checkpoint_interval=7)
+
+    assert np.isclose(misfit, _misfit(start, source, observed))
+
+    h = 1e-4
+    for cell in (25, 38, 60):
+        for attr, grad in (("epsilon_r", grad_eps), ("sigma", grad_sigma)):
+            plus, minus = _grid(36, "Dry Soil"), _grid(36, "Dry Soil")
+            getattr(plus, attr)[cell] += h
+            getattr(minus, attr)[cell] -= h
+
+            fd = (_misfit(plus, source, observed)
+                  - _misfit(minus, source, observed)) / (2 * h)
+            assert np.isclose(grad[cell], fd, rtol=1e-4, atol=1e-10)
+
+
+def test_adjoint_gradient_independent_of_checkpoints():
+    grid = _grid(40, "Moist Soil")
+    solver = create_solver(grid, NT, SRC)
+    source = ricker_source(solver.dt, NT, 20e9)
+    observed = np.zeros(NT)
+
+    a = solver.misfit_gradient(source, observed, checkpoint_interval=1)
+    b = solver.misfit_gradient(source, observed, checkpoint_interval=NT)
+
+    assert np.isclose(a[0], b[0])
+    assert np.allclose(a[1], b[1])
+    assert np.allclose(a[2], b[2])
@@ -0,0 +1,41 @@
+"""
+tests/test_attenuation_compensation.py
+"""
+
+import numpy as np
+
+from physics.attenuation import attenuation_constant
+from physics.constants import C0
+from signal_processing.attenuation_compensation import (
+    AttenuationCompensation,
+    attenuation_gain_table
+)
+from signal_processing.depth_estimation import LayeredVelocityModel
+
+
+def test_gain_table_matches_two_way_loss():
+    model = LayeredVelocityModel([0.1, np.inf], [1.0, 10.0],
+                                 sigma=[0.0, 0.02])
+    dt = 1e-11
+    nt = 500
+
+    gain = attenuation_gain_table(model, dt, nt, 1e9, 120.0)
+
+    t = nt - 1
+    depth = model.time_to_depth(t * dt)
+    alpha = attenuation_constant(1e9, 10.0, 1.0, 0.02)
+    expected = np.exp(2 * alpha * (depth - 0.1))
+
+    assert np.allclose(gain[:int(2 * 0.1 / C0 / dt)], 1.0)
+    assert np.isclose(gain[t], expected)
+    assert attenuation_gain_table(model, dt, nt, 1e9, 120.0) is gain
+
+
+def test_stft_gain_is_identity_for_lossless_model():
+    model = LayeredVelocityModel([0.1, np.inf], [1.0, 4.0])
+    traces = np.random.default_rng(0).normal(size=(4, 300))
+
+    stage = AttenuationCompensation(model, 1e-11, stft=True, nperseg=32)
+    out = stage.process(traces.copy())
+
+    assert np.allclose(out, traces)
@@ -0,0 +1,41 @@
+"""
+tests/test_benchmarks.py
+"""
+
+import benchmarks.run_benchmarks as run_benchmarks
+from benchmarks.run_benchmarks import compare_results, run_suite
+
+
+def _suite(throughput, nt=800):
+    return {"results": {"case": {"throughput": throughput,
+                                 "params": {"nt": nt}}}}
+
+
+def test_regressions_are_flagged():
+    rows = compare_results(_suite(70.0), _suite(100.0), tolerance=0.2)
+    assert rows == [{"name": "case", "ratio": 0.7, "regression": True}]
+
+    rows = compare_results(_suite(90.0), _suite(100.0), tolerance=0.2)
+    assert not rows[0]["regression"]
+
+    # Different problem sizes are not compared
+    assert compare_results(_suite(10.0, nt=200), _suite(100.0)) == []
+
+
+def test_quick_suite_runs():
+    suite = run_suite(repeat=1, quick=True, name_filter="fdtd_run")
+
+    assert {"fdtd_run[Small Test]", "fdtd_run[Standard GPR]",
+            "fdtd_run[High Resolution]",
+            "fdtd_run[Small Test|numpy]"} <= set(suite["results"])
+    assert all(r["unit"] == "cells/s" for r in suite["results"].values())
+
+
+def test_filtered_cases_are_not_run(monkeypatch):
+    def no_timing(*args, **kwargs):
+        raise AssertionError("case was run")
+
+    monkeypatch.setattr(run_benchmarks, "time_call", no_timing)
+
+    assert run_suite(repeat=1, quick=True, name_filter="none")["results"] \
+        == {}
@@ -0,0 +1,32 @@
+"""
+tests/test_depth_estimation.py
+"""
+
+import numpy as np
+
+from config.simulation_config import LAYER_PROFILES
+from physics.constants import C0
+from signal_processing.depth_estimation import (
+    LayeredVelocityModel,
+    estimate_depths_layered
+)
+
+
+def test_layered_depths_below_interface():
+    dx = 1e-3
+    model = LayeredVelocityModel.from_layer_profile(
+        LAYER_PROFILES["Air-Soil"], dx, reference_index=50
+    )
+
+    # 100 cells of air, then dry soil (epsilon_r = 3)
+    t_interface = 2 * 0.1 / (C0 / np.sqrt(1.0006))
+    t_object = t_interface + 2 * 0.05 / (C0 / np.sqrt(3.0))
+
+    dt = t_object / 400
+    picks = np.array([[200, 400], [400, -1]])
+
+    depths = estimate_depths_layered(picks, dt, model)
+
+    assert np.isclose(depths[0, 1], 0.15)
+    assert np.isclose(depths[1, 0], 0.15)
+    assert np.isnan(depths[1, 1])
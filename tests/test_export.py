@@ -0,0 +1,65 @@
+"""
+tests/test_export.py
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.simulation import build_grid, create_solver, ricker_source
+from visualization.export import (
+    export_animation,
+    record_field_history,
+    select_frames
+)
+
+
+def _history(tmp_path):
+    grid = build_grid(120, 1e-3, [(0, 60, "Air"), (60, 120, "Dry Soil")])
+    solver = create_solver(grid, 200, 10)
+    source = ricker_source(solver.dt, 200, 20e9)
+
+    history = record_field_history(solver, source,
+                                   str(tmp_path / "history.npy"), stride=4)
+    return grid, solver, history
+
+
+def test_history_matches_final_field(tmp_path):
+    _, solver, history = _history(tmp_path)
+
+    assert isinstance(history, np.memmap)
+    assert history.shape == (50, 120)
+    assert np.allclose(history[-1], solver.Ez, atol=1e-6)
+
+
+def test_frame_decimation():
+    assert len(select_frames(1000, fps=10, duration=2)) == 20
+    assert len(select_frames(5, fps=30, duration=10)) == 5
+    assert select_frames(100, max_frames=3).tolist() == [0, 50, 99]
+
+
+def test_gif_and_png_export(tmp_path):
+    grid, solver, history = _history(tmp_path)
+
+    gif = str(tmp_path / "wave.gif")
+    n = export_animation(str(tmp_path / "history.npy"), grid.x, gif,
+                         fps=10, duration=1, epsilon_r=grid.epsilon_r,
+                         dt=solver.dt, stride=4)
+    assert n == 10
+    assert Image.open(gif).n_frames == 10
+
+    frames = str(tmp_path / "frames")
+    assert export_animation(history, grid.x, frames, max_frames=3) == 3
+    assert len(os.listdir(frames)) == 3
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+def test_mp4_export(tmp_path):
+    grid, _, history = _history(tmp_path)
+
+    path = str(tmp_path / "wave.mp4")
+    export_animation(history, grid.x, path, fps=10, max_frames=10)
+    assert os.path.getsize(path) > 0
@@ -2,19 +2,137 @@
 tests/test_fdtd.py
 """
 
+import tracemalloc
+
 import numpy as np
-from core.fdtd_solver import FDTDSolver
+
+from core.fdtd_solver import BatchFDTDSolver1D, FDTDSolver1D
+from core.grid import Grid1D
+from core.simulation import build_grid, create_solver, ricker_source
+from physics.wave_equations import compute_time_step
 
 
 def test_solver_runs():
     nx = 100
     dx = 1e-3
     nt = 100
-    dt = dx / (3e8 * 2)
+    dt = compute_time_step(dx)
+
+    grid = Grid1D(nx, dx)
+    solver = FDTDSolver1D(grid, dt, (nt + 0.5) * dt, source_position=20)
+
+    signal = solver.run(ricker_source(dt, nt, 20e9))
+
+    assert solver.nt == nt
+    assert signal.shape == (nt,)
+    assert np.all(np.isfinite(signal))
+    assert np.abs(signal).max() > 0
+
+
+def test_batch_solver_matches_single_solver():
+    grids = [
+        build_grid(120, 1e-3, [(0, 60, "Air"), (60, 120, material)])
+        for material in ("Dry Soil", "Concrete", "Wet Soil")
+    ]
+    nt = 200
+    dt = create_solver(grids[0], nt, 10).dt
+    source = ricker_source(dt, nt, 20e9)
+
+    batch = BatchFDTDSolver1D.from_grids(grids, dt, (nt + 0.5) * dt, 10)
+    traces = batch.run(source)
+
+    for grid, trace in zip(grids, traces):
+        expected = create_solver(grid, nt, 10).run(source)
+        assert np.allclose(trace, expected)
+
+
+def test_step_blocks_match_run():
+    grid = build_grid(150, 1e-3, [(0, 70, "Air"), (70, 150, "Concrete")])
+    nt = 300
+    solver = create_solver(grid, nt, 10)
+    source = ricker_source(solver.dt, nt, 20e9)
+
+    expected = solver.run(source).copy()
+
+    stepped = create_solver(grid, nt, 10)
+    stepped.set_source(source)
+    parts = [stepped.step(k) for k in (1, 7, 64, 100, 1000)]
+
+    assert stepped.n == nt
+    assert np.allclose(np.concatenate(parts), expected)
+    assert np.allclose(stepped.Ez, solver.Ez)
+
+
+def test_callbacks_fire_at_block_boundaries():
+    grid = build_grid(100, 1e-3)
+    solver = create_solver(grid, 250, 10)
+    seen = []
+
+    def record(step, current):
+        seen.append((step, current.n, current.Ez.copy()))
+
+    solver.run(ricker_source(solver.dt, 250, 20e9), callback=record,
+               callback_interval=60)
+
+    assert [step for step, _, _ in seen] == [60, 120, 180, 240, 250]
+    assert all(step == n for step, n, _ in seen)
+
+    reference = create_solver(grid, 250, 10)
+    reference.set_source(ricker_source(solver.dt, 250, 20e9))
+    reference.step(120)
+    assert np.allclose(seen[1][2], reference.Ez)
+
+
+def test_threaded_batch_matches_serial():
+    grids = [
+        build_grid(100, 1e-3, [(0, 50, "Air"), (50, 100, material)])
+        for material in ("Dry Soil", "Concrete", "Wet Soil", "Clay", "Asphalt")
+    ]
+    nt = 150
+    dt = create_solver(grids[0], nt, 10).dt
+    source = ricker_source(dt, nt, 20e9)
+
+    def run(**kwargs):
+        batch = BatchFDTDSolver1D.from_grids(grids, dt, (nt + 0.5) * dt, 10)
+        return batch.run(source, **kwargs).copy()
+
+    serial = run()
+    np.testing.assert_array_equal(run(n_threads=2), serial)
+    np.testing.assert_array_equal(run(n_threads=3, block_steps=16), serial)
+    np.testing.assert_array_equal(run(n_threads=8), serial)
+
+
+def test_numpy_time_loop_does_not_allocate_arrays():
+    grid = build_grid(20000, 1e-3)
+    solver = create_solver(grid, 600, 10, backend="numpy")
+    solver.set_source(ricker_source(solver.dt, 600, 20e9))
+    solver.step(10)
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        solver.step(500)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # One field-sized temporary would be 160 kB; only scalars remain
+    assert peak - before < 4096
+
 
-    epsilon_r = np.ones(nx)
+def test_batch_shard_loop_does_not_allocate_arrays():
+    batch = BatchFDTDSolver1D(np.full((4, 5000), 4.0), 0.01, 1e-3, 1e-12,
+                              300.5e-12, 10)
+    source = np.broadcast_to(np.ones(batch.nt), (4, batch.nt)).T
+    shard, = batch._shards(1)
+    batch._advance_shard(shard, source, 0, 10)
 
-    solver = FDTDSolver(nx, dx, nt, dt, epsilon_r)
-    solver.run()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        batch._advance_shard(shard, source, 10, 250)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
 
-    assert solver.field_history.shape == (nt, nx)
+    assert peak - before < 4096
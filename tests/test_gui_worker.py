@@ -0,0 +1,45 @@
+"""
+tests/test_gui_worker.py
+"""
+
+import queue
+import threading
+
+from gui.worker import simulation_task
+
+
+PARAMS = {
+    "nx": 200, "nt": 400, "dx": 1e-3, "frequency": 10e9,
+    "profile": "Air-Soil", "obj_pos": 120, "obj_width": 10,
+    "obj_eps": 6.0, "obj_sigma": 0.0,
+}
+
+
+def _messages(cancel):
+    messages = queue.Queue()
+    simulation_task(PARAMS, messages, cancel, progress_interval=50)
+    return [messages.get_nowait() for _ in range(messages.qsize())]
+
+
+def test_task_reports_progress_and_result():
+    messages = _messages(threading.Event())
+
+    assert messages[0][0] == "started"
+    assert any(m[0] == "snapshot" for m in messages)
+
+    progress = [m for m in messages if m[0] == "progress"]
+    assert [m[1] for m in progress] == list(range(50, 401, 50))
+
+    kind, result = messages[-1]
+    assert kind == "done"
+    assert result["signal"].shape == (400,)
+    assert len(result["picks"]) == len(result["depths"])
+
+
+def test_task_cancels_at_first_report():
+    cancel = threading.Event()
+    cancel.set()
+
+    messages = _messages(cancel)
+
+    assert messages[-1] == ("cancelled", 50)
@@ -0,0 +1,81 @@
+"""
+tests/test_instrumentation.py
+"""
+
+import numpy as np
+import pytest
+
+from core.fdtd_solver import BatchFDTDSolver1D
+from core.instrumentation import PHASES, SolverProfiler
+from core.simulation import build_grid, create_solver, ricker_source
+from config.simulation_config import LAYER_PROFILES
+
+
+def _setup(nx=200, nt=300):
+    grid = build_grid(nx, 1e-3, LAYER_PROFILES["Air-Soil"])
+    solver = create_solver(grid, nt)
+    return grid, solver, ricker_source(solver.dt, nt, 10e9)
+
+
+def test_profiling_does_not_change_results():
+    grid, solver, source = _setup()
+    expected = solver.run(source).copy()
+
+    profiled = create_solver(grid, solver.nt)
+    trace = profiled.run(source, profiler=SolverProfiler(sample_every=7))
+
+    np.testing.assert_array_equal(trace, expected)
+
+
+def test_profile_contents_and_callback():
+    grid, solver, source = _setup(nt=300)
+    received = []
+    profiler = SolverProfiler(sample_every=10, callback=received.append)
+
+    solver.run(source, profiler=profiler)
+    profile = profiler.last
+
+    assert received == [profile]
+    assert profile.steps == 300
+    assert profile.sampled_steps == 30
+    assert profile.n_cells == grid.nx
+    assert set(PHASES) <= set(profile.phase_seconds)
+    assert all(v >= 0 for v in profile.phase_seconds.values())
+    assert sum(profile.phase_seconds.values()) == pytest.approx(
+        profile.wall_time, rel=0.5)
+    assert profile.mcells_per_s > 0
+    assert profile.to_dict()["engine"] == "FDTDSolver1D"
+
+
+def test_profile_counts_steps_of_stopped_run():
+    grid, solver, source = _setup(nt=300)
+    profiler = SolverProfiler(sample_every=50)
+
+    solver.run(source, callback=lambda step, s: step < 100,
+               callback_interval=50, profiler=profiler)
+
+    assert profiler.last.steps == 100
+    assert profiler.last.sampled_steps == 2
+
+
+def test_batch_profiling_matches_unprofiled():
+    grid, solver, source = _setup(nx=120, nt=200)
+    eps = np.stack([grid.epsilon_r, grid.epsilon_r * 1.5])
+    sigma = np.stack([grid.sigma, grid.sigma])
+
+    def make():
+        return BatchFDTDSolver1D(eps, sigma, grid.dx, solver.dt,
+                                 solver.total_time, solver.source_position)
+
+    expected = make().run(source).copy()
+    profiler = SolverProfiler(sample_every=5)
+    traces = make().run(source, profiler=profiler)
+
+    np.testing.assert_array_equal(traces, expected)
+    assert profiler.last.n_cells == 2 * grid.nx
+    assert profiler.last.sampled_steps == 40
+
+
+def test_invalid_sample_interval():
+    with pytest.raises(ValueError):
+        SolverProfiler(sample_every=0)
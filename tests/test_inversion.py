@@ -0,0 +1,40 @@
+"""
+tests/test_inversion.py
+"""
+
+from config.material_database import MATERIAL_DATABASE
+from config.simulation_config import LAYER_PROFILES
+from core.simulation import build_grid, simulate_reflection
+from inversion.forward_model import LayeredForwardModel, ParameterSpace
+from inversion.optimizer import invert_trace
+
+
+def test_recovers_road_structure_layers():
+    # Long enough for the whole profile: Air | Asphalt 80-200 | Dry Soil
+    nx, dx, nt, f0 = 400, 1e-3, 900, 10e9
+    layers = LAYER_PROFILES["Road Structure"]
+    assert nx >= layers[-1][1]
+
+    grid = build_grid(nx, dx, layers)
+    observed, _ = simulate_reflection(grid, nt, f0)
+
+    space = ParameterSpace(
+        {"interface_1": (50, 120), "epsilon_r_1": (1.5, 15.0),
+         "sigma_1": (0.0, 0.1),
+         "interface_2": (150, 300), "epsilon_r_2": (1.5, 15.0),
+         "sigma_2": (0.0, 0.01)}
+    )
+    model = LayeredForwardModel(space, nx, dx, nt, f0, n_layers=2)
+
+    result = invert_trace(observed, model, population_size=30,
+                          max_generations=400, max_time=60, tol=1e-9,
+                          seed=1)
+
+    for k, (start, _, name) in enumerate(layers[1:], start=1):
+        material = MATERIAL_DATABASE[name]
+        assert abs(result.parameters[f"interface_{k}"] - start) < 1
+        assert abs(result.parameters[f"epsilon_r_{k}"]
+                   - material["epsilon_r"]) < 0.1
+        assert abs(result.parameters[f"sigma_{k}"]
+                   - material["sigma"]) < 0.005
+    assert result.n_simulations < result.n_evaluations
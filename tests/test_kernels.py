@@ -0,0 +1,108 @@
+"""
+tests/test_kernels.py
+"""
+
+import numpy as np
+import pytest
+
+from core import backends, kernels
+from core.simulation import build_grid, create_solver, ricker_source
+from signal_processing.noise_model import add_impulse_noise
+from signal_processing.peak_detection import detect_peaks
+
+needs_numba = pytest.mark.skipif(not backends.NUMBA_AVAILABLE,
+                                 reason="numba not installed")
+
+
+def _fields(nx=80, nt=120, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "Ez": np.zeros(nx),
+        "Hy": np.zeros(nx - 1),
+        "Ceze": rng.uniform(0.9, 1.0, nx),
+        "Cezh": rng.uniform(0.1, 0.4, nx),
+        "source": rng.normal(0, 1, nt),
+        "record": np.zeros(nt),
+    }
+
+
+def _advance(kernel, fields, blocks, src=10):
+    n = 0
+    for k in blocks:
+        kernel(fields["Ez"], fields["Hy"], fields["Ceze"], fields["Cezh"],
+               0.5, src, fields["source"], fields["record"], n, k,
+               np.empty(len(fields["Hy"])), np.empty(len(fields["Hy"]) - 1))
+        n += k
+    return fields
+
+
+def test_numpy_kernel_block_size_independent():
+    whole = _advance(kernels.numpy_steps, _fields(), [120])
+    split = _advance(kernels.numpy_steps, _fields(), [1] * 20 + [50, 50])
+
+    np.testing.assert_array_equal(whole["record"], split["record"])
+    np.testing.assert_array_equal(whole["Ez"], split["Ez"])
+
+
+def test_registry_resolution():
+    for kernel in ("fdtd_steps", "local_maxima", "impulse_noise"):
+        assert backends.available_backends(kernel)[-1] == "numpy"
+        assert backends.resolve_backend(kernel, "numpy") == "numpy"
+
+    assert backends.get_kernel("fdtd_steps", "numpy") is kernels.numpy_steps
+
+    with pytest.raises(ValueError):
+        backends.resolve_backend("fdtd_steps", "cuda")
+    with pytest.raises(ValueError):
+        backends.get_kernel("no_such_kernel")
+
+
+@pytest.mark.skipif(backends.NUMBA_AVAILABLE, reason="numba installed")
+def test_missing_numba_falls_back_to_numpy():
+    assert backends.resolve_backend("fdtd_steps") == "numpy"
+
+    with pytest.raises(ValueError):
+        backends.get_kernel("fdtd_steps", "numba")
+
+    backends.set_default_backend("numba")
+    try:
+        assert backends.resolve_backend("fdtd_steps") == "numpy"
+    finally:
+        backends.set_default_backend("auto")
+
+
+@needs_numba
+def test_jit_kernel_matches_numpy():
+    expected = _advance(kernels.numpy_steps, _fields(), [120])
+    compiled = _advance(kernels.jit_steps, _fields(), [30, 90])
+
+    np.testing.assert_allclose(compiled["record"], expected["record"])
+    np.testing.assert_allclose(compiled["Hy"], expected["Hy"])
+
+
+@needs_numba
+def test_backends_agree_end_to_end():
+    grid = build_grid(150, 1e-3, [(0, 70, "Air"), (70, 150, "Concrete")])
+    solver = create_solver(grid, 300, 10)
+    source = ricker_source(solver.dt, 300, 20e9)
+
+    traces = {
+        name: create_solver(grid, 300, 10).run(source, backend=name)
+        for name in ("numpy", "numba")
+    }
+    np.testing.assert_allclose(traces["numba"], traces["numpy"])
+
+    radargram = np.tile(traces["numpy"], (5, 1))
+    for a, b in zip(detect_peaks(radargram, backend="numpy"),
+                    detect_peaks(radargram, backend="numba")):
+        np.testing.assert_array_equal(a, b)
+
+    noisy = {
+        name: add_impulse_noise(radargram, 0.05, rng=np.random.default_rng(3),
+                                backend=name)
+        for name in ("numpy", "numba")
+    }
+    np.testing.assert_array_equal(noisy["numba"], noisy["numpy"])
+
+    assert set(backends.warmup()) == {"fdtd_steps", "local_maxima",
+                                      "impulse_noise"}
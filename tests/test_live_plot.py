@@ -0,0 +1,63 @@
+"""
+tests/test_live_plot.py
+"""
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from visualization.decimation import minmax_decimate
+from visualization.live_plot import LiveFieldView
+
+
+def test_minmax_decimation_keeps_extremes():
+    values = np.zeros(100000)
+    values[12345] = 5.0
+    values[67890] = -3.0
+
+    index, decimated = minmax_decimate(values, 1000)
+
+    assert len(index) <= 1000
+    assert np.all(np.diff(index) >= 0)
+    assert decimated.max() == 5.0 and decimated.min() == -3.0
+
+
+def test_live_view_blits_snapshots_headless():
+    view = LiveFieldView(max_fps=0)
+    canvas = view.attach(FigureCanvasAgg(view.figure))
+
+    x = np.linspace(0, 0.4, 400)
+    view.start(x, np.ones(400), nt=800, dt=1e-12)
+
+    field_index, field = minmax_decimate(np.sin(40 * x), 100)
+    snapshot = {
+        "field_index": field_index, "field": field,
+        "trace_index": np.arange(50), "trace": np.zeros(50),
+    }
+
+    assert view.update(snapshot)
+    assert view.update(snapshot)
+    assert view.n_frames == 2
+    assert view.blit._background is not None
+
+    # Values outside the axes trigger a rescale and full redraw
+    snapshot["trace"] = np.full(50, 4.0)
+    view.update(snapshot)
+    assert view.ax_trace.get_ylim()[1] >= 4.0
+
+    view.show_result(np.sin(40 * x), np.zeros(800), [100, 300])
+    canvas.draw()
+
+
+def test_frame_rate_cap_skips_fast_updates():
+    view = LiveFieldView(max_fps=1.0)
+    view.attach(FigureCanvasAgg(view.figure))
+    view.start(np.arange(10.0), np.ones(10), nt=10, dt=1.0)
+
+    snapshot = {
+        "field_index": np.arange(10), "field": np.zeros(10),
+        "trace_index": np.arange(5), "trace": np.zeros(5),
+    }
+
+    assert view.update(snapshot)
+    assert not view.update(snapshot)
+    assert view.update(snapshot, force=True)
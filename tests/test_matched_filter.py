@@ -0,0 +1,32 @@
+"""
+tests/test_matched_filter.py
+"""
+
+import numpy as np
+
+from signal_processing.matched_filter import (
+    matched_filter,
+    source_wavelet,
+    wiener_deconvolve
+)
+
+
+def test_echo_times_recovered():
+    dt = 1e-11
+    nt = 800
+    f0 = 2e9
+
+    reflectivity = np.zeros(nt)
+    reflectivity[300] = 1.0
+    reflectivity[330] = -0.7
+
+    wavelet = source_wavelet("ricker", dt, nt, f0=f0)
+    trace = np.convolve(reflectivity, wavelet)[:nt]
+
+    correlated = matched_filter(np.vstack([trace, trace]), dt, f0=f0)
+    assert abs(np.argmax(np.abs(correlated[0])) - 300) <= 2
+    assert np.allclose(correlated[0], correlated[1])
+
+    deconvolved = wiener_deconvolve(trace, dt, noise_level=1e-3, f0=f0)
+    assert abs(np.argmax(deconvolved) - 300) <= 1
+    assert abs(np.argmin(deconvolved) - 330) <= 1
@@ -0,0 +1,68 @@
+"""
+tests/test_migration.py
+"""
+
+import numpy as np
+
+from physics.constants import C0
+from signal_processing.depth_estimation import LayeredVelocityModel
+from signal_processing.migration import kirchhoff_migration, stolt_migration
+
+
+def point_diffractor(nx=121, nt=400, dx=0.01, dt=5e-11, x0=0.6, z0=0.5,
+                     epsilon_r=4.0):
+    v = C0 / np.sqrt(epsilon_r)
+    x = np.arange(nx) * dx
+    arrival = np.rint(2 * np.hypot(z0, x - x0) / v / dt).astype(int)
+
+    radargram = np.zeros((nx, nt))
+    keep = arrival < nt
+    radargram[np.flatnonzero(keep), arrival[keep]] = 1.0
+    return radargram, x
+
+
+def test_migration_focuses_point_diffractor():
+    radargram, x = point_diffractor()
+    model = LayeredVelocityModel([0.2, np.inf], [4.0, 4.0])
+
+    for image, depth in (
+        stolt_migration(radargram, 5e-11, 0.01, epsilon_r=4.0),
+        kirchhoff_migration(radargram, 5e-11, 0.01, model=model),
+    ):
+        i, j = np.unravel_index(np.argmax(np.abs(image)), image.shape)
+        assert abs(x[i] - 0.6) <= 0.011
+        assert abs(depth[j] - 0.5) <= 0.01
+
+
+def layered_diffractor(nx=121, nt=400, dx=0.01, dt=5e-11, x0=0.6, z0=0.5,
+                       top=0.2, epsilon_r=(1.0, 9.0)):
+    """Diffraction below one interface (Fermat ray times, brute force)."""
+    v1, v2 = C0 / np.sqrt(epsilon_r)
+    x = np.arange(nx) * dx
+    crossing = np.linspace(0, x[-1], 40 * nx)
+
+    one_way = (np.hypot(top, crossing[None, :] - x[:, None]) / v1
+               + np.hypot(z0 - top, x0 - crossing[None, :]) / v2)
+    arrival = np.rint(2 * one_way.min(axis=1) / dt).astype(int)
+
+    radargram = np.zeros((nx, nt))
+    keep = arrival < nt
+    radargram[np.flatnonzero(keep), arrival[keep]] = 1.0
+    return radargram, x
+
+
+def test_layered_kirchhoff_focuses_below_interface():
+    radargram, x = layered_diffractor()
+    model = LayeredVelocityModel([0.2, np.inf], [1.0, 9.0])
+
+    image, depth = kirchhoff_migration(radargram, 5e-11, 0.01, model=model)
+    i, j = np.unravel_index(np.argmax(np.abs(image)), image.shape)
+    assert abs(x[i] - 0.6) <= 0.021
+    assert abs(depth[j] - 0.5) <= 0.01
+
+    # Neither layer velocity alone focuses it there
+    for epsilon_r in (1.0, 9.0):
+        constant, depth = kirchhoff_migration(radargram, 5e-11, 0.01,
+                                              epsilon_r=epsilon_r)
+        i, j = np.unravel_index(np.argmax(np.abs(constant)), constant.shape)
+        assert abs(depth[j] - 0.5) > 0.1
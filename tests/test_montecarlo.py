@@ -0,0 +1,25 @@
+"""
+tests/test_montecarlo.py
+"""
+
+import numpy as np
+
+from signal_processing.montecarlo import DetectionScenario, run_detection_study
+
+
+def test_detection_study_is_reproducible():
+    clean = np.zeros(300)
+    clean[100] = 1.0
+    clean[200] = -0.8
+
+    scenario = DetectionScenario(clean, 1e-11, [100, 200], epsilon_r=4.0)
+
+    kwargs = dict(thresholds=[0.3, 0.9], snr_db=15, impulse_prob=0.0,
+                  chunk_size=64, block_size=100, seed=3)
+    a = run_detection_study(scenario, 250, n_workers=1, **kwargs)
+    b = run_detection_study(scenario, 250, n_workers=2, **kwargs)
+
+    assert a.n_trials == 250
+    assert np.array_equal(a.detections, b.detections)
+    assert np.all(a.probability_of_detection[0] > 0.9)
+    assert a.probability_of_detection[1, 1] < 0.1
@@ -0,0 +1,30 @@
+"""
+tests/test_noise_model.py
+"""
+
+import numpy as np
+
+from signal_processing.noise_model import NoiseGenerator, add_impulse_noise
+
+
+def test_streams_are_reproducible_and_independent():
+    clean = np.sin(np.linspace(0, 10, 100))
+
+    a = np.vstack(list(NoiseGenerator(7, stream=0).realizations(clean, 10, 4)))
+    b = np.vstack(list(NoiseGenerator(7, stream=0).realizations(clean, 10, 4)))
+    c = np.vstack(list(NoiseGenerator(7, stream=1).realizations(clean, 10, 4)))
+
+    assert a.shape == (10, 100)
+    assert np.array_equal(a, b)
+    assert not np.allclose(a, c)
+
+
+def test_impulse_noise_batch():
+    rng = np.random.default_rng(0)
+    signal = np.ones((50, 200))
+
+    noisy = add_impulse_noise(signal, probability=0.1, rng=rng)
+    hits = np.count_nonzero(noisy != 1.0)
+
+    assert 500 < hits < 1500
+    assert set(np.unique(noisy)) <= {-1.0, 1.0, 3.0}
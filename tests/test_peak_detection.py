@@ -0,0 +1,70 @@
+"""
+tests/test_peak_detection.py
+"""
+
+import tracemalloc
+
+import numpy as np
+
+from signal_processing.peak_detection import (
+    _prominences_and_widths,
+    detect_peaks,
+    detect_peaks_with_distance,
+    peak_mask
+)
+
+
+def test_batch_matches_single_trace():
+    traces = np.random.default_rng(0).normal(size=(5, 200))
+    batch = detect_peaks(traces, 0.3)
+
+    for trace, peaks in zip(traces, batch):
+        assert list(peaks) == detect_peaks(trace, 0.3)
+
+
+def test_min_distance_keeps_strongest():
+    signal = np.zeros(40)
+    signal[10] = 0.6
+    signal[14] = 1.0
+    signal[30] = 0.8
+
+    assert detect_peaks_with_distance(signal, 0.1, min_distance=10) == [14, 30]
+
+
+def _reference_prominence(trace, peak):
+    """Direct definition: lowest sample before the next higher one."""
+    height = trace[peak]
+
+    def base(side):
+        lowest = height
+        for value in side:
+            if value > height:
+                break
+            lowest = min(lowest, value)
+        return lowest
+
+    return height - max(base(trace[peak - 1::-1]), base(trace[peak + 1:]))
+
+
+def test_prominence_windows_grow_only_where_needed():
+    rng = np.random.default_rng(3)
+    amp = np.abs(np.cumsum(rng.normal(size=(4, 3000)), axis=1))
+    rows, cols = np.nonzero(peak_mask(amp, 0.0))
+
+    prom, _ = _prominences_and_widths(amp, rows, cols)
+    expected = [_reference_prominence(amp[r], c) for r, c in zip(rows, cols)]
+    assert np.allclose(prom, expected)
+
+    # Full-length windows would gather peaks x nt samples (~20 GB here)
+    amp = np.abs(rng.normal(size=(20, 20000)))
+    rows, cols = np.nonzero(peak_mask(amp, 0.0))
+
+    tracemalloc.start()
+    try:
+        peak_mask(amp, 0.0, prominence=0.1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(rows) * amp.shape[1] * 8 > 10e9
+    assert peak < 100e6
@@ -0,0 +1,48 @@
+"""
+tests/test_pipeline.py
+"""
+
+import numpy as np
+
+from signal_processing.pipeline import (
+    AGCGain,
+    BackgroundRemoval,
+    Bandpass,
+    Dewow,
+    Pipeline,
+    SECGain,
+    TimeZeroCorrection
+)
+
+
+def make_pipeline():
+    dt = 1e-11
+    return Pipeline([
+        Dewow(21),
+        TimeZeroCorrection(threshold_ratio=0.5, target=10),
+        BackgroundRemoval(window=8),
+        SECGain(dt, alpha=1e8, power=1.0, max_gain=1e3),
+        Bandpass(dt, 0.5e9, 5e9),
+        AGCGain(32),
+    ])
+
+
+def test_chunk_size_does_not_change_result():
+    radargram = np.random.default_rng(0).normal(size=(37, 256))
+
+    small = make_pipeline().process(radargram, chunk_size=5)
+    large = make_pipeline().process(radargram, chunk_size=100)
+
+    assert small.shape == radargram.shape
+    assert np.allclose(small, large)
+
+
+def test_time_zero_alignment_and_timing():
+    radargram = np.zeros((3, 50))
+    radargram[np.arange(3), [12, 20, 31]] = 1.0
+
+    pipeline = Pipeline([TimeZeroCorrection(threshold_ratio=0.5, target=5)])
+    out = pipeline.process(radargram, chunk_size=2)
+
+    assert np.all(out[:, 5] == 1.0)
+    assert pipeline.timings()[0]["traces"] == 3
@@ -0,0 +1,94 @@
+"""
+tests/test_radargram.py
+"""
+
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from visualization.radargram import (
+    RadargramView,
+    export_radargram_png,
+    peak_decimate
+)
+
+
+def _survey(tmp_path, n=5000, nt=300):
+    data = np.lib.format.open_memmap(str(tmp_path / "survey.npy"),
+                                     mode="w+", dtype=np.float32,
+                                     shape=(n, nt))
+    data[:] = 0.01
+    data[:, 120] = 1.0
+    data[3217, 250] = -4.0
+    data.flush()
+    return str(tmp_path / "survey.npy")
+
+
+def test_peak_decimation_keeps_signed_extremes():
+    block = np.zeros((10, 9))
+    block[3, 4] = -2.0
+    block[7, 8] = 1.5
+
+    out = peak_decimate(block, 4, 3)
+
+    assert out.shape == (3, 3)
+    assert out[0, 1] == -2.0
+    assert out[1, 2] == 1.5
+
+
+def test_window_levels_and_tile_cache(tmp_path):
+    view = RadargramView(_survey(tmp_path), tile_size=64, chunk_traces=500)
+
+    image, bounds = view.window(width=400, height=100)
+    assert image.shape[1] <= 400 and image.shape[0] <= 300
+    assert image.min() == -4.0 and image.max() == 1.0
+    assert bounds == (0, 5000, 0, 300)
+
+    reads = view.n_reads
+    view.window(width=400, height=100)
+    assert view.n_reads == reads
+
+    zoom, bounds = view.window((3200, 3240), (240, 260), 400, 100)
+    assert bounds[0] <= 3217 < bounds[1]
+    assert zoom.min() == -4.0
+
+
+def test_interactive_zoom_refreshes_image(tmp_path):
+    view = RadargramView(_survey(tmp_path))
+
+    figure = Figure(figsize=(4, 3), dpi=50)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    artist = view.show(ax, vmax=1.0)
+    overview = artist.get_array().shape
+
+    ax.set_xlim(3000, 3100)
+    assert artist.get_array().shape != overview
+    assert artist.get_extent()[0] <= 3000
+
+
+def test_png_export_respects_memory_budget(tmp_path):
+    path = str(tmp_path / "survey.png")
+
+    survey = _survey(tmp_path)
+    budget = 2 ** 20 // 2
+
+    tracemalloc.start()
+    try:
+        width, height = export_radargram_png(survey, path,
+                                             memory_budget=budget)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak <= budget
+    assert peak > budget / 4
+
+    png = np.asarray(Image.open(path))
+    assert png.shape[:2] == (height, width)
+    # The strongest reflector survives the decimation (darkest pixel)
+    assert png.min() == 0
@@ -0,0 +1,142 @@
+"""
+tests/test_scenario.py
+"""
+
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from core.scenario import (
+    Scenario,
+    ScenarioError,
+    load_scenarios,
+    parse_scenarios,
+    tomllib
+)
+from core.simulation import build_grid, create_solver, ricker_source
+
+
+def _dict(**overrides):
+    data = {"nx": 120, "dx": 1e-3, "nt": 200, "frequency": 20e9,
+            "source_position": 10,
+            "layers": [[0, 60, "Air"], [60, 120, "Concrete"]],
+            "objects": [{"start": 80, "end": 90,
+                         "material": {"name": "Target", "epsilon_r": 6.0}}]}
+    data.update(overrides)
+    return data
+
+
+def test_round_trip_and_canonical_hash():
+    scenario = Scenario.from_dict(_dict(label="first"))
+    copy = Scenario.from_json(json.dumps(scenario.to_dict()))
+
+    assert copy == scenario and copy.label == "first"
+    assert pickle.loads(pickle.dumps(scenario)) == scenario
+
+    # Key order, int/float spelling and the label do not change the hash
+    reordered = dict(reversed(list(_dict(nx=120.0, dx=0.001).items())))
+    assert Scenario.from_dict(reordered).hash == scenario.hash
+
+    # Physics does
+    assert Scenario.from_dict(_dict(frequency=10e9)).hash != scenario.hash
+
+    # NumPy scalars (e.g. computed cell indices) are plain numbers
+    computed = Scenario.from_dict(_dict(
+        nx=np.int64(120), nt=np.int32(200), frequency=np.float32(20e9),
+        layers=[[0, np.int64(60), "Air"], [60, 120, "Concrete"]]))
+    assert computed == Scenario.from_dict(_dict(frequency=float(
+        np.float32(20e9))))
+    assert type(computed.nx) is int and type(computed.layers[0].end) is int
+
+
+def test_simulation_matches_manual_assembly():
+    scenario = Scenario.from_dict(_dict())
+    trace = scenario.create_solver().run(scenario.source_signal())
+
+    grid = build_grid(120, 1e-3, [(0, 60, "Air"), (60, 120, "Concrete")])
+    grid.assign_cells(80, 90, scenario.objects[0].material.to_material())
+    solver = create_solver(grid, 200, 10)
+    expected = solver.run(ricker_source(solver.dt, 200, 20e9))
+
+    np.testing.assert_array_equal(trace, expected)
+
+
+def test_presets_are_clipped_and_share_instances():
+    a = Scenario.from_presets("Small Test", "Road Structure", "Steel")
+    b = Scenario.from_dict({"preset": "Small Test",
+                            "profile": "Road Structure",
+                            "object_material": "Steel", "frequency": 5e9})
+
+    assert [(r.start, r.end) for r in a.layers] == [(0, 80), (80, 200)]
+    assert a.objects[0].start == 120 and a.label.startswith("Small Test")
+    assert a.layers[1] is b.layers[1]
+    assert a.objects[0].material is b.objects[0].material
+
+
+def test_validation_reports_every_problem():
+    # Fields that cannot be converted are reported before range checks
+    with pytest.raises(ScenarioError) as info:
+        Scenario.from_dict(_dict(
+            nx=100, courant_factor=1.2,
+            layers=[[0, 60, "Air"], [50, 120, "Concrete"]],
+            objects=[[20, 30, "Mud"]]))
+    assert info.value.problems == ["object 0: unknown material: Mud"]
+
+    with pytest.raises(ScenarioError) as info:
+        Scenario.from_dict(_dict(
+            nx=100, courant_factor=1.2,
+            layers=[[0, 60, "Air"], [50, 120, "Concrete"]]))
+    problems = " | ".join(info.value.problems)
+    assert "layer 1 [50, 120) outside the grid" in problems
+    assert "layers 0 and 1 overlap" in problems
+    assert "courant_factor" in problems
+
+    for bad, message in [
+            (_dict(frequency=1e14), "Nyquist"),
+            (_dict(source_position=0), "source_position"),
+            (_dict(nt=2.5), "nt must be an integer"),
+            (_dict(nt=True), "nt must be an integer"),
+            (_dict(nx=np.True_), "nx must be an integer"),
+            (_dict(background={"epsilon_r": 0.5}), "Courant condition"),
+            (_dict(color="red"), "color"),
+            ({"preset": "Small Test", "object_material": "Steel",
+              "object_width": "abc"}, "object_width must be an integer"),
+            ({"preset": "Small Test", "object_material": "Steel",
+              "object_position": "5"}, "object_position must be a number"),
+            ({"preset": "Small Test", "nx": "big"}, "nx must be an integer")]:
+        with pytest.raises(ScenarioError, match=message):
+            Scenario.from_dict(bad)
+
+
+def test_files_with_defaults(tmp_path):
+    path = tmp_path / "sweep.json"
+    path.write_text(json.dumps({
+        "defaults": {"preset": "Small Test", "profile": "Air-Soil"},
+        "scenarios": [{"frequency": 5e9}, {"object_material": "Steel"}]}))
+
+    scenarios = load_scenarios(str(path))
+    assert [s.frequency for s in scenarios] == [5e9, 10e9]
+    assert scenarios[1].objects[0].material.name == "Steel"
+
+    with pytest.raises(ScenarioError,
+                       match="scenario 1: layer 0: unknown material"):
+        parse_scenarios([_dict(), _dict(layers=[[0, 10, "Mud"]])])
+
+
+@pytest.mark.skipif(tomllib is None, reason="needs tomllib or tomli")
+def test_toml_file(tmp_path):
+    path = tmp_path / "sweep.toml"
+    path.write_text(
+        "[defaults]\n"
+        "nx = 120\ndx = 1e-3\nnt = 200\nsource_position = 10\n"
+        "layers = [[0, 60, \"Air\"], [60, 120, \"Concrete\"]]\n"
+        "\n[[scenarios]]\nfrequency = 20e9\n"
+        "objects = [{start = 80, end = 90, "
+        "material = {name = \"Target\", epsilon_r = 6.0}}]\n"
+        "\n[[scenarios]]\nfrequency = 10e9\n")
+
+    first, second = load_scenarios(str(path))
+    assert first == Scenario.from_dict(_dict())
+    assert second.objects == ()
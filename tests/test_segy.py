@@ -0,0 +1,66 @@
+"""
+tests/test_segy.py
+"""
+
+import numpy as np
+
+from signal_processing.segy import (
+    SegyReader,
+    encode_sample_interval,
+    read_segy,
+    write_segy
+)
+
+
+def test_segy_round_trip(tmp_path):
+    path = tmp_path / "bscan.sgy"
+    dt = 1e-3 * 0.99 / 299_792_458
+
+    traces = np.random.default_rng(0).normal(size=(7, 50))
+    positions = np.arange(7) * 0.05
+
+    write_segy(path, traces, dt, positions=positions, chunk_size=3)
+    data, read_dt = read_segy(path)
+
+    assert data.shape == (7, 50)
+    assert np.allclose(data, traces.astype(np.float32))
+    assert read_dt == dt
+
+    with SegyReader(path) as reader:
+        assert np.allclose(reader.positions, positions)
+        chunks = list(reader.iter_chunks(4))
+        assert [len(c) for c in chunks] == [4, 3]
+
+
+def test_sample_interval_units():
+    assert encode_sample_interval(4e-6) == (4, "us")
+    assert encode_sample_interval(1e-10) == (100, "ps")
+
+
+def _rev1_template():
+    """Textual header laid out as the SEG-Y rev1 template."""
+    cards = [
+        "CLIENT                        COMPANY                CREW NO",
+        "LINE            AREA                        MAP ID",
+        "REEL NO           DAY-START OF REEL     YEAR      OBSERVER",
+        "INSTRUMENT: MFG            MODEL            SERIAL NO",
+        "DATA TRACES/RECORD 1  AUXILIARY TRACES/RECORD 0  CDP FOLD 1",
+        "SAMPLE INTERVAL 4000 SAMPLES/TRACE 1501 BITS/IN 1600 BYTES/SAMPLE 4",
+        "RECORDING FORMAT        FORMAT THIS REEL SEG Y",
+    ]
+    cards += [""] * (40 - len(cards))
+    return "".join(f"C{i + 1:2d} {card}"[:80].ljust(80)
+                   for i, card in enumerate(cards)).encode("cp500")
+
+
+def test_field_text_header_does_not_override_binary_interval(tmp_path):
+    path = tmp_path / "field.sgy"
+    write_segy(path, np.ones((2, 30)), 4e-6)
+
+    with open(path, "r+b") as f:
+        f.write(_rev1_template())
+
+    data, dt = read_segy(path)
+
+    assert dt == 4e-6
+    assert data.shape == (2, 30)
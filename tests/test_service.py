@@ -0,0 +1,186 @@
+"""
+tests/test_service.py
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.scenario import Scenario, ScenarioError
+from service.batching import batch_key, run_batch
+from service.loadgen import HTTPClient, make_workload, run_load
+from service.server import SimulationServer, SimulationService
+from sweep.scenarios import run_scenario
+
+
+def _scenarios():
+    return [
+        Scenario.from_presets("Small Test", "Air-Soil"),
+        Scenario.from_presets("Small Test", "Air-Concrete", "Steel"),
+        Scenario.from_presets("Small Test", "Air-Soil", "Brick",
+                              frequency=5e9),
+    ]
+
+
+def _service(**kwargs):
+    return SimulationService(executor=ThreadPoolExecutor(2), workers=2,
+                             **kwargs)
+
+
+def test_batch_matches_single_runs():
+    scenarios = _scenarios()
+    assert len({batch_key(s) for s in scenarios}) == 1
+
+    results = run_batch(scenarios)
+
+    for scenario, (result, error) in zip(scenarios, results):
+        assert error is None
+        expected = run_scenario(scenario)
+        assert np.allclose(result["trace"], expected["trace"])
+        assert result["dt"] == expected["dt"]
+
+
+def test_identical_requests_are_coalesced_and_batched():
+    scenarios = _scenarios()
+
+    async def scenario():
+        async with _service(batch_window=0.05) as service:
+            requests = [scenarios[0]] * 5 + scenarios[1:]
+            results = await asyncio.gather(
+                *(service.simulate(s) for s in requests))
+            return service.stats, results
+
+    stats, results = asyncio.run(scenario())
+
+    assert stats["requests"] == 7
+    assert stats["coalesced"] == 4
+    assert stats["simulated"] == 3
+    assert stats["batches"] == 1
+    assert stats["largest_batch"] == 3
+    assert len({digest for digest, _ in results}) == 3
+    assert results[0][1] is results[4][1]
+
+
+def test_http_endpoints_and_streaming():
+
+    async def scenario():
+        async with _service() as service:
+            server = SimulationServer(service)
+            host, port = await server.start("127.0.0.1", 0)
+            try:
+                async with HTTPClient(host, port) as client:
+                    health = await client.request("GET", "/health")
+                    ok = await client.request(
+                        "POST", "/simulate",
+                        {"preset": "Small Test", "profile": "Air-Soil"})
+                    bad = await client.request(
+                        "POST", "/simulate",
+                        {"preset": "Small Test", "profile": "Lava"})
+                    bad_width = await client.request(
+                        "POST", "/simulate",
+                        {"preset": "Small Test", "object_material": "Steel",
+                         "object_width": "abc"})
+                    missing = await client.request("GET", "/nowhere")
+                    lines = [line async for line in client.stream(
+                        "/simulate/stream",
+                        {"scenarios": [s.to_dict() for s in _scenarios()]
+                         + [{"nx": 10}]})]
+
+                report = await run_load(host, port, make_workload(20, 4),
+                                        concurrency=4)
+            finally:
+                await server.close()
+            return health, ok, bad, bad_width, missing, lines, report
+
+    health, ok, bad, bad_width, missing, lines, report = \
+        asyncio.run(scenario())
+
+    assert health == (200, {"status": "ok"})
+
+    status, body = ok
+    assert status == 200
+    assert len(body["trace"]) == 400
+
+    assert bad[0] == 422 and "Lava" in bad[1]["error"]
+    assert bad_width[0] == 422 and "object_width" in bad_width[1]["error"]
+    assert missing[0] == 404
+
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+    assert "error" in next(line for line in lines if line["index"] == 3)
+    assert all(len(line["trace"]) == 400 for line in lines
+               if line["index"] < 3)
+
+    assert report["requests"] == 20 and report["errors"] == 0
+    assert report["service"]["coalesced"] + report["service"]["simulated"] \
+        == 20
+
+
+def test_default_process_pool():
+
+    async def scenario():
+        async with SimulationService(workers=1) as service:
+            return await service.simulate(_scenarios()[1])
+
+    digest, result = asyncio.run(scenario())
+
+    assert digest == _scenarios()[1].hash
+    np.testing.assert_allclose(result["trace"],
+                               run_scenario(_scenarios()[1])["trace"])
+
+
+def test_groups_hold_a_worker_slot_each(monkeypatch):
+    running = []
+    peak = []
+
+    def batch(scenarios, backend=None):
+        running.append(1)
+        peak.append(len(running))
+        time.sleep(0.05)
+        running.pop()
+        return [(None, "solver diverged")] * len(scenarios)
+
+    monkeypatch.setattr("service.server.run_batch", batch)
+
+    # Three grid sizes: three groups of a single batch
+    scenarios = [Scenario.from_presets(preset, "Air-Soil")
+                 for preset in ("Small Test", "Standard GPR",
+                                "High Resolution")]
+
+    async def scenario():
+        async with SimulationService(executor=ThreadPoolExecutor(4),
+                                     workers=1) as service:
+            results = await asyncio.gather(
+                *(service.simulate(s) for s in scenarios * 2),
+                return_exceptions=True)
+            return service.stats, results
+
+    stats, results = asyncio.run(scenario())
+
+    assert max(peak) == 1
+    assert all(isinstance(r, ScenarioError) for r in results)
+    assert stats["errors"] == 3 and stats["coalesced"] == 3
+
+
+def test_unexpected_errors_answer_500():
+
+    async def scenario():
+        async with _service() as service:
+            async def broken(scenario):
+                raise RuntimeError("boom")
+
+            service.simulate = broken
+            server = SimulationServer(service)
+            host, port = await server.start("127.0.0.1", 0)
+            try:
+                async with HTTPClient(host, port) as client:
+                    return await client.request(
+                        "POST", "/simulate",
+                        {"preset": "Small Test", "profile": "Air-Soil"})
+            finally:
+                await server.close()
+
+    status, body = asyncio.run(scenario())
+
+    assert status == 500 and "boom" in body["error"]
@@ -0,0 +1,90 @@
+"""
+tests/test_surrogate.py
+"""
+
+import numpy as np
+
+from core.scenario import MaterialSpec, Scenario
+from core.surrogate import (
+    SurrogateTable,
+    build_surrogate_table,
+    scenario_grid
+)
+
+
+def _table(tmp_path):
+    return build_surrogate_table(
+        str(tmp_path / "table.npy"),
+        depths=[0.02, 0.03, 0.04], epsilon_r=[4.0, 8.0], sigma=[0.0, 0.01],
+        backgrounds=["Dry Soil", "Concrete"],
+        nx=200, nt=400, surface=60, object_width=8
+    )
+
+
+def test_table_nodes_match_solver(tmp_path):
+    table = _table(tmp_path)
+    loaded = SurrogateTable.load(str(tmp_path / "table.npy"))
+
+    assert isinstance(loaded.table, np.memmap)
+
+    trace, from_table = loaded.predict(0.03, 8.0, 0.01, "Concrete")
+    exact = loaded.simulate(0.03, 8.0, 0.01, "Concrete")
+
+    assert from_table
+    assert np.allclose(trace, exact, atol=1e-6 * np.abs(exact).max())
+    assert np.allclose(table.estimate_depths(trace, "Concrete")[0], 0.03,
+                       atol=2e-3)
+
+
+def test_outside_table_falls_back_to_solver(tmp_path):
+    table = _table(tmp_path)
+
+    trace, from_table = table.predict(0.03, 12.0, 0.0, "Dry Soil")
+
+    assert not from_table
+    assert np.array_equal(trace, table.simulate(0.03, 12.0, 0.0, "Dry Soil"))
+    assert not table.contains(0.03, 6.0, 0.0, "Clay")
+
+
+def test_depths_from_table_without_solver(tmp_path, monkeypatch):
+    _table(tmp_path)
+    loaded = SurrogateTable.load(str(tmp_path / "table.npy"))
+
+    def no_solver(*args, **kwargs):
+        raise AssertionError("solver run")
+
+    monkeypatch.setattr("core.surrogate.simulate_reflection", no_solver)
+
+    trace, from_table = loaded.predict(0.03, 8.0, 0.01, "Dry Soil")
+    depths = loaded.estimate_depths(trace, "Dry Soil")
+
+    assert from_table
+    assert np.allclose(depths[0], 0.03, atol=2e-3)
+
+
+def test_scenario_query_matches_table_geometry(tmp_path):
+    table = _table(tmp_path)
+    meta = table.meta
+
+    def scenario(**overrides):
+        params = dict(nx=200, dx=1e-3, nt=400, frequency=10e9,
+                      layers=[(0, 60, "Air"), (60, 200, "Concrete")],
+                      objects=[(90, 98, MaterialSpec("Object", 8.0,
+                                                     sigma=0.01))])
+        params.update(overrides)
+        return Scenario(**params)
+
+    query = table.scenario_query(scenario())
+    assert np.allclose(query[:3], (0.03, 8.0, 0.01))
+    assert query[3] == "Concrete" and table.contains(*query)
+
+    grid = scenario_grid(meta, *query)
+    assert np.array_equal(grid.epsilon_r, scenario().build_grid().epsilon_r)
+
+    for other in (scenario(nt=300),
+                  scenario(frequency=5e9),
+                  scenario(objects=[(90, 95, "Steel")]),
+                  scenario(layers=[(0, 70, "Air"), (70, 200, "Concrete")]),
+                  scenario(layers=[(0, 60, "Air"),
+                                   (60, 200, {"epsilon_r": 6.0})])):
+        assert table.scenario_query(other) is None
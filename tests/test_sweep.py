@@ -0,0 +1,149 @@
+"""
+tests/test_sweep.py
+"""
+
+import sqlite3
+import time
+
+import numpy as np
+
+import pytest
+
+from core.scenario import ScenarioError
+from sweep import worker
+from sweep.scenarios import expand_sweep, run_scenario
+from sweep.work_queue import WorkQueue
+from sweep.worker import run_local_workers, run_worker
+
+
+def _sweep():
+    return expand_sweep(["Small Test"], ["Air-Soil", "Air-Concrete"],
+                        [None, "Steel"])
+
+
+def test_sweep_scenarios_are_distinct():
+    assert len({s.hash for s in _sweep()}) == 4
+    assert len({s.hash for s in expand_sweep()}) == len(expand_sweep())
+
+
+def test_submit_is_idempotent(tmp_path):
+    with WorkQueue(str(tmp_path / "sweep.db")) as queue:
+        assert queue.submit(_sweep() + _sweep(), chunk_size=3) == 4
+        assert queue.submit(_sweep()) == 0
+
+        status = queue.status()
+        assert status["pending"] == 2
+        assert status["scenarios"] == 4
+
+
+def test_local_workers_drain_queue(tmp_path):
+    db = str(tmp_path / "sweep.db")
+    with WorkQueue(db) as queue:
+        queue.submit(_sweep(), chunk_size=1)
+
+    assert run_local_workers(db, 2) == [0, 0]
+
+    with WorkQueue(db) as queue:
+        status = queue.status()
+        assert status["done"] == 4
+        assert status["scenarios_done"] == 4
+
+        results = list(queue.results())
+        digest, scenario, path = results[-1]
+        with np.load(path) as stored:
+            np.testing.assert_allclose(stored["trace"],
+                                       run_scenario(scenario)["trace"])
+
+        # A re-run of the same sweep does no work
+        assert queue.submit(_sweep()) == 0
+
+    assert run_worker(db) == 0
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    db = str(tmp_path / "sweep.db")
+    with WorkQueue(db, lease_seconds=0.2) as queue:
+        queue.submit(_sweep()[:2], chunk_size=2)
+
+        # A worker claims the chunk and dies without renewing
+        chunk, items = queue.claim("dead-worker")
+        assert len(items) == 2
+        assert queue.claim("other") is None
+
+        time.sleep(0.3)
+
+    assert run_worker(db, owner="rescuer", lease_seconds=0.2) == 1
+
+    with sqlite3.connect(db) as conn:
+        state, attempts, owner = conn.execute(
+            "SELECT state, attempts, owner FROM chunks").fetchone()
+    assert (state, attempts, owner) == ("done", 2, "rescuer")
+
+
+def test_invalid_scenarios_are_rejected_on_submit(tmp_path):
+    broken = dict(_sweep()[0].to_dict(), objects=[[100, 110, "Unobtainium"]])
+
+    with WorkQueue(str(tmp_path / "sweep.db")) as queue:
+        with pytest.raises(ScenarioError, match="Unobtainium"):
+            queue.submit([_sweep()[1].to_dict(), broken])
+        assert queue.status()["scenarios"] == 0
+
+
+def test_failing_chunk_is_retried_then_failed(tmp_path, monkeypatch):
+    db = str(tmp_path / "sweep.db")
+    broken = _sweep()[0]
+
+    def run(scenario, backend=None):
+        if scenario == broken:
+            raise RuntimeError("solver diverged")
+        return run_scenario(scenario, backend)
+
+    monkeypatch.setattr(worker, "run_scenario", run)
+
+    with WorkQueue(db, max_attempts=2) as queue:
+        queue.submit([broken, _sweep()[1]], chunk_size=1)
+
+    assert run_worker(db, max_attempts=2) == 1
+
+    with WorkQueue(db) as queue:
+        status = queue.status()
+        assert status["done"] == 1 and status["failed"] == 1
+
+        (chunk, attempts, error), = queue.failures()
+        assert attempts == 2
+        assert "solver diverged" in error
+
+        # Finished scenarios are not requeued
+        assert queue.submit([_sweep()[1]]) == 0
+        assert queue.requeue_failed() == 1
+        assert queue.status()["failed"] == 0
+
+        # Failed again; after the fix, re-submitting the sweep retries it
+        assert run_worker(db, max_attempts=2) == 0
+        assert queue.status()["failed"] == 1
+
+        monkeypatch.setattr(worker, "run_scenario", run_scenario)
+        assert queue.submit([broken, _sweep()[1]]) == 1
+        assert run_worker(db) == 1
+
+        status = queue.status()
+        assert status["done"] == 2 and status["scenarios_done"] == 2
+        assert queue.failures() == []
+
+
+def test_journal_mode(tmp_path):
+    def mode(path):
+        with sqlite3.connect(path) as conn:
+            return conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+    # Rollback journal by default: safe on shared filesystems
+    with WorkQueue(str(tmp_path / "shared.db")) as queue:
+        queue.submit(_sweep()[:1])
+    assert mode(str(tmp_path / "shared.db")) == "delete"
+
+    # WAL is opt-in and persists in the file
+    with WorkQueue(str(tmp_path / "local.db"), wal=True) as queue:
+        queue.submit(_sweep()[:1])
+    with WorkQueue(str(tmp_path / "local.db")) as queue:
+        assert queue.status()["pending"] == 1
+    assert mode(str(tmp_path / "local.db")) == "wal"
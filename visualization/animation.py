@@ -3,6 +3,9 @@ visualization/animation.py
 
 Animation utilities for EM wave propagation.
 Displays real-time evolution of electric field.
+
+These functions open interactive windows; for headless rendering to
+MP4/GIF/PNG see visualization/export.py.
 """
 
 import numpy as np
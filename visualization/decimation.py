@@ -0,0 +1,59 @@
+"""
+visualization/decimation.py
+
+Peak-preserving decimation for display.
+
+Plots never need more points than there are pixels.  Instead of
+taking every k-th sample (which can drop narrow peaks entirely), the
+data is split into buckets and the minimum and maximum of every
+bucket are kept, so the drawn envelope matches the full data.
+"""
+
+import numpy as np
+
+
+def minmax_decimate(values, max_points):
+    """
+    Reduce a 1D array to at most max_points samples.
+
+    Parameters
+    ----------
+    values : ndarray (n,)
+    max_points : int
+        Output size limit (>= 2)
+
+    Returns
+    -------
+    index : ndarray (m,)
+        Increasing sample indices kept (m <= max_points)
+    decimated : ndarray (m,)
+        values[index]
+    """
+    values = np.asarray(values)
+    n = len(values)
+
+    if max_points < 2:
+        raise ValueError("max_points must be at least 2.")
+
+    if n <= max_points:
+        index = np.arange(n)
+        return index, values
+
+    n_buckets = max_points // 2
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+
+    # Pad the last bucket with its final sample
+    padded = np.empty(n_buckets * size, dtype=values.dtype)
+    padded[:n] = values
+    padded[n:] = values[-1]
+    buckets = padded.reshape(n_buckets, size)
+
+    start = np.arange(n_buckets) * size
+    lo = start + buckets.argmin(axis=1)
+    hi = start + buckets.argmax(axis=1)
+
+    index = np.sort(np.stack((lo, hi), axis=1), axis=1).ravel()
+    index = np.minimum(index, n - 1)
+
+    return index, values[index]
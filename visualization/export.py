@@ -0,0 +1,282 @@
+"""
+visualization/export.py
+
+Headless export of field animations to MP4, GIF or PNG sequences.
+
+Everything is rendered with the Agg canvas (no pyplot, no display),
+so exports run on display-less nodes.  The field history is read from
+a memory-mapped .npy file and only the frames actually rendered are
+touched: the number of frames is decimated to fps * duration (or a
+frame budget), and a single figure with a single set of artists is
+reused for every frame.
+
+Typical use::
+
+    history = record_field_history(solver, source, "history.npy", stride=2)
+    export_animation("history.npy", grid.x, "wave.gif", fps=20, duration=5)
+"""
+
+import argparse
+import os
+import shutil
+
+import numpy as np
+from matplotlib.animation import FFMpegWriter, PillowWriter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+# -------------------------------------------------------
+# Field History Recording
+# -------------------------------------------------------
+
+def record_field_history(solver, source_signal, path, stride=1):
+    """
+    Run a solver and store every stride-th Ez snapshot in a .npy file.
+
+    Parameters
+    ----------
+    solver : FDTDSolver1D
+    source_signal : ndarray (nt,)
+    path : str
+        Output .npy file (written through a memory map)
+    stride : int
+        Time steps between stored snapshots
+
+    Returns
+    -------
+    numpy.memmap (n_frames, nx)
+        Read-only view of the stored history
+    """
+    if stride <= 0:
+        raise ValueError("stride must be positive.")
+
+    n_frames = solver.nt // stride
+    history = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float32,
+        shape=(n_frames, solver.grid.nx))
+
+    def store(step, current):
+        frame = step // stride - 1
+        if step % stride == 0 and frame < n_frames:
+            history[frame] = current.Ez
+
+    solver.run(source_signal, callback=store, callback_interval=stride)
+
+    history.flush()
+    del history
+
+    return np.load(path, mmap_mode="r")
+
+
+# -------------------------------------------------------
+# Frame Selection
+# -------------------------------------------------------
+
+def select_frames(n_available, fps=30, duration=None, max_frames=None):
+    """
+    Evenly spaced frame indices for the requested output length.
+
+    Parameters
+    ----------
+    n_available : int
+        Frames in the history
+    fps : float
+        Output frame rate
+    duration : float (optional)
+        Output length (s); limits the frame count to fps * duration
+    max_frames : int (optional)
+        Hard frame budget
+
+    Returns
+    -------
+    ndarray
+        Increasing frame indices
+    """
+    if n_available <= 0:
+        raise ValueError("Field history is empty.")
+
+    n = n_available
+    if duration is not None:
+        n = min(n, max(int(round(fps * duration)), 1))
+    if max_frames is not None:
+        n = min(n, max(int(max_frames), 1))
+
+    return np.unique(np.round(
+        np.linspace(0, n_available - 1, n)).astype(int))
+
+
+# -------------------------------------------------------
+# Writers
+# -------------------------------------------------------
+
+def _output_kind(path):
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".mp4":
+        return "mp4"
+    if ext == ".gif":
+        return "gif"
+    if ext == "":
+        return "png"
+
+    raise ValueError(f"Unsupported output: {path} "
+                     "(use .mp4, .gif or a directory for PNG frames)")
+
+
+class _PathFFMpegWriter(FFMpegWriter):
+    """FFMpegWriter running the ffmpeg found on PATH."""
+
+    @classmethod
+    def bin_path(cls):
+        return shutil.which("ffmpeg")
+
+
+def _writer(kind, fps):
+    if kind == "gif":
+        return PillowWriter(fps=fps)
+
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError(
+            "ffmpeg not found; export as .gif or PNG frames instead.")
+
+    return _PathFFMpegWriter(fps=fps, codec="libx264",
+                             extra_args=["-pix_fmt", "yuv420p"])
+
+
+class _PNGSequenceWriter:
+    """Minimal writer with the grab_frame interface of matplotlib's."""
+
+    def __init__(self, canvas, directory, dpi):
+        self.canvas = canvas
+        self.directory = directory
+        self.dpi = dpi
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def grab_frame(self):
+        name = os.path.join(self.directory, f"frame_{self.count:05d}.png")
+        self.canvas.figure.savefig(name, dpi=self.dpi)
+        self.count += 1
+
+
+# -------------------------------------------------------
+# Animation Export
+# -------------------------------------------------------
+
+def export_animation(field_history, x, path, fps=30, duration=None,
+                     max_frames=None, epsilon_r=None, dt=None, stride=1,
+                     title="EM Wave Propagation", dpi=100, figsize=(8, 4)):
+    """
+    Render a field history to MP4, GIF or numbered PNG files.
+
+    Parameters
+    ----------
+    field_history : ndarray (n_frames, nx) or str
+        History array, or path to a .npy file (memory-mapped)
+    x : ndarray (nx,)
+        Spatial coordinates (m)
+    path : str
+        .mp4 (needs ffmpeg on PATH), .gif, or a directory name
+        without extension for PNG frames
+    fps : float
+        Output frame rate
+    duration : float (optional)
+        Output length (s)
+    max_frames : int (optional)
+        Frame budget
+    epsilon_r : ndarray (optional)
+        Permittivity profile drawn on a second axis
+    dt : float (optional)
+        Time step, used to label frames with simulated time
+    stride : int
+        Time steps between history rows (for labels)
+    dpi : int
+
+    Returns
+    -------
+    int
+        Number of frames written
+    """
+    if isinstance(field_history, (str, os.PathLike)):
+        field_history = np.load(field_history, mmap_mode="r")
+
+    kind = _output_kind(path)
+    frames = select_frames(len(field_history), fps, duration, max_frames)
+
+    # One figure, one set of artists, reused for every frame
+    figure = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    line, = ax.plot(x, np.asarray(field_history[frames[0]]), lw=1)
+    ax.set_xlabel("Position (m)")
+    ax.set_ylabel("Electric Field (Ez)")
+    ax.set_xlim(x[0], x[-1])
+    ax.grid(True)
+
+    # Fixed limits from the rendered frames only
+    peak = max(float(np.max(np.abs(field_history[i]))) for i in frames)
+    peak = peak or 1.0
+    ax.set_ylim(-1.1 * peak, 1.1 * peak)
+
+    if epsilon_r is not None:
+        ax_material = ax.twinx()
+        ax_material.plot(x, epsilon_r, linestyle="--", color="gray")
+        ax_material.set_ylabel("Relative Permittivity (εr)")
+
+    label = ax.set_title(title)
+    figure.tight_layout()
+
+    def draw(i):
+        line.set_ydata(field_history[i])
+        step = (i + 1) * stride
+        if dt is not None:
+            label.set_text(f"{title} | t = {step * dt * 1e9:.3f} ns")
+        else:
+            label.set_text(f"{title} | Time Step: {step}")
+
+    if kind == "png":
+        writer = _PNGSequenceWriter(canvas, path, dpi)
+        for i in frames:
+            draw(i)
+            writer.grab_frame()
+        return len(frames)
+
+    writer = _writer(kind, fps)
+    with writer.saving(figure, path, dpi):
+        for i in frames:
+            draw(i)
+            writer.grab_frame()
+
+    return len(frames)
+
+
+# -------------------------------------------------------
+# Command Line
+# -------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export a recorded field history (.npy) headlessly"
+    )
+    parser.add_argument("history", help="Field history .npy file")
+    parser.add_argument("output", help=".mp4, .gif or PNG directory")
+    parser.add_argument("--dx", type=float, default=1e-3,
+                        help="Cell size (m)")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--duration", type=float, default=None)
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    history = np.load(args.history, mmap_mode="r")
+    x = np.arange(history.shape[1]) * args.dx
+
+    n = export_animation(history, x, args.output, fps=args.fps,
+                         duration=args.duration,
+                         max_frames=args.max_frames)
+    print(f"Wrote {n} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
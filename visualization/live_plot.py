@@ -0,0 +1,213 @@
+"""
+visualization/live_plot.py
+
+Blitted live view of a running simulation.
+
+The figure is built with matplotlib.figure.Figure (no pyplot), so it
+can be embedded in any canvas: FigureCanvasTkAgg in the GUI, or
+FigureCanvasAgg headless.  Static content (axes, grid, material
+profile) is rendered once and cached; each frame only restores that
+background and redraws the animated Ez and trace lines.
+"""
+
+import time
+
+import numpy as np
+from matplotlib.figure import Figure
+
+
+# -------------------------------------------------------
+# Blitting Manager
+# -------------------------------------------------------
+
+class BlitManager:
+    """
+    Redraw animated artists over a cached background.
+
+    Parameters
+    ----------
+    canvas : FigureCanvasBase
+    artists : list of Artist
+        Artists updated every frame
+    """
+
+    def __init__(self, canvas, artists):
+        self.canvas = canvas
+        self.artists = list(artists)
+        self._background = None
+
+        for artist in self.artists:
+            artist.set_animated(True)
+
+        # Any full redraw (resize, rescale) invalidates the background
+        self._cid = canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(
+            self.canvas.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self.artists:
+            self.canvas.figure.draw_artist(artist)
+
+    def invalidate(self):
+        """Force a full redraw on the next update."""
+        self._background = None
+
+    def update(self):
+        if self._background is None:
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+
+# -------------------------------------------------------
+# Live Field / Trace View
+# -------------------------------------------------------
+
+class LiveFieldView:
+    """
+    Two-panel view: Ez(x) with material overlay, and the recorded
+    trace.
+
+    Parameters
+    ----------
+    max_fps : float
+        Frame-rate cap; snapshots arriving faster are skipped
+    figsize : tuple
+    """
+
+    def __init__(self, max_fps=30.0, figsize=(6, 5)):
+        self.figure = Figure(figsize=figsize, tight_layout=True)
+        self.ax_field, self.ax_trace = self.figure.subplots(2, 1)
+        self.ax_material = self.ax_field.twinx()
+
+        self.field_line, = self.ax_field.plot([], [], lw=1)
+        self.trace_line, = self.ax_trace.plot([], [], lw=1)
+        self.material_line, = self.ax_material.plot(
+            [], [], linestyle="--", color="gray")
+        self.pick_markers, = self.ax_trace.plot(
+            [], [], "o", color="red", ms=4)
+
+        self.ax_field.set_xlabel("Position (m)")
+        self.ax_field.set_ylabel("Electric Field (Ez)")
+        self.ax_field.grid(True)
+        self.ax_material.set_ylabel("εr")
+
+        self.ax_trace.set_xlabel("Time (ns)")
+        self.ax_trace.set_ylabel("Amplitude")
+        self.ax_trace.grid(True)
+
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self._last_frame = -np.inf
+        self.n_frames = 0
+        self.blit = None
+
+    def attach(self, canvas):
+        """Attach the canvas the figure is drawn on."""
+        self.blit = BlitManager(canvas,
+                                [self.field_line, self.trace_line])
+        return canvas
+
+    # --------------------------------------------------
+
+    def start(self, x, epsilon_r, nt, dt):
+        """Reset the view for a new run."""
+        self.x = np.asarray(x)
+        self.dt_ns = dt * 1e9
+
+        self.field_line.set_data([], [])
+        self.trace_line.set_data([], [])
+        self.pick_markers.set_data([], [])
+        self.material_line.set_data(self.x, epsilon_r)
+
+        self.ax_field.set_xlim(self.x[0], self.x[-1])
+        self.ax_field.set_ylim(-1.0, 1.0)
+        self.ax_material.set_ylim(0, 1.1 * np.max(epsilon_r))
+        self.ax_trace.set_xlim(0, nt * self.dt_ns)
+        self.ax_trace.set_ylim(-1.0, 1.0)
+
+        self._last_frame = -np.inf
+        self.n_frames = 0
+        self._redraw()
+
+    def _redraw(self):
+        if self.blit is not None:
+            self.blit.invalidate()
+            self.blit.update()
+
+    @staticmethod
+    def _fits(ax, values):
+        """Grow the y-limits if values do not fit; True if unchanged."""
+        if len(values) == 0:
+            return True
+
+        peak = float(np.max(np.abs(values)))
+        low, high = ax.get_ylim()
+        if peak <= high:
+            return True
+
+        ax.set_ylim(-1.2 * peak, 1.2 * peak)
+        return False
+
+    def update(self, snapshot, force=False):
+        """
+        Draw a snapshot unless the frame-rate cap says otherwise.
+
+        Parameters
+        ----------
+        snapshot : dict
+            "field_index", "field", "trace_index", "trace"
+        force : bool
+            Ignore the frame-rate cap
+
+        Returns
+        -------
+        bool
+            True if a frame was drawn
+        """
+        now = time.perf_counter()
+        if not force and now - self._last_frame < self.min_interval:
+            return False
+
+        self.field_line.set_data(self.x[snapshot["field_index"]],
+                                 snapshot["field"])
+        self.trace_line.set_data(snapshot["trace_index"] * self.dt_ns,
+                                 snapshot["trace"])
+
+        fits = self._fits(self.ax_field, snapshot["field"])
+        fits = self._fits(self.ax_trace, snapshot["trace"]) and fits
+
+        if fits and self.blit is not None:
+            self.blit.update()
+        else:
+            self._redraw()
+
+        self._last_frame = now
+        self.n_frames += 1
+        return True
+
+    def show_result(self, field, trace, picks):
+        """
+        Final, full-resolution frame with reflection picks.
+
+        field may be None (e.g. a surrogate-table prediction, which
+        has a trace only); the field panel is then left empty.
+        """
+        index = np.arange(len(trace))
+        if field is None:
+            self.field_line.set_data([], [])
+        else:
+            self.field_line.set_data(self.x, field)
+            self._fits(self.ax_field, field)
+        self.trace_line.set_data(index * self.dt_ns, trace)
+
+        picks = np.asarray(picks, dtype=int)
+        self.pick_markers.set_data(picks * self.dt_ns, trace[picks])
+
+        self._fits(self.ax_trace, trace)
+        self._redraw()
@@ -0,0 +1,404 @@
+"""
+visualization/radargram.py
+
+B-scan (radargram) viewer and exporter for very large surveys.
+
+A radargram (n_traces, nt) is never rendered at full resolution.
+Every view asks for an image no larger than the screen area, at a
+level of detail given by power-of-two decimation factors along the
+trace and time axes.  Decimation keeps the signed extreme (largest
+magnitude) of each block, so thin strong reflectors and their
+polarity survive any zoom level.
+
+Decimated data is produced in fixed tiles of traces, read chunk by
+chunk from the source (array, memory-mapped .npy or SegyReader) and
+kept in an LRU cache, so panning and zooming only touch the raw
+traces of tiles not seen before, and memory stays bounded by the
+chunk size and the cache.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+from matplotlib import colormaps
+
+
+# -------------------------------------------------------
+# Block Decimation
+# -------------------------------------------------------
+
+def peak_decimate(block, trace_factor, sample_factor):
+    """
+    Decimate a 2D block keeping the signed extreme of each cell.
+
+    Parameters
+    ----------
+    block : ndarray (n, m)
+    trace_factor, sample_factor : int
+        Cell size along each axis
+
+    Returns
+    -------
+    ndarray (ceil(n / trace_factor), ceil(m / sample_factor))
+    """
+    block = np.asarray(block)
+    n, m = block.shape
+
+    if trace_factor == 1 and sample_factor == 1:
+        return block.copy()
+
+    rows = -(-n // trace_factor)
+    cols = -(-m // sample_factor)
+
+    # Zero padding never wins the magnitude comparison
+    padded = np.zeros((rows * trace_factor, cols * sample_factor),
+                      dtype=block.dtype)
+    padded[:n, :m] = block
+
+    cells = padded.reshape(rows, trace_factor, cols, sample_factor)
+    cells = cells.transpose(0, 2, 1, 3).reshape(rows, cols, -1)
+
+    pick = np.abs(cells).argmax(axis=2)
+    return np.take_along_axis(cells, pick[..., None], axis=2)[..., 0]
+
+
+def _level(span, pixels):
+    """Smallest power-of-two factor fitting span samples in pixels."""
+    needed = max(-(-int(span) // max(int(pixels), 1)), 1)
+    return 1 << (needed - 1).bit_length()
+
+
+# -------------------------------------------------------
+# Tiled Level-of-Detail Source
+# -------------------------------------------------------
+
+class RadargramView:
+    """
+    Level-of-detail access to a large radargram.
+
+    Parameters
+    ----------
+    source : ndarray, str or SegyReader
+        (n_traces, nt) array or memmap, path to a .npy file (opened
+        memory-mapped), or a SegyReader
+    dt : float (optional)
+        Sample interval (s), for the time axis
+    dx : float (optional)
+        Trace spacing (m), for the distance axis
+    tile_size : int
+        Decimated traces per cached tile
+    chunk_traces : int
+        Raw traces read at once
+    cache_tiles : int
+        Maximum number of cached tiles
+    """
+
+    def __init__(self, source, dt=None, dx=None, tile_size=256,
+                 chunk_traces=2048, cache_tiles=256):
+        if isinstance(source, str):
+            source = np.load(source, mmap_mode="r")
+
+        self.source = source
+        self.dt = dt if dt is not None else getattr(source, "dt", None)
+        self.dx = dx
+
+        if hasattr(source, "n_traces"):
+            self.n_traces, self.nt = source.n_traces, source.nt
+        else:
+            self.n_traces, self.nt = np.shape(source)
+
+        self.tile_size = int(tile_size)
+        self.chunk_traces = int(chunk_traces)
+        self.cache_tiles = int(cache_tiles)
+
+        self._tiles = OrderedDict()
+        self.n_reads = 0
+
+    def _read(self, start, stop):
+        self.n_reads += 1
+        if hasattr(self.source, "n_traces"):
+            return self.source.read(start, stop).astype(np.float32)
+        return np.asarray(self.source[start:stop], dtype=np.float32)
+
+    # --------------------------------------------------
+
+    def tile(self, trace_factor, sample_factor, index):
+        """
+        Decimated tile (<= tile_size, ceil(nt / sample_factor)).
+        """
+        key = (trace_factor, sample_factor, index)
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+
+        start = index * self.tile_size * trace_factor
+        stop = min(start + self.tile_size * trace_factor, self.n_traces)
+
+        # Chunks aligned to whole decimation cells
+        step = max(self.chunk_traces // trace_factor, 1) * trace_factor
+
+        parts = [
+            peak_decimate(self._read(lo, min(lo + step, stop)),
+                          trace_factor, sample_factor)
+            for lo in range(start, stop, step)
+        ]
+        tile = np.concatenate(parts) if parts else np.zeros(
+            (0, -(-self.nt // sample_factor)), dtype=np.float32)
+
+        self._tiles[key] = tile
+        if len(self._tiles) > self.cache_tiles:
+            self._tiles.popitem(last=False)
+
+        return tile
+
+    def window(self, traces=None, samples=None, width=1000, height=800):
+        """
+        Decimated image of a trace / sample window.
+
+        Parameters
+        ----------
+        traces : (start, stop) (optional)
+            Trace range (default all)
+        samples : (start, stop) (optional)
+            Sample range (default all)
+        width, height : int
+            Pixel budget along traces and samples
+
+        Returns
+        -------
+        image : ndarray (n_samples_out, n_traces_out)
+            Time runs down the rows, ready for imshow
+        bounds : tuple
+            (trace_start, trace_stop, sample_start, sample_stop) in
+            raw indices covered by the image
+        """
+        t0, t1 = traces if traces is not None else (0, self.n_traces)
+        s0, s1 = samples if samples is not None else (0, self.nt)
+
+        t0, t1 = max(int(t0), 0), min(int(np.ceil(t1)), self.n_traces)
+        s0, s1 = max(int(s0), 0), min(int(np.ceil(s1)), self.nt)
+        if t0 >= t1 or s0 >= s1:
+            raise ValueError("Empty radargram window.")
+
+        ft = _level(t1 - t0, width)
+        fs = _level(s1 - s0, height)
+
+        c0, c1 = t0 // ft, -(-t1 // ft)
+        r0, r1 = s0 // fs, -(-s1 // fs)
+
+        first = c0 // self.tile_size
+        last = (c1 - 1) // self.tile_size
+
+        columns = np.concatenate([
+            self.tile(ft, fs, i) for i in range(first, last + 1)
+        ])
+        offset = first * self.tile_size
+
+        image = columns[c0 - offset:c1 - offset, r0:r1].T
+        bounds = (c0 * ft, min(c1 * ft, self.n_traces),
+                  r0 * fs, min(r1 * fs, self.nt))
+
+        return image, bounds
+
+    # --------------------------------------------------
+    # Display
+    # --------------------------------------------------
+
+    def _extent(self, bounds):
+        t0, t1, s0, s1 = bounds
+        dx = self.dx or 1.0
+        dt = self.dt or 1.0
+        return (t0 * dx, t1 * dx, s1 * dt, s0 * dt)
+
+    def _to_index(self, xlim, ylim):
+        dx = self.dx or 1.0
+        dt = self.dt or 1.0
+        return (sorted(v / dx for v in xlim), sorted(v / dt for v in ylim))
+
+    def color_limit(self, quantile=0.99, width=2000, height=1000):
+        """Symmetric color limit from an overview of the survey."""
+        overview, _ = self.window(width=width, height=height)
+        limit = float(np.quantile(np.abs(overview), quantile))
+        return limit or 1.0
+
+    def show(self, ax, cmap="gray", vmax=None, interactive=True):
+        """
+        Draw the radargram on an Axes.
+
+        With interactive=True the image is recomputed at screen
+        resolution whenever the axes limits change (pan / zoom).
+
+        Returns
+        -------
+        AxesImage
+        """
+        vmax = vmax or self.color_limit()
+        width, height = self._pixels(ax)
+
+        image, bounds = self.window(width=width, height=height)
+        artist = ax.imshow(image, cmap=cmap, vmin=-vmax, vmax=vmax,
+                           aspect="auto", interpolation="nearest",
+                           extent=self._extent(bounds))
+
+        ax.set_xlabel("Distance (m)" if self.dx else "Trace")
+        ax.set_ylabel("Time (s)" if self.dt else "Sample")
+
+        if interactive:
+            state = {"busy": False}
+
+            def refresh(_ax):
+                if state["busy"]:
+                    return
+                state["busy"] = True
+                try:
+                    traces, samples = self._to_index(ax.get_xlim(),
+                                                     ax.get_ylim())
+                    width, height = self._pixels(ax)
+                    image, bounds = self.window(traces, samples,
+                                                width, height)
+                    artist.set_data(image)
+                    artist.set_extent(self._extent(bounds))
+                    ax.figure.canvas.draw_idle()
+                except ValueError:
+                    pass
+                finally:
+                    state["busy"] = False
+
+            ax.callbacks.connect("xlim_changed", refresh)
+            ax.callbacks.connect("ylim_changed", refresh)
+
+        return artist
+
+    @staticmethod
+    def _pixels(ax):
+        box = ax.get_window_extent()
+        return max(int(box.width), 1), max(int(box.height), 1)
+
+
+# -------------------------------------------------------
+# PNG Export
+# -------------------------------------------------------
+
+# Bytes per output pixel: float32 image, RGB bytes, PIL's RGBX copy
+EXPORT_PIXEL_BYTES = 4 + 3 + 4
+# Bytes per raw sample while decimating a chunk: the float32 read,
+# peak_decimate's padded, regrouped and |.| copies, argmax and result
+EXPORT_CHUNK_BYTES = 24
+# Bytes per pixel of a colormapped row block (scaled float32, levels, RGB)
+EXPORT_RENDER_BYTES = 4 + 1 + 3
+EXPORT_RENDER_ROWS = 256
+# Pixels sampled for the default color limit (|.| copy + quantile scratch)
+EXPORT_VMAX_SAMPLES = 2 ** 18
+EXPORT_VMAX_BYTES = 12
+
+
+def _vmax_stride(width, height):
+    return max(int(np.ceil(np.sqrt(width * height / EXPORT_VMAX_SAMPLES))), 1)
+
+
+def _export_memory(width, height, chunk_samples):
+    """Peak bytes of export_radargram_png() for one image size."""
+    stride = _vmax_stride(width, height)
+    sampled = -(-width // stride) * -(-height // stride)
+
+    return (width * height * EXPORT_PIXEL_BYTES
+            + max(min(height, EXPORT_RENDER_ROWS) * width
+                  * EXPORT_RENDER_BYTES,
+                  sampled * EXPORT_VMAX_BYTES)
+            + chunk_samples * EXPORT_CHUNK_BYTES)
+
+
+def export_radargram_png(source, path, width=None, height=None,
+                         memory_budget=256 * 2 ** 20, cmap="gray",
+                         vmax=None, **view_kwargs):
+    """
+    Write a whole survey as a PNG image within a memory budget.
+
+    The output size defaults to one pixel per trace and sample and is
+    reduced (by power-of-two decimation) until the image buffers and
+    the scratch of one raw chunk (at least one trace) fit in
+    memory_budget bytes.  Chunks are decimated straight into the
+    image, bypassing the tile cache.
+
+    Parameters
+    ----------
+    source : ndarray, str, SegyReader or RadargramView
+    path : str
+        Output .png file
+    width, height : int (optional)
+        Maximum image size in pixels
+    memory_budget : int
+        Bytes allowed for the image buffers and chunk scratch
+    cmap : str
+    vmax : float (optional)
+        Symmetric color limit (default: 99th percentile of |image|,
+        from at most EXPORT_VMAX_SAMPLES pixels)
+
+    Returns
+    -------
+    tuple
+        (width, height) of the written image
+    """
+    view = source if isinstance(source, RadargramView) else \
+        RadargramView(source, **view_kwargs)
+    n_traces, nt = view.n_traces, view.nt
+
+    trace_factor = _level(n_traces, min(width or n_traces, n_traces))
+    sample_factor = _level(nt, min(height or nt, nt))
+
+    while True:
+        width = -(-n_traces // trace_factor)
+        height = -(-nt // sample_factor)
+        if _export_memory(width, height, nt) <= memory_budget:
+            break
+
+        if width >= height and width > 1:
+            trace_factor *= 2
+        elif height > 1:
+            sample_factor *= 2
+        else:
+            break
+
+    # Largest chunk the remaining budget allows: whole decimation
+    # cells, or a power-of-two fraction of one cell
+    spare = memory_budget - _export_memory(width, height, 0)
+    step = max(min(spare // (EXPORT_CHUNK_BYTES * nt), view.chunk_traces), 1)
+    if step >= trace_factor:
+        step -= step % trace_factor
+    else:
+        step = 1 << (step.bit_length() - 1)
+
+    # Chunks are merged by magnitude, so cells split across chunks keep
+    # their signed extreme (zero never wins, as in peak_decimate)
+    image = np.zeros((height, width), dtype=np.float32)
+    for lo in range(0, n_traces, step):
+        part = peak_decimate(view._read(lo, min(lo + step, n_traces)),
+                             min(step, trace_factor), sample_factor).T
+        column = lo // trace_factor
+        target = image[:, column:column + part.shape[1]]
+        np.copyto(target, part, where=np.abs(part) > np.abs(target))
+        del part, target
+
+    if vmax is None:
+        stride = _vmax_stride(width, height)
+        sample = np.abs(image[::stride, ::stride])
+        vmax = float(np.quantile(sample, 0.99)) or 1.0
+        del sample
+
+    lut = (colormaps[cmap](np.linspace(0, 1, 256))[:, :3] * 255).astype(
+        np.uint8)
+
+    rgb = np.empty(image.shape + (3,), dtype=np.uint8)
+    for start in range(0, height, EXPORT_RENDER_ROWS):
+        rows = image[start:start + EXPORT_RENDER_ROWS] / np.float32(vmax)
+        rows += 1
+        rows *= 127.5
+        np.clip(rows, 0, 255, out=rows)
+        rgb[start:start + EXPORT_RENDER_ROWS] = lut[rows.astype(np.uint8)]
+        del rows
+
+    del image
+    Image.fromarray(rgb, "RGB").save(path)
+
+    return width, height